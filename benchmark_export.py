@@ -0,0 +1,293 @@
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import mysql.connector
+
+import parallel_export
+from export_engine import export_database
+from export_streaming import DEFAULT_BATCH_SIZE
+from json_encoder import JSONEncoder
+from output_compression import COMPRESSION_SUFFIXES, OutputCompression
+from synthetic_schema import SCENARIOS, FakeConnection, FakeConnectionPool, build_scenario, load_into_mysql
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DRIVERS = ("exporter", "cli", "gui")
+EXPORT_FORMATS = ("single_file", "separate_files", "json_lines")
+CLI_FORMAT_CHOICES = {"single_file": "1", "separate_files": "2", "json_lines": "3"}
+GUI_FORMAT_KEYS = {"single_file": "single", "separate_files": "separate", "json_lines": "jsonl"}
+BENCHMARK_DATABASE = "json_export_bench"
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def output_size(output_dir):
+    return sum(os.path.getsize(os.path.join(output_dir, name)) for name in os.listdir(output_dir))
+
+
+def read_summary_stats(output_dir):
+    summary_file = os.path.join(output_dir, f"{BENCHMARK_DATABASE}_export_summary.json")
+    if not os.path.exists(summary_file):
+        return None
+    with open(summary_file, 'r', encoding='utf-8') as f:
+        return json.load(f).get("export_stats")
+
+
+def use_synthetic_connections(tables):
+    # Every connection the exporters open is answered by the synthetic schema
+    mysql.connector.connect = lambda **params: FakeConnection(tables)
+    parallel_export.create_connection_pool = lambda params, workers: FakeConnectionPool(tables, max(1, workers))
+
+
+def pipeline_memory(config):
+    if config.get("pipeline_memory_mb"):
+        return config["pipeline_memory_mb"] * 1024 * 1024
+    return None
+
+
+def run_exporter(config, connection_params, output_dir):
+    compression = OutputCompression(config["compression"]) if config["compression"] else None
+    outcome = export_database(connection_params, export_format=config["format"], output_dir=output_dir,
+                              batch_size=config["batch_size"], workers=config["workers"],
+                              split_ranges=config["split_ranges"], split_min_rows=1, compression=compression,
+                              encoder=JSONEncoder(config["json_backend"], config["json_style"]),
+                              pipeline_memory=pipeline_memory(config))
+    return outcome["total_rows"], outcome["export_stats"]
+
+
+def run_cli(config, connection_params, output_dir):
+    import migrationfinalboss
+
+    answers = iter([connection_params.get("host", "localhost"), connection_params.get("user", "root"),
+                    connection_params.get("password", ""), BENCHMARK_DATABASE,
+                    "1", CLI_FORMAT_CHOICES[config["format"]], "3", output_dir])
+    builtins.input = lambda prompt="": next(answers)
+    compression = OutputCompression(config["compression"]) if config["compression"] else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        migrationfinalboss.export_database_to_json(batch_size=config["batch_size"], workers=config["workers"],
+                                                   split_ranges=config["split_ranges"], split_min_rows=1,
+                                                   compression=compression,
+                                                   encoder=JSONEncoder(config["json_backend"], config["json_style"]),
+                                                   pipeline_memory=pipeline_memory(config))
+    return None, read_summary_stats(output_dir)
+
+
+def run_gui(config, connection_params, output_dir):
+    from mysql_to_json_gui import DatabaseExportThread
+
+    connection = mysql.connector.connect(**connection_params)
+    cursor = connection.cursor()
+    cursor.execute("SHOW TABLES")
+    table_names = [row[0] for row in cursor.fetchall()]
+    connection.close()
+
+    outcome = {}
+    thread = DatabaseExportThread(dict(connection_params, database=BENCHMARK_DATABASE), table_names,
+                                  GUI_FORMAT_KEYS[config["format"]], output_dir,
+                                  batch_size=config["batch_size"], workers=config["workers"],
+                                  split_ranges=config["split_ranges"], split_min_rows=1,
+                                  compression=OutputCompression(config["compression"]) if config["compression"] else None,
+                                  encoder=JSONEncoder(config["json_backend"], config["json_style"]),
+                                  pipeline_memory=pipeline_memory(config))
+    thread.finished_signal.connect(lambda success, message: outcome.update(success=success, message=message))
+    # run() directly, on this thread, so the timing covers only the export
+    thread.run()
+    if not outcome.get("success"):
+        raise RuntimeError(outcome.get("message", "GUI export failed"))
+    return None, read_summary_stats(output_dir)
+
+
+def run_child(config):
+    tables = build_scenario(config["scenario"], config["scale"])
+    if config["mysql"]:
+        connection_params = dict(config["mysql"], database=BENCHMARK_DATABASE)
+    else:
+        connection_params = {"database": BENCHMARK_DATABASE}
+        use_synthetic_connections(tables)
+
+    output_dir = tempfile.mkdtemp(prefix="json_export_bench_")
+    try:
+        runner = {"exporter": run_exporter, "cli": run_cli, "gui": run_gui}[config["driver"]]
+        started = time.perf_counter()
+        rows, stats = runner(config, connection_params, output_dir)
+        seconds = time.perf_counter() - started
+        if rows is None:
+            rows = sum(table.row_count for table in tables.values())
+        size = output_size(output_dir)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    return {
+        "scenario": config["scenario"],
+        "driver": config["driver"],
+        "format": config["format"],
+        "workers": config["workers"],
+        "compression": config["compression"],
+        "pipeline_memory_mb": config["pipeline_memory_mb"],
+        "json_backend": JSONEncoder(config["json_backend"]).backend,
+        "rows": rows,
+        "output_bytes": size,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds, 1),
+        "mb_per_second": round(size / seconds / (1024 * 1024), 2),
+        "peak_rss_mb": peak_rss_mb(),
+        "phase_seconds": stats["phase_seconds"] if stats else None,
+        "phase_cpu_seconds": stats["phase_cpu_seconds"] if stats else None
+    }
+
+
+def result_key(result):
+    return (result["scenario"], result["driver"], result["format"], result["workers"], result["compression"],
+            result.get("pipeline_memory_mb"))
+
+
+def compare_results(results, baseline_file, tolerance):
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = {result_key(result): result for result in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"\nCompared with {baseline_file} (tolerance {tolerance:.0f}%):")
+    for result in results:
+        previous = baseline.get(result_key(result))
+        if previous is None:
+            continue
+        change = (result["rows_per_second"] - previous["rows_per_second"]) * 100.0 / previous["rows_per_second"]
+        flag = ""
+        if change < -tolerance:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"   {result['scenario']:<15} {result['format']:<15} workers={result['workers']:<3} "
+              f"{previous['rows_per_second']:>12,.0f} -> {result['rows_per_second']:>12,.0f} rows/s "
+              f"({change:+.1f}%){flag}")
+    return regressions
+
+
+def parse_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the MySQL to JSON export paths on synthetic tables.")
+    parser.add_argument("--scenarios", type=parse_list, default=list(SCENARIOS),
+                        help=f"comma-separated scenarios (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--formats", type=parse_list, default=["single_file", "separate_files", "json_lines"],
+                        help=f"comma-separated export formats out of {', '.join(EXPORT_FORMATS)} (default: all)")
+    parser.add_argument("--workers", type=lambda value: [int(item) for item in parse_list(value)], default=[1, 4],
+                        help="comma-separated worker counts (default: 1,4)")
+    parser.add_argument("--driver", choices=DRIVERS, default="exporter",
+                        help="exporter calls export_engine.export_database directly, cli runs "
+                             "export_database_to_json with scripted answers, gui runs DatabaseExportThread.run "
+                             "(needs PyQt5)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every table's row count (default: 1.0)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--split-ranges", type=int, default=1,
+                        help="key ranges per table when workers > 1 (default: no splitting)")
+    parser.add_argument("--compress", choices=sorted(COMPRESSION_SUFFIXES))
+    parser.add_argument("--pipeline-memory", type=int, metavar="MB",
+                        help="run the pipelined export with this memory budget (default: not pipelined)")
+    parser.add_argument("--json-backend", choices=("orjson", "json"))
+    parser.add_argument("--json-style", choices=("pretty", "compact"), default="pretty")
+    parser.add_argument("--mysql", metavar="HOST:USER:PASSWORD",
+                        help=f"load the synthetic tables into database '{BENCHMARK_DATABASE}' on a real server "
+                             "instead of using the in-process stand-in")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="where to write the results (default: benchmark_results.json)")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="compare rows/s with an earlier results file and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=10.0,
+                        help="allowed rows/s drop in percent before --compare reports a regression (default: 10)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    unknown = [scenario for scenario in args.scenarios if scenario not in SCENARIOS]
+    unknown += [export_format for export_format in args.formats if export_format not in EXPORT_FORMATS]
+    if unknown:
+        parser.error(f"Unknown scenario or format: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child))))
+        return 0
+
+    mysql_params = None
+    if args.mysql:
+        host, user, password = (args.mysql.split(':', 2) + ["", ""])[:3]
+        mysql_params = {"host": host, "user": user, "password": password}
+
+    results = []
+    for scenario in args.scenarios:
+        if mysql_params:
+            print(f"Loading scenario {scenario} into {BENCHMARK_DATABASE}...")
+            connection = mysql.connector.connect(**mysql_params)
+            cursor = connection.cursor()
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{BENCHMARK_DATABASE}`")
+            cursor.execute(f"DROP DATABASE `{BENCHMARK_DATABASE}`")
+            cursor.execute(f"CREATE DATABASE `{BENCHMARK_DATABASE}`")
+            cursor.execute(f"USE `{BENCHMARK_DATABASE}`")
+            cursor.close()
+            load_into_mysql(connection, build_scenario(scenario, args.scale))
+            connection.close()
+
+        for export_format in args.formats:
+            for workers in args.workers:
+                config = {
+                    "scenario": scenario, "driver": args.driver, "format": export_format, "workers": workers,
+                    "scale": args.scale, "batch_size": args.batch_size, "split_ranges": args.split_ranges,
+                    "compression": args.compress, "pipeline_memory_mb": args.pipeline_memory,
+                    "json_backend": args.json_backend,
+                    "json_style": args.json_style, "mysql": mysql_params
+                }
+                # A fresh process per run keeps peak RSS and imports independent
+                completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", json.dumps(config)],
+                                           capture_output=True, text=True)
+                if completed.returncode != 0:
+                    print(f"   {scenario:<15} {export_format:<15} workers={workers:<3} FAILED")
+                    print(completed.stderr.strip())
+                    continue
+                result = json.loads(completed.stdout.strip().splitlines()[-1])
+                results.append(result)
+                print(f"   {scenario:<15} {export_format:<15} workers={workers:<3} "
+                      f"{result['rows_per_second']:>12,.0f} rows/s {result['mb_per_second']:>8.2f} MB/s "
+                      f"peak RSS {result['peak_rss_mb']} MB")
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "results": results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare and compare_results(results, args.compare, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
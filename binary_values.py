@@ -0,0 +1,120 @@
+import base64
+import hashlib
+import os
+import threading
+
+from export_streaming import convert_value
+
+# How bytes values (BLOB, BINARY, VARBINARY, GEOMETRY columns) are written:
+#   text    decoded as UTF-8 with invalid bytes dropped; the original
+#           behaviour, lossy for anything that is not text
+#   base64  the exact bytes as an inline base64 string
+#   files   values over the threshold go to side files named by their
+#           SHA-256, written once however often they occur, and the row
+#           holds a reference; smaller values are inlined as base64
+BINARY_STRATEGIES = ("text", "base64", "files")
+DEFAULT_BLOB_THRESHOLD = 64 * 1024
+
+BINARY_COLUMN_TYPES = (
+    "binary", "varbinary", "tinyblob", "blob", "mediumblob", "longblob",
+    "geometry", "point", "linestring", "polygon", "multipoint", "multilinestring", "multipolygon",
+    "geometrycollection"
+)
+
+
+def binary_columns(columns, column_types):
+    # Columns whose values come back from the server as bytes
+    return [column for column in columns
+            if (column_types.get(column) or "").split("(")[0].strip().lower() in BINARY_COLUMN_TYPES]
+
+
+def decode_binary(value, base_dir):
+    # The bytes behind an exported value; side file paths are relative to
+    # the export directory
+    if isinstance(value, str):
+        return base64.b64decode(value)
+    if isinstance(value, dict) and "file" in value:
+        with open(os.path.join(base_dir, value["file"]), 'rb') as f:
+            return f.read()
+    return value
+
+
+class BinaryValues:
+    def __init__(self, strategy="base64", threshold=DEFAULT_BLOB_THRESHOLD):
+        if strategy not in BINARY_STRATEGIES:
+            raise ValueError(f"Unknown binary strategy '{strategy}', expected one of {', '.join(BINARY_STRATEGIES)}")
+        self.strategy = strategy
+        self.threshold = max(0, int(threshold))
+        self.blob_dir = None
+        self.blob_dir_name = None
+        self._lock = threading.Lock()
+        self.files_written = 0
+        self.bytes_written = 0
+        self.duplicates = 0
+        self._claimed = set()
+
+    def bind(self, output_dir, database_name):
+        # Side files go to <output_dir>/<database>_blobs/<2 hex digits>/<sha256>
+        self.blob_dir_name = f"{database_name}_blobs"
+        self.blob_dir = os.path.join(output_dir, self.blob_dir_name)
+
+    def settings(self):
+        settings = {"encoding": self.strategy}
+        if self.strategy == "files":
+            settings["threshold"] = self.threshold
+            settings["directory"] = self.blob_dir_name
+        return settings
+
+    def table_header(self, columns):
+        # Tells a reader which columns to decode
+        return dict(self.settings(), columns=columns)
+
+    def describe(self):
+        details = self.settings()
+        if self.strategy == "files":
+            with self._lock:
+                details.update(files_written=self.files_written, bytes_written=self.bytes_written,
+                               duplicates=self.duplicates)
+        return details
+
+    def convert(self, value):
+        if isinstance(value, (bytes, bytearray)):
+            return self.encode(bytes(value))
+        return convert_value(value)
+
+    def encode(self, value):
+        if self.strategy == "text":
+            return value.decode('utf-8', errors='ignore')
+        if self.strategy == "files" and len(value) > self.threshold:
+            return self._write_blob(value)
+        return base64.b64encode(value).decode('ascii')
+
+    def _write_blob(self, value):
+        digest = hashlib.sha256(value).hexdigest()
+        path = os.path.join(self.blob_dir, digest[:2], digest)
+        # The first worker to claim a digest writes it; the others count a
+        # duplicate, so the totals are exact however the workers interleave
+        with self._lock:
+            write = digest not in self._claimed and not os.path.exists(path)
+            if write:
+                self._claimed.add(digest)
+                self.files_written += 1
+                self.bytes_written += len(value)
+            else:
+                self.duplicates += 1
+        if write:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Written under another name first, so a failed run leaves no
+                # truncated file that a later run would take for a duplicate
+                temp_path = f"{path}.part"
+                with open(temp_path, 'wb') as f:
+                    f.write(value)
+                os.replace(temp_path, path)
+            except BaseException:
+                with self._lock:
+                    self._claimed.discard(digest)
+                    self.files_written -= 1
+                    self.bytes_written -= len(value)
+                raise
+        return {"file": f"{self.blob_dir_name}/{digest[:2]}/{digest}", "sha256": digest, "size": len(value)}
@@ -0,0 +1,66 @@
+import json
+import os
+import threading
+
+
+def checkpoint_path(output_dir, database_name):
+    return os.path.join(output_dir, f'{database_name}_export_checkpoint.json')
+
+
+class ExportCheckpoint:
+    def __init__(self, path, database_name, export_format, exported_at, tables=None):
+        self._lock = threading.Lock()
+        self.path = path
+        self.database_name = database_name
+        self.export_format = export_format
+        self.exported_at = exported_at
+        self.tables = tables or {}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(path, data["database"], data["export_format"], data["exported_at"], data.get("tables"))
+
+    def table_state(self, table_name):
+        with self._lock:
+            state = self.tables.get(table_name)
+            return dict(state) if state else None
+
+    def update_table(self, table_name, **state):
+        with self._lock:
+            self.tables.setdefault(table_name, {}).update(state)
+            self._save()
+
+    def completed_tables(self):
+        with self._lock:
+            return [name for name, state in self.tables.items() if state.get("status") == "completed"]
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _save(self):
+        data = {
+            "database": self.database_name,
+            "export_format": self.export_format,
+            "exported_at": self.exported_at,
+            "tables": self.tables
+        }
+        # Write to a temporary file and swap it in so a crash mid-write never
+        # leaves a truncated manifest behind.
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+        os.replace(temp_path, self.path)
+
+
+def open_checkpoint(output_dir, database_name, export_format, exported_at, resume=False):
+    path = checkpoint_path(output_dir, database_name)
+    if resume and os.path.exists(path):
+        checkpoint = ExportCheckpoint.load(path)
+        if checkpoint.database_name != database_name or checkpoint.export_format != export_format:
+            raise ValueError(f"Checkpoint {os.path.basename(path)} belongs to a {checkpoint.export_format} "
+                             f"export of '{checkpoint.database_name}' and cannot be resumed as {export_format}")
+        return checkpoint, True
+    return ExportCheckpoint(path, database_name, export_format, exported_at), False
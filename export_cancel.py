@@ -0,0 +1,82 @@
+import threading
+
+import mysql.connector
+
+from export_streaming import ExportCancelled
+
+
+class ExportCancellation:
+    # Cancels an export from any thread. The flag alone only stops an export
+    # between batches; a query that is still executing, or a batch that is
+    # still being read, is interrupted with KILL QUERY from a side
+    # connection, so the server stops working on it and the blocked read
+    # fails straight away.
+    def __init__(self, connection_params, log=None):
+        self.connection_params = connection_params
+        self.log = log
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._connection_ids = {}
+        # Set only by cancel(); interrupt() stops the workers without it
+        self.requested = False
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def is_cancelled(self):
+        return self._event.is_set()
+
+    def register(self, connection):
+        # Called before a connection runs export queries. Registering after
+        # cancel() raises, so a worker that is just starting stops at once.
+        with self._lock:
+            self._connection_ids[id(connection)] = getattr(connection, "connection_id", None)
+        if self._event.is_set():
+            self.unregister(connection)
+            raise ExportCancelled("export")
+
+    def unregister(self, connection):
+        with self._lock:
+            self._connection_ids.pop(id(connection), None)
+
+    def cancel(self, wait=False):
+        # A cancel asked for by the user: the export ends with ExportCancelled
+        self.requested = True
+        self.interrupt(wait)
+
+    def interrupt(self, wait=False):
+        # Stops every worker the same way, e.g. after one of them failed, but
+        # leaves that failure as the error the export reports
+        if self._event.is_set():
+            return
+        self._event.set()
+        with self._lock:
+            connection_ids = [connection_id for connection_id in self._connection_ids.values() if connection_id]
+        if not connection_ids:
+            return
+        # Connecting can take a while, so a GUI thread does not wait for it
+        killer = threading.Thread(target=self._kill_queries, args=(connection_ids,), name="kill-queries",
+                                  daemon=True)
+        killer.start()
+        if wait:
+            killer.join()
+
+    def _kill_queries(self, connection_ids):
+        try:
+            side_connection = mysql.connector.connect(**self.connection_params)
+            try:
+                cursor = side_connection.cursor()
+                for connection_id in connection_ids:
+                    try:
+                        cursor.execute(f"KILL QUERY {int(connection_id)}")
+                    except mysql.connector.Error:
+                        # The query finished, or the session is already gone
+                        pass
+                cursor.close()
+            finally:
+                side_connection.close()
+        except mysql.connector.Error as err:
+            # The export still stops after the batch being read
+            if self.log:
+                self.log(f"Could not interrupt running queries: {err}")
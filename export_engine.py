@@ -0,0 +1,326 @@
+import os
+from datetime import datetime
+
+import mysql.connector
+
+from checkpoint import open_checkpoint
+from export_cancel import ExportCancellation
+from export_profiling import ExportProfiler, write_prometheus_textfile
+from export_snapshot import ExportSnapshot
+from export_progress import format_file_size
+from export_streaming import DEFAULT_BATCH_SIZE, ExportCancelled, JSONDatabaseWriter
+from incremental import (parse_watermark_specs, resolve_watermark_columns, load_previous_watermarks,
+                         plan_incremental)
+from json_encoder import DEFAULT_ENCODER
+from output_compression import open_output, uncompressed_size
+from parallel_export import DEFAULT_WORKERS, MAX_WORKERS, DEFAULT_SPLIT_RANGES, DEFAULT_SPLIT_MIN_ROWS, TableExporter
+from table_metadata import load_table_metadata, summarize_metadata
+
+EXPORT_FORMATS = ("single_file", "separate_files", "json_lines")
+
+
+class ExportJob:
+    # Everything an export does once the tables are chosen: metadata,
+    # checkpoint and watermark planning, the table exports and the summary.
+    # The CLI and the GUI only collect settings and show progress; log
+    # receives the status lines both of them print.
+    def __init__(self, connection_params, selected_tables, export_format, output_dir,
+                 batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS, split_ranges=DEFAULT_SPLIT_RANGES,
+                 split_min_rows=DEFAULT_SPLIT_MIN_ROWS, use_checkpoint=False, resume=False, watermark_specs=None,
+                 compression=None, encoder=DEFAULT_ENCODER, exact_counts=False, profiler=None,
+                 timing_report=None, prometheus_textfile=None, pipeline_memory=None, consistent_snapshot=False,
+                 snapshot_lock="flush", binary=None, total_tables_in_db=None, log=None, on_table_start=None,
+                 on_batch=None, is_cancelled=None):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{export_format}', expected one of {', '.join(EXPORT_FORMATS)}")
+        self.connection_params = connection_params
+        self.database_name = connection_params["database"]
+        self.selected_tables = selected_tables
+        self.export_format = export_format
+        self.output_dir = output_dir
+        self.batch_size = batch_size
+        self.workers = workers
+        self.split_ranges = split_ranges
+        self.split_min_rows = split_min_rows
+        self.use_checkpoint = use_checkpoint
+        self.resume = resume
+        self.watermark_specs = watermark_specs
+        self.compression = compression
+        self.encoder = encoder
+        self.exact_counts = exact_counts
+        self.profiler = profiler or ExportProfiler()
+        self.timing_report = timing_report
+        self.prometheus_textfile = prometheus_textfile
+        self.pipeline_memory = pipeline_memory
+        self.binary = binary
+        self.total_tables_in_db = total_tables_in_db
+        self.log = log
+        self.on_table_start = on_table_start
+        self.on_batch = on_batch
+        self.is_cancelled = is_cancelled
+        self.cancellation = ExportCancellation(connection_params, log=self._log)
+        self.snapshot = None
+        if consistent_snapshot:
+            self.snapshot = ExportSnapshot(connection_params, min(int(workers), MAX_WORKERS), snapshot_lock,
+                                           log=self._log)
+
+        self.summary_file = os.path.join(output_dir, f'{self.database_name}_export_summary.json')
+        self.export_metadata = None
+        self.table_details = None
+        self.checkpoint = None
+        self.exporter = None
+        self.output_file = None
+        self.database_output = None
+        self.database_writer = None
+        self.exported_files = []
+        self.header_files = []
+        self.uncompressed_sizes = {}
+        self.table_stats = {}
+        self.watermarks = {}
+        self.total_rows = 0
+        self.completed = False
+
+    def _log(self, message):
+        if self.log:
+            self.log(message)
+
+    def cancel(self):
+        # Safe to call from any thread, e.g. a GUI's Cancel button: running
+        # queries are killed on the server and the export stops within a
+        # batch instead of after the current table
+        self.cancellation.cancel()
+
+    def cancel_requested(self):
+        return self.cancellation.cancelled or bool(self.is_cancelled and self.is_cancelled())
+
+    def user_cancelled(self):
+        # Workers also stop when another one failed; only this is a cancel
+        return self.cancellation.requested or bool(self.is_cancelled and self.is_cancelled())
+
+    def prepare(self, connection):
+        single_file = self.export_format == "single_file"
+        self.export_metadata = {"database": self.database_name, "exported_at": datetime.now().isoformat()}
+        if self.total_tables_in_db is not None:
+            self.export_metadata["total_tables_in_db"] = self.total_tables_in_db
+        self.export_metadata.update({
+            "selected_tables_count": len(self.selected_tables),
+            "export_format": self.export_format,
+            "output_location": self.output_dir
+        })
+        if self.compression is not None:
+            self.export_metadata["compression"] = self.compression.describe()
+        if self.binary is not None:
+            self.binary.bind(self.output_dir, self.database_name)
+            self.export_metadata["binary"] = self.binary.settings()
+
+        if self.use_checkpoint or self.resume:
+            if single_file:
+                self._log("Checkpoints need separate or JSON Lines files; exporting without a checkpoint.")
+            else:
+                self.checkpoint, resumed = open_checkpoint(self.output_dir, self.database_name, self.export_format,
+                                                           self.export_metadata["exported_at"], resume=self.resume)
+                if resumed:
+                    self.export_metadata["exported_at"] = self.checkpoint.exported_at
+                    self._log(f"Resuming export from {os.path.basename(self.checkpoint.path)} "
+                              f"({len(self.checkpoint.completed_tables())} tables already complete)")
+                elif self.resume:
+                    self._log("No checkpoint found in the output directory; starting a new export.")
+
+        if self.snapshot is not None:
+            # Started before the watermark queries, so their upper bounds
+            # match the rows the snapshot sees
+            self._log("Starting a consistent snapshot on every export connection...")
+            self.profiler.begin_phase("snapshot")
+            self.export_metadata["snapshot"] = self.snapshot.begin(connection)
+            self.profiler.end_phase("snapshot")
+            if self.checkpoint is not None and self.checkpoint.completed_tables():
+                self._log("Tables completed before the interruption come from an earlier snapshot")
+
+        self._log(f"Reading details of {len(self.selected_tables)} tables...")
+        self.profiler.begin_phase("metadata")
+        cursor = connection.cursor()
+        try:
+            self.table_details = load_table_metadata(cursor, self.database_name, self.selected_tables,
+                                                     exact_counts=self.exact_counts)
+            incremental = None
+            if self.watermark_specs:
+                if single_file:
+                    self._log("Incremental exports need separate or JSON Lines files; exporting full tables.")
+                else:
+                    self.watermarks = load_previous_watermarks(self.summary_file)
+                    table_columns = resolve_watermark_columns(parse_watermark_specs(self.watermark_specs),
+                                                              self.table_details)
+                    incremental = plan_incremental(cursor, table_columns, self.watermarks)
+                    for table_name, plan in incremental.items():
+                        if plan["since"] is None:
+                            self._log(f"   {table_name}: full export, watermark {plan['column']} up to {plan['until']}")
+                        else:
+                            self._log(f"   {table_name}: rows with {plan['column']} after {plan['since']} "
+                                      f"up to {plan['until']}")
+            elif not single_file:
+                # The summary is rewritten; a later --watermark run carries
+                # on from the watermarks of the last incremental one
+                self.watermarks = load_previous_watermarks(self.summary_file)
+        finally:
+            cursor.close()
+        self.profiler.end_phase("metadata")
+
+        if single_file:
+            self.database_output = open_output(os.path.join(self.output_dir, f'{self.database_name}_database.json'),
+                                               self.compression)
+            self.output_file = self.database_output.name
+            self.database_writer = JSONDatabaseWriter(self.database_output, self.export_metadata, self.encoder)
+
+        self.exporter = TableExporter(self.connection_params, self.export_format, self.output_dir,
+                                      self.export_metadata, batch_size=self.batch_size, workers=self.workers,
+                                      split_ranges=self.split_ranges, split_min_rows=self.split_min_rows,
+                                      checkpoint=self.checkpoint, incremental=incremental,
+                                      compression=self.compression, encoder=self.encoder,
+                                      on_table_start=self.on_table_start, on_batch=self.on_batch,
+                                      is_cancelled=self.cancel_requested, profiler=self.profiler,
+                                      pipeline_memory=self.pipeline_memory, cancellation=self.cancellation,
+                                      snapshot_pool=self.snapshot.pool if self.snapshot is not None else None,
+                                      binary=self.binary)
+        return self.table_details
+
+    def export_tables(self, connection):
+        # Yields each table's result once it is complete, in selection order
+        self.profiler.begin_phase("export")
+        try:
+            for result in self.exporter.export_tables(connection, self.table_details, self.database_writer):
+                table_name = result["table_name"]
+                self.total_rows += result["row_count"]
+                self.table_stats[table_name] = result["stats"]
+                if "table_file" in result:
+                    self.exported_files.append(result["table_file"])
+                    if "uncompressed_size" in result:
+                        self.uncompressed_sizes[result["table_file"]] = result["uncompressed_size"]
+                if "header_file" in result:
+                    self.header_files.append(result["header_file"])
+                if "watermark" in result:
+                    self.watermarks[table_name] = result["watermark"]
+                yield result
+        except mysql.connector.Error as err:
+            # e.g. the key range query on the main connection was killed
+            if self.user_cancelled():
+                raise ExportCancelled("export") from err
+            raise
+        finally:
+            self.profiler.end_phase("export")
+
+    def finish(self):
+        # Closes the combined file or writes the summary; returns what was written
+        self.profiler.begin_phase("finalize")
+        if self.export_format == "single_file":
+            self.database_writer.close()
+            self.database_output.close()
+            outcome = {
+                "output_file": self.output_file,
+                "file_size": os.path.getsize(self.output_file),
+                "uncompressed_size": uncompressed_size(self.database_output)
+            }
+        else:
+            summary_data = self.export_metadata.copy()
+            summary_data["exported_files"] = self.exported_files
+            if self.header_files:
+                summary_data["header_files"] = self.header_files
+            summary_data["table_list"] = self.selected_tables
+            summary_data["table_metadata"] = summarize_metadata(self.table_details)
+            summary_data["table_stats"] = self.table_stats
+            summary_data["export_stats"] = self.exporter.stats.totals()
+            if self.watermarks:
+                summary_data["watermarks"] = self.watermarks
+            if self.binary is not None:
+                summary_data["binary"] = self.binary.describe()
+
+            output_files = self.exported_files + self.header_files
+            total_size = sum(os.path.getsize(f) for f in output_files)
+            total_uncompressed_size = None
+            if self.compression is not None:
+                total_uncompressed_size = sum(self.uncompressed_sizes.get(f, os.path.getsize(f)) for f in output_files)
+                summary_data["total_size"] = total_size
+                summary_data["total_uncompressed_size"] = total_uncompressed_size
+
+            self.encoder.write_file(self.summary_file, summary_data)
+
+            if self.checkpoint is not None:
+                # Every table is complete, nothing is left to resume
+                self.checkpoint.remove()
+
+            outcome = {
+                "summary_file": self.summary_file,
+                "summary_size": os.path.getsize(self.summary_file),
+                "exported_files": self.exported_files,
+                "total_size": total_size,
+                "total_uncompressed_size": total_uncompressed_size
+            }
+        self.profiler.end_phase("finalize")
+
+        if self.binary is not None and self.binary.strategy == "files":
+            self._log(f"Blob files: {self.binary.files_written} written "
+                      f"({format_file_size(self.binary.bytes_written)}), {self.binary.duplicates} duplicates skipped")
+        self.profiler.stop()
+        if self.profiler.memory_peak is not None:
+            self._log(f"Peak traced memory: {format_file_size(self.profiler.memory_peak)}")
+        if self.timing_report or self.prometheus_textfile:
+            report = self.profiler.report(self.export_metadata, self.exporter.workers, self.table_stats,
+                                          self.exporter.stats.totals())
+            if self.timing_report:
+                self.encoder.write_file(self.timing_report, report)
+                self._log(f"Timing report: {self.timing_report}")
+            if self.prometheus_textfile:
+                write_prometheus_textfile(self.prometheus_textfile, report)
+                self._log(f"Prometheus metrics: {self.prometheus_textfile}")
+
+        outcome["total_rows"] = self.total_rows
+        outcome["export_stats"] = self.exporter.stats.totals()
+        self.completed = True
+        return outcome
+
+    def abort(self):
+        # After a failed or cancelled export the combined file is incomplete.
+        # Partial table files are removed as their tables fail, except
+        # checkpointed ones, which the checkpoint resumes from.
+        if self.database_output is not None and not self.completed:
+            self.database_output.close()
+            if os.path.exists(self.output_file):
+                os.remove(self.output_file)
+                self._log(f"Removed incomplete file {os.path.basename(self.output_file)}")
+        if self.checkpoint is not None and os.path.exists(self.checkpoint.path):
+            self._log(f"Partial files kept for resuming, see {os.path.basename(self.checkpoint.path)}")
+        self.close()
+
+    def close(self):
+        if self.database_output is not None and not self.database_output.closed:
+            self.database_output.close()
+        if self.snapshot is not None:
+            self.snapshot.end()
+        self.profiler.stop()
+
+
+def export_database(connection_params, tables=None, export_format="json_lines", output_dir=".", **options):
+    # Runs a whole export without any front end, for embedding in other
+    # jobs: connection_params must name the database, tables defaults to
+    # every table and options are ExportJob's keyword arguments.
+    connection = mysql.connector.connect(**connection_params)
+    job = None
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SHOW TABLES")
+        all_tables = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        os.makedirs(output_dir, exist_ok=True)
+        job = ExportJob(connection_params, tables or all_tables, export_format, output_dir,
+                        total_tables_in_db=len(all_tables), **options)
+        job.prepare(connection)
+        for _ in job.export_tables(connection):
+            pass
+        return job.finish()
+    except BaseException:
+        if job is not None:
+            job.abort()
+        raise
+    finally:
+        if job is not None:
+            job.close()
+        connection.close()
@@ -0,0 +1,332 @@
+import queue
+import threading
+
+from export_stats import phase_clock
+from export_streaming import (DEFAULT_BATCH_SIZE, ExportCancelled, open_streaming_cursor, iter_row_batches,
+                              build_converters, convert_rows)
+from json_encoder import DEFAULT_ENCODER
+
+# An export runs each table through four stages:
+#   source     reads raw row batches from MySQL (QuerySource, KeysetSource)
+#   converter  turns them into JSON-ready dicts (RowConverter)
+#   encoder    serializes them (json_encoder.JSONEncoder, owned by the sink)
+#   sink       writes them out (any object with write_rows, e.g. the
+#              JSON*Writer classes in export_streaming)
+# Any stage can be swapped for an object with the same methods, so other
+# jobs can reuse the fetch and conversion path with their own sink.
+#
+# run_pipeline runs the stages one after the other on the calling thread.
+# run_pipelined gives fetching and converting/encoding a thread each, so the
+# next batch is read while the previous one is written; it needs a sink that
+# also has encode_rows and write_encoded.
+
+# Default cap on batches held between the fetch thread and the writer
+DEFAULT_PIPELINE_MEMORY = 64 * 1024 * 1024
+
+_DONE = object()
+
+
+class QuerySource:
+    # One streaming SELECT read in batches
+    def __init__(self, table_name, where=None, params=None, batch_size=DEFAULT_BATCH_SIZE):
+        self.table_name = table_name
+        self.where = where
+        self.params = params
+        self.batch_size = batch_size
+        self.description = None
+
+    def batch_written(self, last_row):
+        pass
+
+    def batches(self, connection, stats=None):
+        query = f"SELECT * FROM `{self.table_name}`"
+        if self.where:
+            query += f" WHERE {self.where}"
+
+        started = phase_clock()
+        data_cursor = open_streaming_cursor(connection)
+        data_cursor.execute(query, self.params)
+        self.description = data_cursor.description
+        if stats is not None:
+            stats.add_phase("query", started)
+
+        started = phase_clock()
+        for rows in iter_row_batches(data_cursor, self.batch_size):
+            if stats is not None:
+                stats.add_phase("fetch", started)
+            yield rows
+            started = phase_clock()
+
+        # Only reached once every row is read; a cancelled export leaves the
+        # rest of the result set unread and callers drop the connection
+        data_cursor.close()
+
+
+class KeysetSource:
+    # Each page is its own short query, so an interrupted export can restart
+    # from the last key written instead of from the beginning of the table.
+    def __init__(self, table_name, columns, key_column, page_size=DEFAULT_BATCH_SIZE, last_key=None,
+                 on_page=None):
+        self.table_name = table_name
+        self.key_column = key_column
+        self.key_index = columns.index(key_column)
+        self.page_size = max(1, int(page_size))
+        self.last_key = last_key
+        self.on_page = on_page
+        self.description = None
+
+    def batch_written(self, last_row):
+        # Called once a page is on disk, so on_page only ever records keys
+        # that are safely written
+        self.last_key = last_row[self.key_index]
+        if self.on_page:
+            self.on_page(self.last_key)
+
+    def batches(self, connection, stats=None):
+        # Reads ahead of batch_written when pipelined, so keeps its own key
+        last_key = self.last_key
+        page_cursor = open_streaming_cursor(connection)
+        try:
+            while True:
+                started = phase_clock()
+                if last_key is None:
+                    page_cursor.execute(
+                        f"SELECT * FROM `{self.table_name}` ORDER BY `{self.key_column}` LIMIT %s",
+                        (self.page_size,))
+                else:
+                    page_cursor.execute(
+                        f"SELECT * FROM `{self.table_name}` WHERE `{self.key_column}` > %s "
+                        f"ORDER BY `{self.key_column}` LIMIT %s",
+                        (last_key, self.page_size))
+                if stats is not None:
+                    stats.add_phase("query", started)
+                started = phase_clock()
+                rows = page_cursor.fetchall()
+                if not rows:
+                    break
+                self.description = page_cursor.description
+                if stats is not None:
+                    stats.add_phase("fetch", started)
+
+                yield rows
+                last_key = rows[-1][self.key_index]
+                if len(rows) < self.page_size:
+                    break
+        finally:
+            page_cursor.close()
+
+
+class RowConverter:
+    # Picks per-column converters from the first batch's cursor description
+    def __init__(self, columns, encoder=DEFAULT_ENCODER, binary=None):
+        self.columns = columns
+        self.encoder = encoder
+        self.binary = binary
+        self.converters = None
+
+    def bind(self, description):
+        self.converters = build_converters(description, self.encoder, self.binary)
+
+    def convert(self, rows):
+        return convert_rows(rows, self.columns, self.converters)
+
+
+def bind_converter(converter, source):
+    # The column names come from information_schema and the rows from
+    # SELECT *; a table altered in between would put values under the wrong
+    # names, so the first batch's description has to agree with them
+    found = [column[0] for column in source.description or []]
+    if [name.lower() for name in found] != [name.lower() for name in converter.columns]:
+        raise ValueError(f"The columns of `{source.table_name}` changed since its metadata was read: "
+                         f"expected {', '.join(converter.columns)}, got {', '.join(found)}")
+    converter.bind(source.description)
+
+
+def convert_batches(connection, source, converter, stats=None, is_cancelled=None):
+    # Yields JSON-ready row batches; the building block for custom sinks
+    bound = False
+    for rows in source.batches(connection, stats):
+        if is_cancelled and is_cancelled():
+            raise ExportCancelled(source.table_name)
+        if not bound:
+            bind_converter(converter, source)
+            bound = True
+        started = phase_clock()
+        table_data = converter.convert(rows)
+        if stats is not None:
+            stats.add_phase("convert", started)
+        yield table_data
+        # Resumed when the consumer asks for the next batch, i.e. once this
+        # one has been written
+        source.batch_written(rows[-1])
+
+
+def run_pipeline(connection, source, converter, sink, stats=None, on_batch=None, is_cancelled=None):
+    fetched_rows = 0
+    for table_data in convert_batches(connection, source, converter, stats, is_cancelled):
+        started = phase_clock()
+        sink.write_rows(table_data)
+        if stats is not None:
+            stats.add_phase("write", started)
+        fetched_rows += len(table_data)
+        if on_batch:
+            on_batch(len(table_data), fetched_rows)
+    return fetched_rows
+
+
+class MemoryBudget:
+    # Bytes held by batches between the fetch thread and the writer. The
+    # fetch thread waits while the budget is used up, so a fast server
+    # cannot run ahead of a slow disk; a single batch larger than the whole
+    # budget is still let through on its own. Raw rows are sized by what the
+    # rows before them encoded to, so nothing is read ahead of the first
+    # batch until it has been encoded.
+    def __init__(self, limit):
+        self.limit = max(1, int(limit))
+        self.used = 0
+        self.row_bytes = None
+        self.closed = False
+        self._condition = threading.Condition()
+
+    def acquire(self, row_count):
+        with self._condition:
+            while (self.used and (self.row_bytes is None or self.used + row_count * self.row_bytes > self.limit)
+                   and not self.closed):
+                self._condition.wait()
+            size = row_count * (self.row_bytes or 1)
+            self.used += size
+            return size
+
+    def encoded(self, size, row_count, encoded_size):
+        with self._condition:
+            self.row_bytes = max(1, encoded_size // row_count)
+            self.used += encoded_size - size
+            self._condition.notify_all()
+
+    def release(self, size):
+        with self._condition:
+            self.used -= size
+            self._condition.notify_all()
+
+    def close(self):
+        # Wakes a waiting fetch thread when the writer gives up
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+def run_pipelined(connection, source, converter, sink, stats=None, on_batch=None, is_cancelled=None,
+                  memory_budget=DEFAULT_PIPELINE_MEMORY):
+    # fetch thread -> encode thread -> writer (the calling thread). Both
+    # queues are unbounded, the budget is what bounds them: raw batches are
+    # counted at the size their rows last encoded to and encoded batches at
+    # their length, until the writer has written them. Errors and
+    # cancellation travel down the queues and are raised here.
+    budget = MemoryBudget(memory_budget)
+    fetched = queue.Queue()
+    encoded = queue.Queue()
+    stopped = threading.Event()
+
+    def fetch():
+        try:
+            for rows in source.batches(connection, stats):
+                if stopped.is_set():
+                    break
+                if is_cancelled and is_cancelled():
+                    raise ExportCancelled(source.table_name)
+                fetched.put((rows, budget.acquire(len(rows))))
+            fetched.put(_DONE)
+        except BaseException as err:
+            fetched.put(err)
+
+    def encode():
+        bound = False
+        try:
+            while True:
+                item = fetched.get()
+                if item is _DONE or isinstance(item, BaseException):
+                    encoded.put(item)
+                    return
+                if stopped.is_set():
+                    continue
+                rows, size = item
+                if not bound:
+                    bind_converter(converter, source)
+                    bound = True
+                started = phase_clock()
+                table_data = converter.convert(rows)
+                if stats is not None:
+                    stats.add_phase("convert", started)
+                started = phase_clock()
+                text = sink.encode_rows(table_data)
+                if stats is not None:
+                    stats.add_phase("write", started)
+                budget.encoded(size, len(rows), len(text))
+                encoded.put((text, len(rows), rows[-1], len(text)))
+        except BaseException as err:
+            encoded.put(err)
+
+    threads = [threading.Thread(target=fetch, name=f"fetch-{source.table_name}", daemon=True),
+               threading.Thread(target=encode, name=f"encode-{source.table_name}", daemon=True)]
+    for thread in threads:
+        thread.start()
+
+    fetched_rows = 0
+    try:
+        while True:
+            item = encoded.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            text, row_count, last_row, size = item
+            started = phase_clock()
+            sink.write_encoded(text, row_count)
+            if stats is not None:
+                stats.add_phase("write", started)
+            budget.release(size)
+            fetched_rows += row_count
+            if on_batch:
+                on_batch(row_count, fetched_rows)
+            source.batch_written(last_row)
+    finally:
+        stopped.set()
+        budget.close()
+        # The fetch thread stops after the batch it is reading, the encode
+        # thread once the fetch thread is done
+        for thread in threads:
+            thread.join()
+    return fetched_rows
+
+
+def _run(connection, source, converter, sink, stats, on_batch, is_cancelled, pipeline_memory):
+    try:
+        if pipeline_memory:
+            return run_pipelined(connection, source, converter, sink, stats=stats, on_batch=on_batch,
+                                 is_cancelled=is_cancelled, memory_budget=pipeline_memory)
+        return run_pipeline(connection, source, converter, sink, stats=stats, on_batch=on_batch,
+                            is_cancelled=is_cancelled)
+    except ExportCancelled:
+        raise
+    except Exception as err:
+        # A query interrupted by KILL QUERY fails with a MySQL error; after a
+        # cancel that is the cancellation, not a failure of the table
+        if is_cancelled and is_cancelled():
+            raise ExportCancelled(source.table_name) from err
+        raise
+
+
+def stream_table(connection, table_name, columns, table_writer, batch_size=DEFAULT_BATCH_SIZE,
+                 on_batch=None, is_cancelled=None, where=None, params=None, stats=None, pipeline_memory=None,
+                 binary=None):
+    return _run(connection, QuerySource(table_name, where, params, batch_size),
+                RowConverter(columns, table_writer.encoder, binary), table_writer, stats, on_batch, is_cancelled,
+                pipeline_memory)
+
+
+def stream_table_keyset(connection, table_name, columns, key_column, table_writer, page_size=DEFAULT_BATCH_SIZE,
+                        last_key=None, on_batch=None, on_page=None, is_cancelled=None, stats=None,
+                        pipeline_memory=None, binary=None):
+    return _run(connection, KeysetSource(table_name, columns, key_column, page_size, last_key, on_page),
+                RowConverter(columns, table_writer.encoder, binary), table_writer, stats, on_batch, is_cancelled,
+                pipeline_memory)
@@ -0,0 +1,174 @@
+import cProfile
+import contextlib
+import os
+import re
+import time
+import tracemalloc
+from datetime import datetime
+
+# Phases of the whole run around the per-table ones in export_stats:
+# connect, metadata (information_schema and watermark queries), export
+# (every table) and finalize (closing files and writing the summary)
+RUN_PHASES = ("connect", "snapshot", "metadata", "export", "finalize")
+
+METRIC_PREFIX = "mysql_json_export"
+
+
+class ExportProfiler:
+    # Optional instrumentation on top of ExportStatistics. Run phases are
+    # always timed; tracemalloc and cProfile slow the export down, so they
+    # are opt-in.
+    def __init__(self, trace_memory=False, profile_dir=None):
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.run_phases = {}
+        self._phase_started = {}
+        self.memory_peak = None
+        self.profiles = []
+        self.profiles_skipped = []
+        self._started_tracing = False
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+
+    def stop(self):
+        if self.trace_memory and tracemalloc.is_tracing():
+            self._record_memory_peak()
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def begin_phase(self, name):
+        # process_time covers every thread, which is what a run phase needs
+        self._phase_started[name] = (time.perf_counter(), time.process_time())
+
+    def end_phase(self, name):
+        if name not in self._phase_started:
+            return
+        wall_started, cpu_started = self._phase_started.pop(name)
+        phase = self.run_phases.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0})
+        phase["wall_seconds"] += time.perf_counter() - wall_started
+        phase["cpu_seconds"] += time.process_time() - cpu_started
+
+    def reset_memory_peak(self):
+        if self.trace_memory and tracemalloc.is_tracing():
+            self._record_memory_peak()
+            tracemalloc.reset_peak()
+
+    def table_memory_peak(self):
+        if self.trace_memory and tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[1]
+        return None
+
+    def _record_memory_peak(self):
+        peak = tracemalloc.get_traced_memory()[1]
+        self.memory_peak = max(self.memory_peak or 0, peak)
+
+    @contextlib.contextmanager
+    def profiled(self, name):
+        if not self.profile_dir:
+            yield
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process, so tables
+            # running alongside a profiled one on other workers are skipped
+            self.profiles_skipped.append(name)
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile_file = os.path.join(self.profile_dir, re.sub(r"[^\w.-]", "_", name) + ".prof")
+            profile.dump_stats(profile_file)
+            self.profiles.append(profile_file)
+
+    def report(self, export_metadata, workers, table_stats, export_stats):
+        report = {
+            "database": export_metadata["database"],
+            "exported_at": export_metadata["exported_at"],
+            "export_format": export_metadata["export_format"],
+            "workers": workers,
+            "run_phases": {
+                name: {key: round(seconds, 3) for key, seconds in self.run_phases[name].items()}
+                for name in RUN_PHASES if name in self.run_phases
+            },
+            "export_stats": export_stats,
+            "table_stats": table_stats
+        }
+        if self.memory_peak is not None:
+            report["memory_peak_bytes"] = self.memory_peak
+        if self.profile_dir:
+            report["profiles"] = self.profiles
+            report["profiles_skipped"] = self.profiles_skipped
+        return report
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# Every metric describes the last run, so all of them are gauges
+PROMETHEUS_METRICS = {
+    "rows": "Rows exported by the last run",
+    "bytes_written": "Uncompressed JSON bytes written by the last run",
+    "duration_seconds": "Wall-clock duration of the table exports",
+    "rows_per_second": "Rows per second over the last run",
+    "phase_seconds": "Wall time per export phase, summed over tables",
+    "phase_cpu_seconds": "CPU time per export phase, summed over tables",
+    "run_phase_seconds": "Wall time per run phase",
+    "memory_peak_bytes": "Peak memory traced by tracemalloc",
+    "table_rows": "Rows exported per table",
+    "table_duration_seconds": "Export duration per table",
+    "table_rows_per_second": "Rows per second per table",
+    "last_success_timestamp_seconds": "Unix time the last run finished",
+}
+
+
+def write_prometheus_textfile(path, report):
+    # Format read by node_exporter's textfile collector. The file is replaced
+    # in one rename so the collector never sees half a file.
+    samples = {name: [] for name in PROMETHEUS_METRICS}
+
+    def add(name, value, **labels):
+        if value is None:
+            return
+        labels = dict({"database": report["database"]}, **labels)
+        label_text = ",".join(f'{key}="{_label(label)}"' for key, label in labels.items())
+        samples[name].append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {value}")
+
+    export_stats = report["export_stats"]
+    for name in ("rows", "bytes_written", "duration_seconds", "rows_per_second"):
+        add(name, export_stats[name])
+    for phase, seconds in export_stats["phase_seconds"].items():
+        add("phase_seconds", seconds, phase=phase)
+    for phase, seconds in export_stats["phase_cpu_seconds"].items():
+        add("phase_cpu_seconds", seconds, phase=phase)
+    for phase, seconds in report["run_phases"].items():
+        add("run_phase_seconds", seconds["wall_seconds"], phase=phase)
+    add("memory_peak_bytes", report.get("memory_peak_bytes"))
+    for table_name, stats in report["table_stats"].items():
+        add("table_rows", stats["rows"], table=table_name)
+        add("table_duration_seconds", stats["duration_seconds"], table=table_name)
+        add("table_rows_per_second", stats["rows_per_second"], table=table_name)
+    add("last_success_timestamp_seconds", round(datetime.now().timestamp(), 3))
+
+    lines = []
+    for name, help_text in PROMETHEUS_METRICS.items():
+        if samples[name]:
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            lines.extend(samples[name])
+
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(temp_path, path)
@@ -0,0 +1,149 @@
+import os
+import re
+import sys
+import threading
+import time
+from datetime import timedelta
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def format_duration(seconds):
+    return str(timedelta(seconds=int(seconds)))
+
+
+def format_file_size(size_bytes, uncompressed_bytes=None):
+    if uncompressed_bytes is not None:
+        return f"{format_file_size(size_bytes)}, {format_file_size(uncompressed_bytes)} uncompressed"
+    if size_bytes == 0:
+        return "0 B"
+    size_names = ["B", "KB", "MB", "GB"]
+    i = 0
+    size = float(size_bytes)
+    while size >= 1024.0 and i < len(size_names) - 1:
+        size /= 1024.0
+        i += 1
+    return f"{size:.1f} {size_names[i]}"
+
+
+def parse_file_size(text):
+    # The reverse of format_file_size: "500 MB", "1.5GB", "2048" (bytes)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?B?)\s*", text, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size '{text.strip()}', expected e.g. 500 MB or 1 GB")
+    unit = match.group(2).upper().rstrip("B")
+    return int(float(match.group(1)) * 1024 ** " KMGT".index(unit or " "))
+
+
+def format_rate(bytes_per_second):
+    return f"{bytes_per_second / (1024 * 1024):.1f} MB/s"
+
+
+def process_memory():
+    # Resident memory of this process in bytes: the current size where
+    # /proc is available, the peak elsewhere, None when neither can be read
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class ExportProgress:
+    # Tracks rows fetched and bytes written across every table of an export.
+    # Expected row counts come from load_table_metadata(); once a table
+    # finishes its estimate is replaced by the rows actually exported.
+    def __init__(self, table_row_counts):
+        self._lock = threading.Lock()
+        self.start_time = time.monotonic()
+        self.expected_rows = dict(table_row_counts)
+        self.total_tables = len(table_row_counts)
+        self.total_rows = sum(table_row_counts.values())
+        self.tables_done = 0
+        self.rows_done = 0
+        self.rows_fetched = 0
+        self.bytes_written = 0
+        self.table_rows = {}
+        self.active_tables = {}
+
+    def table_started(self, table_name):
+        with self._lock:
+            self.active_tables.setdefault(table_name, 0)
+
+    def add_rows(self, table_name, count, bytes_written=0):
+        with self._lock:
+            self.rows_done += count
+            self.rows_fetched += count
+            self.bytes_written += bytes_written
+            self.table_rows[table_name] = self.table_rows.get(table_name, 0) + count
+            self.active_tables[table_name] = self.active_tables.get(table_name, 0) + count
+
+    def add_completed_rows(self, table_name, count):
+        # Rows exported by an earlier, checkpointed run count towards the
+        # total but not towards the throughput of this one
+        with self._lock:
+            self.rows_done += count
+            self.table_rows[table_name] = self.table_rows.get(table_name, 0) + count
+
+    def table_finished(self, table_name):
+        with self._lock:
+            self.active_tables.pop(table_name, None)
+            self.tables_done += 1
+            self.total_rows += self.table_rows.get(table_name, 0) - self.expected_rows.get(table_name, 0)
+            self.expected_rows[table_name] = self.table_rows.get(table_name, 0)
+
+    def active_progress(self):
+        # (table, rows so far, expected rows) for every table in flight
+        with self._lock:
+            return [(table_name, self.table_rows.get(table_name, 0), self.expected_rows.get(table_name, 0))
+                    for table_name in self.active_tables]
+
+    def elapsed(self):
+        return time.monotonic() - self.start_time
+
+    def percent(self):
+        with self._lock:
+            if self.total_rows:
+                return min(100.0, self.rows_done * 100.0 / self.total_rows)
+            if self.total_tables:
+                return self.tables_done * 100.0 / self.total_tables
+            return 100.0
+
+    def rates(self):
+        elapsed = self.elapsed()
+        with self._lock:
+            if elapsed <= 0:
+                return 0.0, 0.0
+            return self.rows_fetched / elapsed, self.bytes_written / elapsed
+
+    def eta(self):
+        rows_per_second, _ = self.rates()
+        with self._lock:
+            remaining = max(0, self.total_rows - self.rows_done)
+        if not remaining:
+            return 0.0
+        if not rows_per_second:
+            return None
+        return remaining / rows_per_second
+
+    def throughput_text(self):
+        rows_per_second, bytes_per_second = self.rates()
+        eta = self.eta()
+        eta_text = format_duration(eta) if eta is not None else "--:--:--"
+        return f"{rows_per_second:,.0f} rows/s | {format_rate(bytes_per_second)} | ETA {eta_text}"
+
+    def status_text(self):
+        throughput = self.throughput_text()
+        with self._lock:
+            text = f"{self.tables_done}/{self.total_tables} tables | {self.rows_done:,}/{self.total_rows:,} rows"
+            if self.active_tables:
+                text += f" | {len(self.active_tables)} in flight"
+        return f"{text} | {throughput}"
@@ -0,0 +1,157 @@
+import queue
+from datetime import datetime
+
+import mysql.connector
+
+# flush: start the transactions under FLUSH TABLES WITH READ LOCK, held only
+# until they have all started; none: start them back to back without a lock
+SNAPSHOT_LOCKS = ("flush", "none")
+
+
+def start_snapshot(connection):
+    cursor = connection.cursor()
+    cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+    cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+    cursor.close()
+
+
+def read_binlog_position(cursor):
+    # Binary log coordinates and executed GTIDs of the server, or None when
+    # binary logging is off or the user lacks REPLICATION CLIENT. MySQL 8.4
+    # renamed SHOW MASTER STATUS.
+    for statement in ("SHOW BINARY LOG STATUS", "SHOW MASTER STATUS"):
+        try:
+            cursor.execute(statement)
+        except mysql.connector.Error:
+            continue
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        status = dict(zip(cursor.column_names, row))
+        position = {"binlog_file": status.get("File"), "binlog_position": status.get("Position")}
+        if status.get("Executed_Gtid_Set"):
+            position["gtid_executed"] = status["Executed_Gtid_Set"].replace("\n", "")
+        return position
+    return None
+
+
+class _SnapshotConnection:
+    # Closing hands the connection back to its pool, so its transaction and
+    # snapshot carry over to the next table a worker exports
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def close(self):
+        self._pool.put_back(self._connection)
+
+
+class SnapshotPool:
+    # Stands in for a MySQLConnectionPool whose connections are all in the
+    # same snapshot; get_connection blocks until one is free
+    def __init__(self, connections):
+        self.connections = connections
+        self.pool_size = len(connections)
+        self._idle = queue.Queue()
+        for connection in connections:
+            self._idle.put(connection)
+
+    def get_connection(self):
+        return _SnapshotConnection(self, self._idle.get())
+
+    def put_back(self, connection):
+        self._idle.put(connection)
+
+
+class ExportSnapshot:
+    # Makes every connection of an export read the database as of one point
+    # in time: the main connection and one connection per worker each start
+    # a REPEATABLE READ transaction WITH CONSISTENT SNAPSHOT. Rows that
+    # reference each other across tables then match, although the tables are
+    # read at different times. Only InnoDB (transactional) tables are covered.
+    #
+    # With lock "flush" the transactions are started under FLUSH TABLES WITH
+    # READ LOCK, which needs the RELOAD privilege; the lock waits for
+    # running statements and is released as soon as the transactions have
+    # started, so writes are blocked for milliseconds, not for the export.
+    # With "none" they are started back to back and may differ by whatever
+    # commits in between.
+    def __init__(self, connection_params, workers=1, lock="flush", log=None):
+        if lock not in SNAPSHOT_LOCKS:
+            raise ValueError(f"Unknown snapshot lock '{lock}', expected one of {', '.join(SNAPSHOT_LOCKS)}")
+        self.connection_params = connection_params
+        self.workers = max(1, int(workers))
+        self.lock = lock
+        self.log = log
+        self.connection = None
+        self.pool = None
+        self.details = None
+
+    def begin(self, connection):
+        # Worker connections are opened first, so the lock is not held
+        # while connecting
+        worker_connections = []
+        try:
+            if self.workers > 1:
+                for _ in range(self.workers):
+                    worker_connections.append(mysql.connector.connect(**self.connection_params))
+            cursor = connection.cursor()
+            locked = False
+            try:
+                if self.lock == "flush":
+                    cursor.execute("FLUSH TABLES WITH READ LOCK")
+                    locked = True
+                for snapshot_connection in [connection] + worker_connections:
+                    start_snapshot(snapshot_connection)
+                started_at = datetime.now().isoformat()
+                position = read_binlog_position(cursor)
+            finally:
+                if locked:
+                    cursor.execute("UNLOCK TABLES")
+                cursor.close()
+        except BaseException:
+            for worker_connection in worker_connections:
+                worker_connection.close()
+            raise
+
+        self.connection = connection
+        if worker_connections:
+            self.pool = SnapshotPool(worker_connections)
+        self.details = {
+            # Without the lock the snapshots are only as close as their start times
+            "consistent": self.lock == "flush",
+            "lock": self.lock,
+            "started_at": started_at,
+            "connections": 1 + len(worker_connections)
+        }
+        if position is None:
+            if self.log:
+                self.log("Snapshot taken; binary log position not available (binary logging off or "
+                         "no REPLICATION CLIENT privilege)")
+        else:
+            self.details.update(position)
+            if self.log:
+                self.log(f"Snapshot taken at {position['binlog_file']}:{position['binlog_position']}")
+        return self.details
+
+    def end(self):
+        # Nothing was written, so the transactions are simply dropped: the
+        # main connection, which belongs to the caller, is rolled back and
+        # the worker connections are closed
+        connections = [self.connection] if self.connection is not None else []
+        if self.pool is not None:
+            connections += self.pool.connections
+        for connection in connections:
+            try:
+                if connection is self.connection:
+                    connection.rollback()
+                else:
+                    connection.close()
+            except mysql.connector.Error:
+                # e.g. rows left unread by a cancelled export
+                pass
+        self.connection = None
+        self.pool = None
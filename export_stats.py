@@ -0,0 +1,105 @@
+import threading
+import time
+
+# query: executing the SELECT; fetch: reading batches from the server;
+# convert: turning rows into JSON-ready dicts; write: encoding and writing
+# them; merge: appending parallel fragments to the final file
+PHASES = ("query", "fetch", "convert", "write", "merge")
+
+
+def phase_clock():
+    # Wall time and CPU time of the calling thread, so a phase that waits on
+    # the server or the disk shows up as wall time without CPU time
+    return time.perf_counter(), time.thread_time()
+
+
+class TableStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rows = 0
+        self.bytes_written = 0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.cpu_phases = dict.fromkeys(PHASES, 0.0)
+        self.memory_peak = None
+        self.started = None
+        self.finished = None
+
+    def start(self):
+        with self._lock:
+            if self.started is None:
+                self.started = time.perf_counter()
+
+    def finish(self):
+        with self._lock:
+            self.finished = time.perf_counter()
+
+    def add_rows(self, count, bytes_written=0):
+        with self._lock:
+            self.rows += count
+            self.bytes_written += bytes_written
+
+    def add_phase(self, phase, started, ended=None):
+        ended = ended or phase_clock()
+        with self._lock:
+            self.phases[phase] += ended[0] - started[0]
+            self.cpu_phases[phase] += ended[1] - started[1]
+
+    def duration(self):
+        with self._lock:
+            if self.started is None:
+                return 0.0
+            return (self.finished or time.perf_counter()) - self.started
+
+    def to_dict(self):
+        duration = self.duration()
+        with self._lock:
+            table_dict = {
+                "rows": self.rows,
+                "bytes_written": self.bytes_written,
+                "duration_seconds": round(duration, 3),
+                "rows_per_second": round(self.rows / duration, 1) if duration else None,
+                "phase_seconds": {phase: round(seconds, 3) for phase, seconds in self.phases.items()},
+                "phase_cpu_seconds": {phase: round(seconds, 3) for phase, seconds in self.cpu_phases.items()}
+            }
+            if self.memory_peak is not None:
+                table_dict["memory_peak_bytes"] = self.memory_peak
+            return table_dict
+
+
+class ExportStatistics:
+    # Counts rows, bytes and time per phase while the export runs, so the
+    # summary never has to re-read the files that were written.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.tables = {}
+
+    def table(self, table_name):
+        with self._lock:
+            return self.tables.setdefault(table_name, TableStats())
+
+    def totals(self):
+        with self._lock:
+            tables = list(self.tables.values())
+        phases = dict.fromkeys(PHASES, 0.0)
+        cpu_phases = dict.fromkeys(PHASES, 0.0)
+        rows = 0
+        bytes_written = 0
+        for stats in tables:
+            table_dict = stats.to_dict()
+            rows += table_dict["rows"]
+            bytes_written += table_dict["bytes_written"]
+            for phase, seconds in table_dict["phase_seconds"].items():
+                phases[phase] += seconds
+            for phase, seconds in table_dict["phase_cpu_seconds"].items():
+                cpu_phases[phase] += seconds
+        duration = time.perf_counter() - self.started
+        return {
+            "tables": len(tables),
+            "rows": rows,
+            "bytes_written": bytes_written,
+            "duration_seconds": round(duration, 3),
+            "rows_per_second": round(rows / duration, 1) if duration else None,
+            "phase_seconds": {phase: round(seconds, 3) for phase, seconds in phases.items()},
+            "phase_cpu_seconds": {phase: round(seconds, 3) for phase, seconds in cpu_phases.items()}
+        }
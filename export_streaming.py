@@ -0,0 +1,292 @@
+import shutil
+from datetime import datetime, date
+
+from mysql.connector.constants import FieldFlag, FieldType
+
+from json_encoder import DEFAULT_ENCODER
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def open_streaming_cursor(connection):
+    # An unbuffered cursor reads the result set from the socket as rows are
+    # requested, so fetchmany() never holds more than one batch client side.
+    return connection.cursor(buffered=False)
+
+
+def iter_row_batches(cursor, batch_size=DEFAULT_BATCH_SIZE):
+    batch_size = max(1, int(batch_size))
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def convert_value(value):
+    if value is None:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='ignore')
+    if isinstance(value, (int, float, str, bool)):
+        return value
+    return str(value)
+
+
+def _convert_temporal(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return convert_value(value)
+
+
+def _convert_to_string(value):
+    # DECIMAL and TIME come back as Decimal and timedelta
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+
+def _convert_binary(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='ignore')
+    return convert_value(value)
+
+
+PASSTHROUGH_TYPES = {
+    FieldType.TINY, FieldType.SHORT, FieldType.LONG, FieldType.LONGLONG, FieldType.INT24, FieldType.YEAR,
+    FieldType.FLOAT, FieldType.DOUBLE
+}
+FLOAT_TYPES = {FieldType.FLOAT, FieldType.DOUBLE}
+TEMPORAL_TYPES = {FieldType.DATE, FieldType.NEWDATE, FieldType.DATETIME, FieldType.TIMESTAMP}
+STRING_TYPES = {
+    FieldType.VARCHAR, FieldType.VAR_STRING, FieldType.STRING, FieldType.ENUM,
+    FieldType.TINY_BLOB, FieldType.MEDIUM_BLOB, FieldType.LONG_BLOB, FieldType.BLOB
+}
+TYPE_CONVERTERS = {
+    FieldType.DATE: _convert_temporal,
+    FieldType.NEWDATE: _convert_temporal,
+    FieldType.DATETIME: _convert_temporal,
+    FieldType.TIMESTAMP: _convert_temporal,
+    FieldType.DECIMAL: _convert_to_string,
+    FieldType.NEWDECIMAL: _convert_to_string,
+    FieldType.TIME: _convert_to_string,
+}
+
+
+def build_converters(description, encoder=DEFAULT_ENCODER, binary=None):
+    # One converter per column that needs it, picked from the result set's
+    # type codes; integer, float and text columns are left out entirely.
+    # binary, a binary_values.BinaryValues, takes over bytes values from
+    # the lossy UTF-8 decoding.
+    if description is None:
+        return None
+    converters = []
+    for index, column in enumerate(description):
+        type_code = column[1]
+        flags = column[7] if len(column) > 7 else 0
+        if type_code in FLOAT_TYPES and encoder.float_converter:
+            converters.append((index, encoder.float_converter))
+            continue
+        if type_code in PASSTHROUGH_TYPES:
+            continue
+        if type_code in TEMPORAL_TYPES and encoder.native_temporal:
+            continue
+        if type_code in STRING_TYPES:
+            if flags & FieldFlag.BINARY:
+                converters.append((index, binary.convert if binary is not None else _convert_binary))
+            continue
+        if type_code == FieldType.GEOMETRY and binary is not None:
+            converters.append((index, binary.convert))
+            continue
+        converters.append((index, TYPE_CONVERTERS.get(type_code, convert_value)))
+    return converters
+
+
+def convert_rows(rows, columns, converters=None):
+    if converters is None:
+        converters = [(index, convert_value) for index in range(len(columns))]
+    if not rows or not converters:
+        return [dict(zip(columns, row)) for row in rows]
+
+    # Convert column by column across the whole batch, then rebuild the rows
+    value_columns = list(zip(*rows))
+    for index, convert in converters:
+        value_columns[index] = list(map(convert, value_columns[index]))
+    return [dict(zip(columns, values)) for values in zip(*value_columns)]
+
+
+def _format_rows(rows, encoder, level, first):
+    newline = encoder.newline(level)
+    parts = []
+    for row in rows:
+        parts.append('' if first else ',')
+        parts.append(newline + encoder.dumps(row, level))
+        first = False
+    return ''.join(parts)
+
+
+def _format_members(header, encoder, level):
+    newline = encoder.newline(level)
+    return ''.join(f'{newline}{encoder.dumps(key)}{encoder.key_separator}{encoder.dumps(value, level)},'
+                   for key, value in header.items())
+
+
+def _append_file(f, fragment_file):
+    with open(fragment_file, 'r', encoding='utf-8') as fragment:
+        shutil.copyfileobj(fragment, f)
+
+
+class JSONTableWriter:
+    def __init__(self, f, header, level=0, encoder=DEFAULT_ENCODER):
+        self.f = f
+        self.level = level
+        self.encoder = encoder
+        self.row_count = 0
+        self.rows_encoded = 0
+        self.bytes_written = 0
+
+        self.f.write('{' + _format_members(header, encoder, level + 1) +
+                     f'{encoder.newline(level + 1)}"data"{encoder.key_separator}[')
+
+    @classmethod
+    def reopen(cls, f, row_count, level=0, encoder=DEFAULT_ENCODER):
+        # Continue a table whose header and first row_count rows are already in f
+        writer = cls.__new__(cls)
+        writer.f = f
+        writer.level = level
+        writer.encoder = encoder
+        writer.row_count = row_count
+        writer.rows_encoded = row_count
+        writer.bytes_written = 0
+        return writer
+
+    def encode_rows(self, rows):
+        # Encoding is split from writing so a pipeline can encode the next
+        # batch on another thread while this one is written
+        text = _format_rows(rows, self.encoder, self.level + 2, first=not self.rows_encoded)
+        self.rows_encoded += len(rows)
+        return text
+
+    def write_encoded(self, text, row_count):
+        self.f.write(text)
+        self.row_count += row_count
+        self.bytes_written += len(text)
+
+    def write_rows(self, rows):
+        if rows:
+            self.write_encoded(self.encode_rows(rows), len(rows))
+
+    def append_rows_fragment(self, fragment_file, row_count):
+        # Fragments are JSONRowsFragmentWriter output for the same level
+        if not row_count:
+            return
+        if self.row_count:
+            self.f.write(',')
+        _append_file(self.f, fragment_file)
+        self.row_count += row_count
+        self.rows_encoded += row_count
+
+    def close(self):
+        newline = self.encoder.newline(self.level + 1)
+        closing = f'{newline}]' if self.row_count else ']'
+        self.f.write(f'{closing},{newline}"row_count"{self.encoder.key_separator}{self.row_count}'
+                     f'{self.encoder.newline(self.level)}}}')
+        return self.row_count
+
+
+class JSONDatabaseWriter:
+    def __init__(self, f, header, encoder=DEFAULT_ENCODER):
+        self.f = f
+        self.encoder = encoder
+        self.table_count = 0
+
+        self.f.write('{' + _format_members(header, encoder, 1) +
+                     f'{encoder.newline(1)}"tables"{encoder.key_separator}{{')
+
+    def _write_table_key(self, table_name):
+        separator = ',' if self.table_count else ''
+        self.f.write(f'{separator}{self.encoder.newline(2)}{self.encoder.dumps(table_name)}{self.encoder.key_separator}')
+        self.table_count += 1
+
+    def begin_table(self, table_name, header):
+        self._write_table_key(table_name)
+        return JSONTableWriter(self.f, header, level=2, encoder=self.encoder)
+
+    def close(self):
+        closing = f'{self.encoder.newline(1)}}}' if self.table_count else '}'
+        self.f.write(f'{closing}{self.encoder.newline(0)}}}')
+
+    def append_table_fragment(self, table_name, fragment_file):
+        # Fragments are JSONTableWriter output written at level=2 to a side file
+        self._write_table_key(table_name)
+        _append_file(self.f, fragment_file)
+
+
+class JSONRowsFragmentWriter:
+    def __init__(self, f, level=0, encoder=DEFAULT_ENCODER):
+        self.f = f
+        self.level = level
+        self.encoder = encoder
+        self.row_count = 0
+        self.rows_encoded = 0
+        self.bytes_written = 0
+
+    def encode_rows(self, rows):
+        text = _format_rows(rows, self.encoder, self.level + 2, first=not self.rows_encoded)
+        self.rows_encoded += len(rows)
+        return text
+
+    def write_encoded(self, text, row_count):
+        self.f.write(text)
+        self.row_count += row_count
+        self.bytes_written += len(text)
+
+    def write_rows(self, rows):
+        if rows:
+            self.write_encoded(self.encode_rows(rows), len(rows))
+
+    def close(self):
+        return self.row_count
+
+
+class JSONLinesTableWriter:
+    def __init__(self, f, encoder=DEFAULT_ENCODER):
+        self.f = f
+        # One row per line, whatever style the rest of the export uses
+        self.encoder = encoder.with_style("compact")
+        self.row_count = 0
+        self.bytes_written = 0
+
+    @classmethod
+    def reopen(cls, f, row_count, encoder=DEFAULT_ENCODER):
+        writer = cls(f, encoder)
+        writer.row_count = row_count
+        return writer
+
+    def encode_rows(self, rows):
+        return ''.join(self.encoder.dumps(row) + '\n' for row in rows)
+
+    def write_encoded(self, text, row_count):
+        self.f.write(text)
+        self.row_count += row_count
+        self.bytes_written += len(text)
+
+    def write_rows(self, rows):
+        self.write_encoded(self.encode_rows(rows), len(rows))
+
+    def append_rows_fragment(self, fragment_file, row_count):
+        _append_file(self.f, fragment_file)
+        self.row_count += row_count
+
+    def close(self):
+        return self.row_count
+
+
+def write_table_header(header_file, header, encoder=DEFAULT_ENCODER):
+    encoder.write_file(header_file, header)
@@ -0,0 +1,79 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None and not hasattr(orjson, 'Fragment'):
+    # orjson.Fragment (3.9+) is needed to match the json module's float output
+    orjson = None
+
+JSON_BACKENDS = ("orjson", "json")
+JSON_STYLES = ("pretty", "compact")
+
+
+def _orjson_float(value):
+    # orjson writes 1e-7 where the json module writes 1e-07, and some
+    # releases also 1e16 for 1e+16; hand it the json module's own text for
+    # every value Python writes with an exponent, so both backends produce
+    # the same bytes
+    if value and (abs(value) < 1e-4 or abs(value) >= 1e16):
+        return orjson.Fragment(json.dumps(value))
+    return value
+
+
+# Floats on both sides of the exponent thresholds
+FLOAT_PARITY_VALUES = [1e-7, -2.5e-05, 0.0001, 0.1, 123456789.0, 9999999999999998.0, 1e16, -1e22, 1.5e300]
+
+if orjson is not None and orjson.dumps([_orjson_float(value) for value in FLOAT_PARITY_VALUES]) != \
+        json.dumps(FLOAT_PARITY_VALUES, separators=(',', ':')).encode('utf-8'):
+    # A release that writes floats differently again would break the
+    # byte-identical output; the json module is used instead
+    orjson = None
+
+
+class JSONEncoder:
+    def __init__(self, backend=None, style="pretty"):
+        if backend is None:
+            backend = "orjson" if orjson is not None else "json"
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"Unknown JSON backend '{backend}', expected one of {', '.join(JSON_BACKENDS)}")
+        if backend == "orjson" and orjson is None:
+            raise ValueError("The orjson backend needs orjson 3.9 or later (pip install -U orjson)")
+        if style not in JSON_STYLES:
+            raise ValueError(f"Unknown JSON style '{style}', expected one of {', '.join(JSON_STYLES)}")
+        self.backend = backend
+        self.style = style
+        self.pretty = style == "pretty"
+        self.key_separator = ': ' if self.pretty else ':'
+
+        # orjson writes datetime and date values itself, in the same form as
+        # isoformat(), so those columns need no conversion in Python
+        self.native_temporal = backend == "orjson"
+        self.float_converter = _orjson_float if backend == "orjson" else None
+
+    def with_style(self, style):
+        return JSONEncoder(self.backend, style)
+
+    def dumps(self, value, level=0):
+        if self.backend == "orjson":
+            option = orjson.OPT_INDENT_2 if self.pretty else 0
+            text = orjson.dumps(value, option=option, default=str).decode('utf-8')
+        elif self.pretty:
+            text = json.dumps(value, indent=2, ensure_ascii=False, default=str)
+        else:
+            text = json.dumps(value, ensure_ascii=False, default=str, separators=(',', ':'))
+        if level and self.pretty:
+            text = text.replace('\n', '\n' + '  ' * level)
+        return text
+
+    def newline(self, level):
+        return '\n' + '  ' * level if self.pretty else ''
+
+    def write_file(self, path, value):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.dumps(value))
+
+
+DEFAULT_ENCODER = JSONEncoder()
@@ -0,0 +1,555 @@
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+
+from binary_values import decode_binary
+from export_progress import format_duration
+from export_streaming import DEFAULT_BATCH_SIZE
+from option_choices import DUPLICATE_STATEMENTS, LOAD_METHODS
+from output_compression import open_input, strip_compression_suffix
+from parallel_export import DEFAULT_WORKERS, MAX_WORKERS, create_connection_pool
+from table_metadata import table_name_matcher
+
+READ_SIZE = 1024 * 1024
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Files next to the table files that hold no rows
+NON_DATA_SUFFIXES = ("_export_summary.json", "_export_checkpoint.json", "_timing_report.json", ".meta.json")
+
+# <db>_<table>.delta_<stamp>.json(l), see incremental.delta_stamp
+DELTA_FILE = re.compile(r'\.(delta_[0-9T]+)\.jsonl?$')
+
+TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"})
+
+
+class JSONStreamReader:
+    # Steps through a JSON document without loading it: the caller walks the
+    # outer objects and arrays, and each value inside them is decoded whole.
+    # Only as much of the file as the current value needs is held in memory.
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self.f.read(READ_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        # The next character that is not whitespace, '' at the end of the file
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found or 'end of file'}' in {self.f.name}")
+        self.pos += 1
+
+    def value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Most likely the value continues past the buffer
+                if self._fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may be cut short
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def skip(self):
+        self.value()
+
+    def members(self):
+        # Yields the keys of an object; the value of each key must be read
+        # (value, items, members or skip) before asking for the next one
+        self._expect('{')
+        if self._peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(':')
+            yield key
+            separator = self._peek()
+            self.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or '}}' but found '{separator}' in {self.f.name}")
+
+    def items(self):
+        # Yields the elements of an array one at a time
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self._peek()
+            self.pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' but found '{separator}' in {self.f.name}")
+
+
+class ImportTable:
+    # One table's rows from an export file. rows is a one-pass iterator of
+    # dicts; columns is None when the file does not list them. binary is
+    # the header's description of base64 or side file encoded columns.
+    def __init__(self, table_name, columns, rows, source, row_count=None, binary=None):
+        self.table_name = table_name
+        self.columns = columns
+        self.rows = rows
+        self.source = source
+        self.row_count = row_count
+        self.binary = binary
+
+
+def find_export_files(paths, log=None):
+    # Table files named on the command line, or found in export directories.
+    # A directory is scanned rather than trusting its export summary, which
+    # lists only the last run's files: the base files of an incremental
+    # export come from earlier runs. With a summary, files of other
+    # databases or of another export format are left out. Each table's base
+    # file comes before its delta files, oldest first.
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        on_disk = [name for name in sorted(os.listdir(path))
+                   if strip_compression_suffix(name).endswith((".json", ".jsonl"))
+                   and not strip_compression_suffix(name).endswith(NON_DATA_SUFFIXES) and not name.startswith(".")]
+        summaries = sorted(glob.glob(os.path.join(path, "*_export_summary.json")))
+        if not summaries:
+            files.extend(os.path.join(path, name) for name in sorted(on_disk, key=export_file_order))
+            continue
+        listed = set()
+        earlier_runs = []
+        for summary_file in summaries:
+            with open(summary_file, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+            listed.update(os.path.basename(name) for name in summary.get("exported_files", []))
+            suffix = ".jsonl" if summary.get("export_format") == "json_lines" else ".json"
+            earlier_runs.append((f"{summary['database']}_", suffix, f"{summary['database']}_database.json"))
+        selected = [name for name in on_disk
+                    if name in listed or any(_same_export(name, *export) for export in earlier_runs)]
+        earlier = [name for name in selected if name not in listed]
+        left_out = [name for name in on_disk if name not in selected]
+        if log and earlier:
+            log(f"Also loading {len(earlier)} files not in the last export summary (earlier runs): "
+                f"{', '.join(earlier)}")
+        if log and left_out:
+            log(f"Warning: skipping {len(left_out)} files in {path} that belong to no export summary: "
+                f"{', '.join(left_out)}")
+        files.extend(os.path.join(path, name) for name in sorted(selected, key=export_file_order))
+    return files
+
+
+def _same_export(name, prefix, suffix, combined_file):
+    stem = strip_compression_suffix(name)
+    return name.startswith(prefix) and stem.endswith(suffix) and stem != combined_file
+
+
+def export_file_order(path):
+    # (table, "") for a table file and (table, "delta_<stamp>") for its
+    # delta files, so the base file sorts first and deltas by time
+    name = strip_compression_suffix(os.path.basename(path))
+    match = DELTA_FILE.search(name)
+    if match:
+        return name[:match.start()], match.group(1)
+    return name.rsplit(".", 1)[0], ""
+
+
+def read_export_file(path):
+    # Yields an ImportTable per table in a separate or single-file .json
+    # export, or a JSON Lines table file. Each table's rows have to be
+    # consumed, or skipped, before the next table is read.
+    stem = strip_compression_suffix(path)
+    if stem.endswith(".jsonl"):
+        yield from _read_json_lines(path, stem)
+        return
+
+    with open_input(path) as f:
+        reader = JSONStreamReader(f)
+        header = {}
+        for key in reader.members():
+            if key == "tables":
+                # Single file: {"database": ..., "tables": {"name": {...}}}
+                for table_name in reader.members():
+                    yield from _read_table_object(reader, table_name, path)
+            elif key == "data":
+                table = ImportTable(header.get("table_name"), header.get("columns"),
+                                    _drained(reader.items()), path, binary=header.get("binary"))
+                if table.table_name is None:
+                    raise ValueError(f"{path} has no table_name before its data")
+                yield table
+                table.rows.drain()
+            else:
+                header[key] = reader.value()
+
+
+def _read_table_object(reader, table_name, path):
+    columns = None
+    binary = None
+    for key in reader.members():
+        if key == "columns":
+            columns = reader.value()
+        elif key == "binary":
+            binary = reader.value()
+        elif key == "data":
+            table = ImportTable(table_name, columns, _drained(reader.items()), path, binary=binary)
+            yield table
+            table.rows.drain()
+        else:
+            reader.skip()
+
+
+def _read_json_lines(path, stem):
+    header_file = stem[:-len(".jsonl")] + ".meta.json"
+    if not os.path.exists(header_file):
+        raise ValueError(f"{path} needs its header file {os.path.basename(header_file)}")
+    with open(header_file, 'r', encoding='utf-8') as f:
+        header = json.load(f)
+
+    def rows(f):
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+    with open_input(path) as f:
+        table = ImportTable(header["table_name"], header.get("columns"), _drained(rows(f)), path,
+                            header.get("row_count"), header.get("binary"))
+        yield table
+        table.rows.drain()
+
+
+class _drained:
+    # A row iterator that can be run to its end by the reader when the
+    # consumer stopped early, so the next table starts in the right place
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.rows)
+
+    def drain(self):
+        for _ in self.rows:
+            pass
+
+
+def decode_binary_rows(rows, binary, base_dir):
+    # Turns base64 strings and side file references back into bytes
+    columns = binary.get("columns", []) if binary.get("encoding") != "text" else []
+    for row in rows:
+        for column in columns:
+            if row.get(column) is not None:
+                row[column] = decode_binary(row[column], base_dir)
+        yield row
+
+
+def iter_row_tuples(rows, columns, batch_size):
+    # Batches of value tuples in column order; a missing key loads as NULL
+    batch = []
+    for row in rows:
+        batch.append(tuple(map(row.get, columns)))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _tsv_value(value):
+    if value is None:
+        return "\\N"
+    if value is True or value is False:
+        return "1" if value else "0"
+    if isinstance(value, str):
+        return value.translate(TSV_ESCAPES)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False).translate(TSV_ESCAPES)
+    return str(value)
+
+
+class TableLoader:
+    # Loads batches of value tuples into one table over one connection
+    def __init__(self, connection, table_name, columns, method="insert", on_duplicate="error"):
+        if method not in LOAD_METHODS:
+            raise ValueError(f"Unknown load method '{method}', expected one of {', '.join(LOAD_METHODS)}")
+        if on_duplicate not in DUPLICATE_STATEMENTS:
+            raise ValueError(f"Unknown duplicate handling '{on_duplicate}', "
+                             f"expected one of {', '.join(DUPLICATE_STATEMENTS)}")
+        self.connection = connection
+        self.table_name = table_name
+        self.columns = columns
+        self.method = method
+        self.cursor = connection.cursor()
+        column_list = ", ".join(f"`{column}`" for column in columns)
+        if method == "insert":
+            # Sent as one multi-row statement per batch, built here because
+            # executemany() only does that for INSERT [IGNORE] and sends a
+            # REPLACE one row at a time
+            self.statement = f"{DUPLICATE_STATEMENTS[on_duplicate]} INTO `{table_name}` ({column_list}) VALUES "
+            self.row_placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+            self._batch_statements = {}
+        else:
+            duplicate = {"error": "", "ignore": " IGNORE", "replace": " REPLACE"}[on_duplicate]
+            self.statement = (f"LOAD DATA LOCAL INFILE %s{duplicate} INTO TABLE `{table_name}` "
+                              f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                              f"LINES TERMINATED BY '\\n' ({column_list})")
+
+    def _insert_statement(self, row_count):
+        # Batches are all the same size except the last one
+        statement = self._batch_statements.get(row_count)
+        if statement is None:
+            statement = self.statement + ", ".join([self.row_placeholders] * row_count)
+            self._batch_statements[row_count] = statement
+        return statement
+
+    def load(self, batch):
+        if self.method == "insert":
+            self.cursor.execute(self._insert_statement(len(batch)), [value for row in batch for value in row])
+        else:
+            fd, batch_file = tempfile.mkstemp(suffix=".tsv", prefix=f"{self.table_name}.")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+                    f.write("".join("\t".join(map(_tsv_value, row)) + "\n" for row in batch))
+                self.cursor.execute(self.statement, (batch_file,))
+            finally:
+                os.remove(batch_file)
+        # One transaction per batch keeps undo logs and lock counts small
+        self.connection.commit()
+
+    def close(self):
+        self.cursor.close()
+
+
+def prepare_session(connection, disable_checks=False):
+    cursor = connection.cursor()
+    if disable_checks:
+        # Rows come from a consistent export, so their keys and references
+        # were already checked by the source server
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        cursor.execute("SET SESSION unique_checks = 0")
+    cursor.close()
+
+
+def import_table(connection, table, method="insert", batch_size=DEFAULT_BATCH_SIZE, on_duplicate="error",
+                 truncate=False, disable_keys=False, on_batch=None):
+    rows = iter(table.rows)
+    columns = table.columns
+    if not columns:
+        # Files without a column list name every column in each row
+        first_row = next(rows, None)
+        if first_row is None:
+            return 0
+        columns = list(first_row)
+        rows = _chain_first(first_row, rows)
+    if table.binary:
+        rows = decode_binary_rows(rows, table.binary, os.path.dirname(table.source))
+        if method == "load_data":
+            # The batch files are UTF-8 text, which bytes do not round-trip through
+            method = "insert"
+
+    cursor = connection.cursor()
+    if truncate:
+        cursor.execute(f"TRUNCATE TABLE `{table.table_name}`")
+    if disable_keys:
+        # Non-unique indexes are rebuilt once at the end (MyISAM; InnoDB ignores it)
+        cursor.execute(f"ALTER TABLE `{table.table_name}` DISABLE KEYS")
+    loader = TableLoader(connection, table.table_name, columns, method, on_duplicate)
+    loaded_rows = 0
+    try:
+        for batch in iter_row_tuples(rows, columns, max(1, int(batch_size))):
+            loader.load(batch)
+            loaded_rows += len(batch)
+            if on_batch:
+                on_batch(table.table_name, len(batch), loaded_rows)
+    finally:
+        loader.close()
+        if disable_keys:
+            cursor.execute(f"ALTER TABLE `{table.table_name}` ENABLE KEYS")
+        cursor.close()
+    return loaded_rows
+
+
+def _chain_first(first_row, rows):
+    yield first_row
+    yield from rows
+
+
+def import_files(connection_params, paths, tables=None, method="insert", batch_size=DEFAULT_BATCH_SIZE,
+                 workers=DEFAULT_WORKERS, on_duplicate=None, truncate=False, disable_checks=False,
+                 disable_keys=False, log=None):
+    # Loads export files into the database named in connection_params. Each
+    # table's files (its base file, then its delta files) are loaded in
+    # order by one worker on its own pooled connection; the tables of a
+    # single-file export are loaded one after the other. on_duplicate
+    # defaults to "error", and to "replace" for delta files, whose changed
+    # rows are already in the base file.
+    files = find_export_files(paths, log)
+    if not files:
+        raise ValueError("No export files found")
+    delta_files = [path for path in files if export_file_order(path)[1]]
+    if delta_files and on_duplicate == "error":
+        raise ValueError(f"{len(delta_files)} delta files update rows of their base files, which "
+                         f"--on-duplicate error rejects; use replace (the default for delta files) or ignore")
+    matchers = [table_name_matcher(pattern, "wildcard") for pattern in tables or []]
+    matchers = [matcher for matcher in matchers if matcher is not None]
+    if method == "load_data":
+        connection_params = dict(connection_params, allow_local_infile=True)
+
+    results = {}
+    results_lock = threading.Lock()
+    started = time.perf_counter()
+
+    def import_file(connection, path, truncate):
+        duplicate = on_duplicate or ("replace" if export_file_order(path)[1] else "error")
+        for table in read_export_file(path):
+            if matchers and not any(matcher(table.table_name) for matcher in matchers):
+                continue
+            table_started = time.perf_counter()
+            loaded_rows = import_table(connection, table, method, batch_size, duplicate, truncate, disable_keys)
+            seconds = time.perf_counter() - table_started
+            result = {"rows": loaded_rows, "seconds": round(seconds, 3),
+                      "rows_per_second": round(loaded_rows / seconds, 1) if seconds else None,
+                      "file": path}
+            with results_lock:
+                previous = results.get(table.table_name)
+                if previous is not None:
+                    # Delta files add to the rows of the same table
+                    result["rows"] += previous["rows"]
+                results[table.table_name] = result
+            if log:
+                log(f"   Loaded {table.table_name}: {loaded_rows:,} rows from {os.path.basename(path)} "
+                    f"in {format_duration(seconds)} ({loaded_rows / seconds if seconds else 0:,.0f} rows/s)")
+
+    def import_chain(pool, chain):
+        connection = pool.get_connection()
+        try:
+            prepare_session(connection, disable_checks)
+            for index, path in enumerate(chain):
+                # Only the base file empties the table, its deltas add to it
+                import_file(connection, path, truncate and index == 0)
+        finally:
+            connection.close()
+
+    chains = {}
+    for path in sorted(files, key=export_file_order):
+        chains.setdefault(export_file_order(path)[0], []).append(path)
+    workers = max(1, min(int(workers), MAX_WORKERS, len(chains)))
+    pool = create_connection_pool(connection_params, workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(import_chain, pool, chain) for chain in chains.values()]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    seconds = time.perf_counter() - started
+    total_rows = sum(result["rows"] for result in results.values())
+    return {
+        "tables": results,
+        "files": files,
+        "total_rows": total_rows,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(total_rows / seconds, 1) if seconds else None
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Load JSON exports (separate files, a single combined file or JSON Lines) back into MySQL.")
+    parser.add_argument("paths", nargs="+", metavar="PATH",
+                        help="export directories or table files (.json, .jsonl, optionally compressed)")
+    parser.add_argument("--host", default="localhost", help="MySQL host (default: localhost)")
+    parser.add_argument("--user", default="root", help="MySQL user (default: root)")
+    parser.add_argument("--password", default=os.environ.get("MYSQL_PWD", ""),
+                        help="MySQL password (default: the MYSQL_PWD environment variable)")
+    parser.add_argument("--database", required=True, help="database to load into; the tables must exist")
+    parser.add_argument("--tables", type=lambda value: value.split(","), metavar="NAMES",
+                        help="comma-separated table names or wildcards to load (default: all)")
+    parser.add_argument("--method", choices=LOAD_METHODS, default="insert",
+                        help="multi-row INSERTs, or LOAD DATA LOCAL INFILE (needs local_infile=ON on the "
+                             "server; default: insert)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"rows per INSERT or LOAD DATA, each committed on its own "
+                             f"(default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"tables loaded in parallel, each on its own connection "
+                             f"(default: {DEFAULT_WORKERS}, max: {MAX_WORKERS})")
+    parser.add_argument("--on-duplicate", choices=list(DUPLICATE_STATEMENTS),
+                        help="rows whose key already exists: fail, keep the existing row, or replace it "
+                             "(default: error, replace for the delta files of incremental exports)")
+    parser.add_argument("--truncate", action="store_true", help="empty each table before loading it")
+    parser.add_argument("--disable-checks", action="store_true",
+                        help="turn off foreign_key_checks and unique_checks while loading")
+    parser.add_argument("--disable-keys", action="store_true",
+                        help="ALTER TABLE ... DISABLE KEYS while loading each table (MyISAM only)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    connection_params = {"host": args.host, "user": args.user, "password": args.password,
+                         "database": args.database}
+    print(f"Loading into {args.database} on {args.host}...")
+    try:
+        outcome = import_files(connection_params, args.paths, tables=args.tables, method=args.method,
+                               batch_size=args.batch_size, workers=args.workers,
+                               on_duplicate=args.on_duplicate, truncate=args.truncate,
+                               disable_checks=args.disable_checks, disable_keys=args.disable_keys, log=print)
+    except mysql.connector.Error as err:
+        print(f"MySQL Error: {err}")
+        return 1
+    except (OSError, ValueError) as err:
+        print(f"Error: {err}")
+        return 1
+    except KeyboardInterrupt:
+        print("\nImport cancelled.")
+        return 1
+
+    print("=" * 60)
+    print(f"Tables loaded: {len(outcome['tables'])} from {len(outcome['files'])} files")
+    print(f"Total rows: {outcome['total_rows']:,}")
+    print(f"Elapsed time: {format_duration(outcome['seconds'])} "
+          f"({outcome['rows_per_second'] or 0:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,28 @@
 import mysql.connector
+import argparse
+import fnmatch
 import json
 import os
 import sys
-import time
-from datetime import datetime, date
-from tkinter import filedialog, messagebox
-import tkinter as tk
-
-def format_file_size(size_bytes):
-    if size_bytes == 0:
-        return "0 B"
-    size_names = ["B", "KB", "MB", "GB"]
-    i = 0
-    size = float(size_bytes)
-    while size >= 1024.0 and i < len(size_names) - 1:
-        size /= 1024.0
-        i += 1
-    return f"{size:.1f} {size_names[i]}"
+import threading
+from datetime import datetime
+from export_streaming import DEFAULT_BATCH_SIZE, ExportCancelled
+from parallel_export import DEFAULT_WORKERS, MAX_WORKERS, DEFAULT_SPLIT_RANGES, DEFAULT_SPLIT_MIN_ROWS
+from json_encoder import DEFAULT_ENCODER, JSON_BACKENDS, JSON_STYLES, JSONEncoder
+from export_engine import ExportJob
+from export_pipeline import DEFAULT_PIPELINE_MEMORY
+from export_snapshot import SNAPSHOT_LOCKS
+from binary_values import BINARY_STRATEGIES, DEFAULT_BLOB_THRESHOLD, BinaryValues
+from export_progress import format_duration, format_file_size, format_rate
+from table_metadata import format_row_count
+from incremental import parse_watermark_specs
+from option_choices import COMPRESSION_SUFFIXES, DUPLICATE_STATEMENTS
+
+EXPORT_FORMATS = {
+    "1": "single_file",
+    "2": "separate_files",
+    "3": "json_lines"
+}
 
 def show_progress_bar(current, total, prefix="", suffix="", length=30):
     percent = (current / total) * 100
@@ -96,16 +102,27 @@ def select_tables_to_export(all_tables):
     print("Invalid selection or cancelled. Exporting all tables by default.")
     return all_tables
 
+def match_table_names(all_tables, patterns):
+    # Exact names or shell-style wildcards (user*, *_log), case-insensitive,
+    # kept in database order
+    patterns = [pattern.strip().lower() for pattern in patterns if pattern.strip()]
+    for pattern in patterns:
+        if not any(fnmatch.fnmatchcase(table.lower(), pattern) for table in all_tables):
+            print(f"Warning: no table matches '{pattern}'")
+    return [table for table in all_tables
+            if any(fnmatch.fnmatchcase(table.lower(), pattern) for pattern in patterns)]
+
 def select_export_format():
     print("\nExport Format Options:")
     print("1. Single JSON file (all tables combined)")
     print("2. Separate JSON files (one file per table)")
+    print("3. JSON Lines files (one .jsonl file per table, one row per line)")
     
     while True:
-        choice = input("\nChoose export format (1 or 2): ").strip()
-        if choice in ['1', '2']:
+        choice = input("\nChoose export format (1, 2, or 3): ").strip()
+        if choice in EXPORT_FORMATS:
             return choice
-        print("Invalid choice. Please enter 1 or 2.")
+        print("Invalid choice. Please enter 1, 2, or 3.")
 
 def select_output_location():
     print("\nOutput Location Options:")
@@ -127,6 +144,9 @@ def select_output_location():
             print("Opening directory browser...")
             
             try:
+                # Imported here so headless hosts without Tk never load it
+                import tkinter as tk
+                from tkinter import filedialog
 
                 root = tk.Tk()
                 root.withdraw()
@@ -192,26 +212,49 @@ def select_output_location():
         if choice not in ["1", "2", "3"]:
             print("Invalid choice. Please enter 1, 2, or 3.")
 
-def export_database_to_json():
-    print("Enter MySQL connection details:")
-    host = input("Host (default: localhost): ").strip() or 'localhost'
-    user = input("Username (default: root): ").strip() or 'root'
-    password = input("Password (leave empty if no password): ").strip()
-    database_name = input("Database name to export: ").strip()
+def export_database_to_json(batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS,
+                            split_ranges=DEFAULT_SPLIT_RANGES, split_min_rows=DEFAULT_SPLIT_MIN_ROWS,
+                            use_checkpoint=False, resume=False, watermark_specs=None, compression=None,
+                            encoder=DEFAULT_ENCODER, exact_counts=False, profiler=None, timing_report=None,
+                            prometheus_textfile=None, pipeline_memory=None, consistent_snapshot=False,
+                            snapshot_lock="flush", binary=None, connection_settings=None,
+                            table_patterns=None, export_format_name=None, output_dir=None):
+    # With connection_settings the export runs without any prompt: tables
+    # come from table_patterns (all when None), plus export_format_name and
+    # output_dir. Returns True when the export completed.
+    from export_profiling import ExportProfiler
+    profiler = profiler or ExportProfiler()
+    headless = connection_settings is not None
+    if headless:
+        host = connection_settings["host"]
+        user = connection_settings["user"]
+        password = connection_settings["password"]
+        database_name = connection_settings["database"]
+    else:
+        print("Enter MySQL connection details:")
+        host = input("Host (default: localhost): ").strip() or 'localhost'
+        user = input("Username (default: root): ").strip() or 'root'
+        password = input("Password (leave empty if no password): ").strip()
+        database_name = input("Database name to export: ").strip()
     
     if not database_name:
         print("Error: Database name cannot be empty!")
-        return
+        return False
     
     connection = None
     cursor = None
+    job = None
     try:
-        connection = mysql.connector.connect(
-            host=host,
-            user=user,
-            password=password,
-            database=database_name
-        )
+        connection_params = {
+            'host': host,
+            'user': user,
+            'password': password,
+            'database': database_name
+        }
+        profiler.start()
+        profiler.begin_phase("connect")
+        connection = mysql.connector.connect(**connection_params)
+        profiler.end_phase("connect")
         
         cursor = connection.cursor()
         
@@ -219,191 +262,180 @@ def export_database_to_json():
         all_tables = [table[0] for table in cursor.fetchall()]
         
 
-        selected_tables = select_tables_to_export(all_tables)
-        
+        if headless:
+            selected_tables = match_table_names(all_tables, table_patterns) if table_patterns else all_tables
+            if not selected_tables:
+                print("Error: no tables selected for export!")
+                return False
+            export_format = next(key for key, name in EXPORT_FORMATS.items() if name == export_format_name)
+            output_dir = os.path.abspath(os.path.expanduser(output_dir or os.getcwd()))
+            os.makedirs(output_dir, exist_ok=True)
+            print(f"Exporting {len(selected_tables)} of {len(all_tables)} tables as {export_format_name} to {output_dir}")
+        else:
+            selected_tables = select_tables_to_export(all_tables)
+            
 
-        export_format = select_export_format()
-        
+            export_format = select_export_format()
+            
 
-        output_dir = select_output_location()
+            output_dir = select_output_location()
         
-
-        export_metadata = {
-            "database": database_name,
-            "exported_at": datetime.now().isoformat(),
-            "total_tables_in_db": len(all_tables),
-            "selected_tables_count": len(selected_tables),
-            "export_format": "single_file" if export_format == "1" else "separate_files",
-            "output_location": output_dir
-        }
+        total_tables = len(selected_tables)
+        sequential = workers <= 1
+        table_numbers = {table_name: i for i, table_name in enumerate(selected_tables, 1)}
+        output_lock = threading.Lock()
         
-        if export_format == "1":
-            database_json = export_metadata.copy()
-            database_json["tables"] = {}
+        def on_table_start(table_name):
+            if not sequential:
+                return
+            details = job.table_details[table_name]
+            print(f"\nProcessing table: {table_name} ({table_numbers[table_name]}/{total_tables})")
+            print(f"   Columns: {len(details['columns'])} | Rows: {format_row_count(details)}")
+            print(f"   Streaming rows in batches of {batch_size:,} and converting to JSON format...")
         
-        exported_files = []
-        total_tables = len(selected_tables)
+        def on_batch(table_name, fetched_rows):
+            progress = job.exporter.progress
+            with output_lock:
+                if sequential:
+                    details = job.table_details[table_name]
+                    row_count = details["row_count"]
+                    if row_count > 1000:
+                        show_progress_bar(min(fetched_rows, row_count), row_count, "   ",
+                                          f"{fetched_rows:,}/{format_row_count(details)} rows | "
+                                          f"{progress.throughput_text()}")
+                else:
+                    show_progress_bar(progress.percent(), 100, "   ", progress.status_text())
         
-        print(f"\nStarting export of {total_tables} tables...")
+        job = ExportJob(connection_params, selected_tables, EXPORT_FORMATS[export_format], output_dir,
+                        batch_size=batch_size, workers=workers, split_ranges=split_ranges,
+                        split_min_rows=split_min_rows, use_checkpoint=use_checkpoint, resume=resume,
+                        watermark_specs=watermark_specs, compression=compression, encoder=encoder,
+                        exact_counts=exact_counts, profiler=profiler, timing_report=timing_report,
+                        prometheus_textfile=prometheus_textfile, pipeline_memory=pipeline_memory,
+                        consistent_snapshot=consistent_snapshot, snapshot_lock=snapshot_lock, binary=binary,
+                        total_tables_in_db=len(all_tables),
+                        log=print, on_table_start=on_table_start, on_batch=on_batch)
+        print()
+        table_details = job.prepare(connection)
+        
+        if sequential:
+            print(f"\nStarting export of {total_tables} tables...")
+        else:
+            print(f"\nStarting export of {total_tables} tables with {workers} workers...")
         print("=" * 60)
         
-        for table_index, table_name in enumerate(selected_tables, 1):
-            print(f"\nProcessing table: {table_name} ({table_index}/{total_tables})")
+        for result in job.export_tables(connection):
+            table_name = result["table_name"]
+            fetched_rows = result["row_count"]
             
-
-            cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
-            row_count = cursor.fetchone()[0]
-            
-            cursor.execute(f"DESCRIBE `{table_name}`")
-            columns = [col[0] for col in cursor.fetchall()]
+            if result.get("delta") == "unchanged":
+                with output_lock:
+                    print(("\r" + " " * 140 + "\r" if not sequential else "\n") +
+                          f"   Unchanged: {table_name} (no rows after {result['watermark']['value']})")
+                continue
             
-            print(f"   Columns: {len(columns)} | Rows: {row_count:,}")
+            if result.get("checkpoint") == "skipped":
+                with output_lock:
+                    print(("\r" + " " * 140 + "\r" if not sequential else "\n") +
+                          f"   Skipped: {table_name} (already exported, {fetched_rows:,} rows)")
+                continue
             
-
-            print(f"   Downloading data...", end="")
-            cursor.execute(f"SELECT * FROM `{table_name}`")
-            
-
-            for i in range(11):
-                show_progress_bar(i, 10, "   ", f"fetching rows...")
-                time.sleep(0.1)
-            print()  # New line after progress bar
-            
-            rows = cursor.fetchall()
-            print(f"   Fetched {len(rows):,} rows successfully")
-
-
-            print(f"   Converting data to JSON format...")
-            table_data = []
-            total_rows = len(rows)
-            
-            for row_index, row in enumerate(rows):
-                if total_rows > 1000 and row_index % max(1, total_rows // 20) == 0:
-                    show_progress_bar(row_index, total_rows, "   ", f"processing {row_index:,}/{total_rows:,} rows")
-                
-                row_dict = {}
-                for i, value in enumerate(row):
-                    if isinstance(value, (datetime, date)):
-                        row_dict[columns[i]] = value.isoformat() if value is not None else None
-                    elif value is None:
-                        row_dict[columns[i]] = None
-                    elif isinstance(value, bytes):
-                        row_dict[columns[i]] = value.decode('utf-8', errors='ignore')
-                    elif isinstance(value, (int, float, str, bool)):
-                        row_dict[columns[i]] = value
+            if not sequential:
+                with output_lock:
+                    print("\r" + " " * 140 + "\r", end="")
+                    if "table_file" in result:
+                        file_size = os.path.getsize(result["table_file"])
+                        print(f"   Saved: {os.path.basename(result['table_file'])} ({fetched_rows:,} rows, {format_file_size(file_size, result.get('uncompressed_size'))})")
                     else:
-                        row_dict[columns[i]] = str(value)
-                table_data.append(row_dict)
+                        print(f"   Exported: {table_name} ({fetched_rows:,} rows)")
+                    if "key_ranges" in result:
+                        print(f"      (fetched as {result['key_ranges']} key ranges)")
+                    show_progress_bar(job.exporter.progress.percent(), 100, "   ", job.exporter.progress.status_text())
+                continue
             
-            if total_rows > 1000:
-                show_progress_bar(total_rows, total_rows, "   ", f"completed {total_rows:,} rows")
+            row_count = table_details[table_name]["row_count"]
+            if row_count > 1000:
+                show_progress_bar(row_count, row_count, "   ", f"completed {fetched_rows:,} rows")
                 print()  # New line after progress bar
+            print(f"   Fetched {fetched_rows:,} rows successfully")
+            if result.get("checkpoint") == "resumed":
+                print(f"   (resumed from checkpoint)")
             
-            table_json = {
-                "table_name": table_name,
-                "database": database_name,
-                "exported_at": export_metadata["exported_at"],
-                "columns": columns,
-                "row_count": len(table_data),
-                "data": table_data
-            }
-            
-            if export_format == "1":
-
-                database_json["tables"][table_name] = {
-                    "columns": columns,
-                    "row_count": len(table_data),
-                    "data": table_data
-                }
-            else:
-
-                table_file = os.path.join(output_dir, f'{database_name}_{table_name}.json')
-                
-                print(f"   Saving to file...")
-
-                for i in range(6):
-                    show_progress_bar(i, 5, "   ", f"writing JSON...")
-                    time.sleep(0.05)
-                
-                with open(table_file, 'w', encoding='utf-8') as f:
-                    json.dump(table_json, f, indent=2, ensure_ascii=False, default=str)
-                
-
+            if export_format != "1":
+                table_file = result["table_file"]
                 file_size = os.path.getsize(table_file)
-                show_progress_bar(5, 5, "   ", f"complete")
-                print()  # New line after progress bar
-                
-                exported_files.append(table_file)
-                print(f"   Saved: {os.path.basename(table_file)} ({format_file_size(file_size)})")
+                print(f"   Saved: {os.path.basename(table_file)} ({format_file_size(file_size, result.get('uncompressed_size'))})")
                 print(f"   Location: {table_file}")
                 
+                if "header_file" in result:
+                    print(f"   Header: {os.path.basename(result['header_file'])}")
+                
 
-                if table_index < total_tables:
+                if table_numbers[table_name] < total_tables:
                     print("   " + "-" * 50)
         
+        if not sequential:
+            print()  # New line after progress bar
+        
 
         print(f"\nFinalizing export...")
+        if export_format == "1":
+            print(f"   Closing combined JSON file...")
+        outcome = job.finish()
         
         if export_format == "1":
-            output_file = os.path.join(output_dir, f'{database_name}_database.json')
-            
-            print(f"   Creating combined JSON file...")
-            for i in range(11):
-                show_progress_bar(i, 10, "   ", f"compiling data...")
-                time.sleep(0.1)
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(database_json, f, indent=2, ensure_ascii=False, default=str)
-            
-            file_size = os.path.getsize(output_file)
-            show_progress_bar(10, 10, "   ", f"complete")
-            print()
-            
+            output_file = outcome["output_file"]
             print(f"\nDOWNLOAD COMPLETE!")
             print("=" * 60)
             print(f"Database: {database_name}")
             print(f"File: {os.path.basename(output_file)}")
-            print(f"Size: {format_file_size(file_size)}")
+            print(f"Size: {format_file_size(outcome['file_size'], outcome['uncompressed_size'])}")
             print(f"Location: {output_file}")
             
-            total_rows = sum(len(table_info["data"]) for table_info in database_json["tables"].values())
-            
         else:
-
-            summary_file = os.path.join(output_dir, f'{database_name}_export_summary.json')
-            summary_data = export_metadata.copy()
-            summary_data["exported_files"] = exported_files
-            summary_data["table_list"] = selected_tables
-            
-            with open(summary_file, 'w', encoding='utf-8') as f:
-                json.dump(summary_data, f, indent=2, ensure_ascii=False, default=str)
-            
-
-            total_size = sum(os.path.getsize(f) for f in exported_files)
-            summary_size = os.path.getsize(summary_file)
+            total_size = outcome["total_size"] + outcome["summary_size"]
+            total_uncompressed_size = outcome["total_uncompressed_size"]
             
             print(f"\nDOWNLOAD COMPLETE!")
             print("=" * 60)
             print(f"Database: {database_name}")
-            print(f"Files: {len(exported_files)} table files + 1 summary")
-            print(f"Total Size: {format_file_size(total_size + summary_size)}")
+            print(f"Files: {len(outcome['exported_files'])} table files + 1 summary")
+            if total_uncompressed_size is not None:
+                print(f"Total Size: {format_file_size(total_size, total_uncompressed_size + outcome['summary_size'])}")
+            else:
+                print(f"Total Size: {format_file_size(total_size)}")
             print(f"Location: {output_dir}")
-            print(f"Summary: {os.path.basename(summary_file)}")
-            
-            total_rows = sum(len(json.load(open(f))["data"]) for f in exported_files)
+            print(f"Summary: {os.path.basename(outcome['summary_file'])}")
         
         print(f"\nEXPORT STATISTICS:")
         print(f"   Tables in database: {len(all_tables)}")
         print(f"   Tables exported: {len(selected_tables)}")
-        print(f"   Total rows exported: {total_rows:,}")
+        print(f"   Total rows exported: {outcome['total_rows']:,}")
+        rows_per_second, bytes_per_second = job.exporter.progress.rates()
+        print(f"   Elapsed time: {format_duration(job.exporter.progress.elapsed())}")
+        print(f"   Throughput: {rows_per_second:,.0f} rows/s | {format_rate(bytes_per_second)}")
         print(f"   Export completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 60)
+        return True
         
+    except KeyboardInterrupt:
+        print("\nExport cancelled.")
+        if job is not None:
+            job.cancel()
+            job.abort()
     except mysql.connector.Error as err:
         print(f"MySQL Error: {err}")
+        if job is not None:
+            job.abort()
     except Exception as err:
         print(f"General Error: {err}")
+        if job is not None:
+            job.abort()
     finally:
+        if job is not None:
+            job.close()
+        else:
+            profiler.stop()
         try:
             if cursor:
                 cursor.close()
@@ -412,6 +444,284 @@ def export_database_to_json():
                 print("MySQL connection closed.")
         except Exception as e:
             print(f"Error closing connection: {e}")
+    return False
+
+def copy_database_tables(target, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS, exact_counts=False,
+                         connection_settings=None, table_patterns=None):
+    # Streams the selected tables straight into target (a table_copy
+    # MySQLCopyTarget or SQLiteCopyTarget); no JSON is written. Tables are
+    # chosen as for an export. Returns True when every table was copied.
+    from table_copy import TableCopier, list_tables
+    headless = connection_settings is not None
+    if headless:
+        connection_params = dict(connection_settings)
+    else:
+        print("Enter MySQL connection details for the source database:")
+        connection_params = {
+            'host': input("Host (default: localhost): ").strip() or 'localhost',
+            'user': input("Username (default: root): ").strip() or 'root',
+            'password': input("Password (leave empty if no password): ").strip(),
+            'database': input("Database name to copy: ").strip()
+        }
+
+    if not connection_params['database']:
+        print("Error: Database name cannot be empty!")
+        return False
+
+    connection = None
+    copier = None
+    try:
+        connection = mysql.connector.connect(**connection_params)
+        cursor = connection.cursor()
+        all_tables = list_tables(cursor)
+        cursor.close()
+
+        if headless:
+            selected_tables = match_table_names(all_tables, table_patterns) if table_patterns else all_tables
+            if not selected_tables:
+                print("Error: no tables selected to copy!")
+                return False
+        else:
+            selected_tables = select_tables_to_export(all_tables)
+
+        output_lock = threading.Lock()
+
+        def on_batch(table_name, copied_rows):
+            with output_lock:
+                show_progress_bar(copier.progress.percent(), 100, "   ", copier.progress.status_text())
+
+        copier = TableCopier(connection_params, selected_tables, target, batch_size=batch_size, workers=workers,
+                             exact_counts=exact_counts, log=print, on_batch=on_batch)
+        copier.prepare(connection)
+        print(f"\nCopying {len(selected_tables)} of {len(all_tables)} tables to {target.describe()}"
+              + (f" with {workers} workers..." if workers > 1 else "..."))
+        print("=" * 60)
+
+        for result in copier.copy_tables(connection):
+            with output_lock:
+                print("\r" + " " * 140 + "\r", end="")
+                print(f"   Copied: {result['table_name']} ({result['row_count']:,} rows, "
+                      f"{result['stats']['rows_per_second'] or 0:,.0f} rows/s)")
+                show_progress_bar(copier.progress.percent(), 100, "   ", copier.progress.status_text())
+        print()
+
+        rows_per_second, _ = copier.progress.rates()
+        print(f"\nCOPY COMPLETE!")
+        print("=" * 60)
+        print(f"Source: {connection_params['database']}")
+        print(f"Target: {target.describe()}")
+        print(f"   Tables copied: {len(selected_tables)}")
+        print(f"   Total rows copied: {copier.total_rows:,}")
+        print(f"   Elapsed time: {format_duration(copier.progress.elapsed())}")
+        print(f"   Throughput: {rows_per_second:,.0f} rows/s")
+        print("=" * 60)
+        return True
+
+    except KeyboardInterrupt:
+        print("\nCopy cancelled. Tables copied so far are kept; the table in progress is partly copied.")
+        if copier is not None:
+            copier.cancel()
+    except ExportCancelled:
+        print("\nCopy cancelled.")
+    except mysql.connector.Error as err:
+        print(f"MySQL Error: {err}")
+    except Exception as err:
+        print(f"General Error: {err}")
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+    return False
+
+def config_to_argv(config_file, known_options):
+    # A JSON object of option names to values, e.g. {"database": "shop",
+    # "tables": ["orders", "user*"], "workers": 4, "checkpoint": true}
+    with open(config_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"{config_file} must contain a JSON object of options")
+    unknown = [key for key in config if key.replace("-", "_") not in known_options or key == "config"]
+    if unknown:
+        raise ValueError(f"unknown option(s) in {config_file}: {', '.join(unknown)}")
+    argv = []
+    for key, value in config.items():
+        option = "--" + key.replace("_", "-")
+        if value is True:
+            argv.append(option)
+        elif value is False or value is None:
+            continue
+        elif isinstance(value, list) and key == "watermark":
+            for item in value:
+                argv.extend([option, str(item)])
+        elif isinstance(value, list):
+            argv.extend([option, ",".join(str(item) for item in value)])
+        else:
+            argv.extend([option, str(value)])
+    return argv
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export a MySQL database to JSON. Without --database the export asks for every "
+                    "setting interactively; with it, it runs without any prompt.")
+    parser.add_argument("--config", metavar="FILE",
+                        help="read options from a JSON file; options given on the command line win")
+    headless = parser.add_argument_group("non-interactive export")
+    headless.add_argument("--host", default="localhost", help="MySQL host (default: localhost)")
+    headless.add_argument("--user", default="root", help="MySQL user (default: root)")
+    headless.add_argument("--password", default=os.environ.get("MYSQL_PWD", ""),
+                          help="MySQL password (default: the MYSQL_PWD environment variable)")
+    headless.add_argument("--database", help="database to export; runs the export without prompts")
+    headless.add_argument("--tables", type=lambda value: value.split(","), metavar="NAMES",
+                          help="comma-separated table names or wildcards such as user*,*_log (default: all)")
+    headless.add_argument("--format", choices=list(EXPORT_FORMATS.values()), default="separate_files",
+                          help="export format (default: separate_files)")
+    headless.add_argument("--output-dir", help="output directory, created if missing (default: current directory)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"rows fetched from the server per batch (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"tables exported in parallel, each on its own pooled connection "
+                             f"(default: {DEFAULT_WORKERS}, max: {MAX_WORKERS})")
+    parser.add_argument("--split-ranges", type=int, default=DEFAULT_SPLIT_RANGES,
+                        help="split large tables into this many primary key ranges fetched on separate "
+                             "connections; needs --workers > 1 (default: no splitting)")
+    parser.add_argument("--split-min-rows", type=int, default=DEFAULT_SPLIT_MIN_ROWS,
+                        help=f"only split tables with at least this many rows (default: {DEFAULT_SPLIT_MIN_ROWS:,})")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="fetch, encode and write each table on separate threads so the next batch is "
+                             "read while the last one is written")
+    parser.add_argument("--pipeline-memory", type=int, default=DEFAULT_PIPELINE_MEMORY // (1024 * 1024),
+                        metavar="MB",
+                        help=f"memory the batches waiting between --pipeline threads may use "
+                             f"(default: {DEFAULT_PIPELINE_MEMORY // (1024 * 1024)})")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="export every table, on every worker, from one consistent snapshot and record the "
+                             "binary log position in the summary (InnoDB tables)")
+    parser.add_argument("--snapshot-lock", choices=SNAPSHOT_LOCKS, default="flush",
+                        help="flush: hold FLUSH TABLES WITH READ LOCK for the milliseconds it takes to start the "
+                             "snapshots (needs RELOAD); none: no lock, snapshots may differ slightly "
+                             "(default: flush)")
+    parser.add_argument("--binary", choices=BINARY_STRATEGIES, default="text",
+                        help="BLOB/BINARY values: text decodes them as UTF-8 and drops invalid bytes; base64 "
+                             "keeps the exact bytes inline; files writes values over --blob-threshold to "
+                             "<db>_blobs/ once per distinct content and references them from the row "
+                             "(default: text)")
+    parser.add_argument("--blob-threshold", type=int, default=DEFAULT_BLOB_THRESHOLD // 1024, metavar="KB",
+                        help=f"size above which --binary files moves a value to a side file "
+                             f"(default: {DEFAULT_BLOB_THRESHOLD // 1024})")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="read tables in keyset pages and record progress in <db>_export_checkpoint.json "
+                             "(separate or JSON Lines files only)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted checkpointed export in the same output directory")
+    parser.add_argument("--watermark", action="append", metavar="TABLE=COLUMN",
+                        help="export only rows whose COLUMN is newer than the value stored in the previous "
+                             "export summary, as delta files; use *=COLUMN for every table that has the column "
+                             "(may be repeated)")
+    parser.add_argument("--compress", choices=sorted(COMPRESSION_SUFFIXES),
+                        help="compress table and combined files while they are written "
+                             "(zstd and lz4 need the zstandard and lz4 packages)")
+    parser.add_argument("--compress-level", type=int,
+                        help="compression level (default: 6 for gzip, 3 for zstd, 0 for lz4)")
+    parser.add_argument("--compress-threads", type=int, default=0,
+                        help="extra threads used to compress each file; zstd only (default: 0)")
+    parser.add_argument("--exact-counts", action="store_true",
+                        help="count rows with SELECT COUNT(*) before exporting instead of using the "
+                             "information_schema estimates (a full index scan per table)")
+    parser.add_argument("--json-backend", choices=JSON_BACKENDS,
+                        help="JSON encoder; orjson is used by default when it is installed")
+    parser.add_argument("--json-style", choices=JSON_STYLES, default="pretty",
+                        help="pretty (indented) or compact .json files; JSON Lines rows are always compact "
+                             "(default: pretty)")
+    parser.add_argument("--timing-report", metavar="FILE",
+                        help="write per-phase and per-table timings of the run to FILE as JSON")
+    parser.add_argument("--prometheus-textfile", metavar="FILE",
+                        help="write export metrics to FILE for node_exporter's textfile collector")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="record peak memory with tracemalloc, per table when --workers is 1 "
+                             "(slows the export down)")
+    parser.add_argument("--profile-dir", metavar="DIR",
+                        help="save a cProfile dump per table (and per key range) in DIR")
+    copy = parser.add_argument_group("direct copy (instead of writing JSON)")
+    copy.add_argument("--copy-to-database", metavar="NAME",
+                      help="copy the selected tables straight into this MySQL/MariaDB database")
+    copy.add_argument("--copy-to-sqlite", metavar="FILE",
+                      help="copy the selected tables straight into this SQLite file, creating missing tables")
+    copy.add_argument("--target-host", help="server of --copy-to-database (default: the source host)")
+    copy.add_argument("--target-user", help="user for --copy-to-database (default: the source user)")
+    copy.add_argument("--target-password", help="password for --copy-to-database (default: the source password)")
+    copy.add_argument("--create-tables", action="store_true",
+                      help="create missing tables in --copy-to-database from SHOW CREATE TABLE on the source")
+    copy.add_argument("--truncate", action="store_true", help="empty each target table before copying into it")
+    copy.add_argument("--on-duplicate", choices=list(DUPLICATE_STATEMENTS), default="error",
+                      help="rows whose key already exists in the target: fail, keep the existing row, or replace "
+                           "it (default: error)")
+    copy.add_argument("--disable-checks", action="store_true",
+                      help="turn off foreign_key_checks and unique_checks on the target connections")
+    if argv is None:
+        argv = sys.argv[1:]
+    config_args, _ = parser.parse_known_args(argv)
+    if config_args.config:
+        try:
+            argv = config_to_argv(config_args.config, vars(parser.parse_args([]))) + list(argv)
+        except (OSError, ValueError) as err:
+            parser.error(f"Cannot read config file: {err}")
+    args = parser.parse_args(argv)
+    try:
+        parse_watermark_specs(args.watermark)
+        args.encoder = JSONEncoder(args.json_backend, args.json_style)
+        args.compression = None
+        if args.compress:
+            from output_compression import OutputCompression
+            args.compression = OutputCompression(args.compress, args.compress_level, args.compress_threads)
+    except ValueError as err:
+        parser.error(str(err))
+    if args.pipeline_memory < 1:
+        parser.error("--pipeline-memory must be at least 1 MB")
+    # Without these options the export sets up its own default profiler
+    args.profiler = None
+    if args.trace_memory or args.profile_dir:
+        from export_profiling import ExportProfiler
+        args.profiler = ExportProfiler(trace_memory=args.trace_memory, profile_dir=args.profile_dir)
+    args.pipeline_memory = args.pipeline_memory * 1024 * 1024 if args.pipeline else None
+    if args.blob_threshold < 0:
+        parser.error("--blob-threshold cannot be negative")
+    args.binary_values = BinaryValues(args.binary, args.blob_threshold * 1024) if args.binary != "text" else None
+    if args.copy_to_database and args.copy_to_sqlite:
+        parser.error("--copy-to-database and --copy-to-sqlite cannot be combined")
+    args.copy_target = None
+    if args.copy_to_database:
+        from table_copy import MySQLCopyTarget
+        args.copy_target = MySQLCopyTarget({"host": args.target_host or args.host,
+                                            "user": args.target_user or args.user,
+                                            "password": args.password if args.target_password is None
+                                            else args.target_password,
+                                            "database": args.copy_to_database},
+                                           on_duplicate=args.on_duplicate, truncate=args.truncate,
+                                           disable_checks=args.disable_checks, create_tables=args.create_tables)
+    elif args.copy_to_sqlite:
+        from table_copy import SQLiteCopyTarget
+        args.copy_target = SQLiteCopyTarget(os.path.expanduser(args.copy_to_sqlite),
+                                            on_duplicate=args.on_duplicate, truncate=args.truncate)
+    return args
 
 if __name__ == "__main__":
-    export_database_to_json()
\ No newline at end of file
+    args = parse_args()
+    connection_settings = None
+    if args.database:
+        connection_settings = {"host": args.host, "user": args.user, "password": args.password,
+                               "database": args.database}
+    if args.copy_target is not None:
+        completed = copy_database_tables(args.copy_target, batch_size=args.batch_size, workers=args.workers,
+                                         exact_counts=args.exact_counts, connection_settings=connection_settings,
+                                         table_patterns=args.tables)
+        sys.exit(0 if completed else 1)
+    completed = export_database_to_json(batch_size=args.batch_size, workers=args.workers,
+                            split_ranges=args.split_ranges, split_min_rows=args.split_min_rows,
+                            use_checkpoint=args.checkpoint, resume=args.resume,
+                            watermark_specs=args.watermark, compression=args.compression,
+                            encoder=args.encoder, exact_counts=args.exact_counts, profiler=args.profiler,
+                            timing_report=args.timing_report, prometheus_textfile=args.prometheus_textfile,
+                            pipeline_memory=args.pipeline_memory, consistent_snapshot=args.snapshot,
+                            snapshot_lock=args.snapshot_lock, binary=args.binary_values,
+                            connection_settings=connection_settings, table_patterns=args.tables,
+                            export_format_name=args.format, output_dir=args.output_dir)
+    sys.exit(0 if completed else 1)
\ No newline at end of file
@@ -1,191 +1,410 @@
 import sys
 import mysql.connector
-import json
 import os
 import time
-from datetime import datetime, date
+from datetime import datetime
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QLineEdit, QPushButton, 
-                             QTextEdit, QProgressBar, QCheckBox, QListWidget,
+                             QPlainTextEdit, QProgressBar, QCheckBox, QTableView, QHeaderView,
                              QFileDialog, QMessageBox, QTabWidget, QGridLayout,
                              QGroupBox, QRadioButton, QButtonGroup, QScrollArea,
-                             QFrame, QSplitter)
-from PyQt5.QtCore import QThread, pyqtSignal, Qt, QTimer
+                             QFrame, QSplitter, QSpinBox, QComboBox)
+from PyQt5.QtCore import (QThread, pyqtSignal, Qt, QTimer, QAbstractTableModel, QModelIndex,
+                          QSortFilterProxyModel)
 from PyQt5.QtGui import QFont, QPixmap, QPalette, QColor
+from export_streaming import DEFAULT_BATCH_SIZE, ExportCancelled
+from parallel_export import DEFAULT_WORKERS, MAX_WORKERS, DEFAULT_SPLIT_RANGES, DEFAULT_SPLIT_MIN_ROWS
+from json_encoder import DEFAULT_ENCODER, JSONEncoder
+from output_compression import COMPRESSION_SUFFIXES, OutputCompression
+from export_engine import ExportJob
+from export_pipeline import DEFAULT_PIPELINE_MEMORY
+from export_snapshot import SNAPSHOT_LOCKS
+from binary_values import BINARY_STRATEGIES, DEFAULT_BLOB_THRESHOLD, BinaryValues
+from export_progress import format_duration, format_file_size, format_rate, parse_file_size, process_memory
+from export_profiling import ExportProfiler
+from table_metadata import TABLE_FILTER_MODES, load_table_metadata, format_row_count, table_name_matcher
+from incremental import parse_watermark_specs
+from table_copy import MySQLCopyTarget, SQLiteCopyTarget, TableCopier
+
+EXPORT_FORMATS = {
+    "single": "single_file",
+    "separate": "separate_files",
+    "jsonl": "json_lines"
+}
+
+# The dashboard and the log are redrawn on a timer rather than once per
+# batch or message, and the log view keeps only the newest lines
+DASHBOARD_INTERVAL_MS = 500
+LOG_VIEW_LINES = 5000
 
 class DatabaseExportThread(QThread):
-    progress_signal = pyqtSignal(int, str)
     table_progress_signal = pyqtSignal(str, int, int)
     finished_signal = pyqtSignal(bool, str)
     log_signal = pyqtSignal(str)
     
-    def __init__(self, connection_params, selected_tables, export_format, output_dir):
+    def __init__(self, connection_params, selected_tables, export_format, output_dir, batch_size=DEFAULT_BATCH_SIZE,
+                 workers=DEFAULT_WORKERS, split_ranges=DEFAULT_SPLIT_RANGES, split_min_rows=DEFAULT_SPLIT_MIN_ROWS,
+                 use_checkpoint=False, resume=False, watermark_specs=None, compression=None,
+                 encoder=DEFAULT_ENCODER, exact_counts=False, profiler=None, timing_report=None,
+                 prometheus_textfile=None, pipeline_memory=None, consistent_snapshot=False, snapshot_lock="flush",
+                 binary=None):
         super().__init__()
         self.connection_params = connection_params
         self.selected_tables = selected_tables
         self.export_format = export_format
         self.output_dir = output_dir
+        self.batch_size = batch_size
+        self.workers = workers
+        self.split_ranges = split_ranges
+        self.split_min_rows = split_min_rows
+        self.use_checkpoint = use_checkpoint
+        self.resume = resume
+        self.watermark_specs = watermark_specs
+        self.compression = compression
+        self.encoder = encoder
+        self.exact_counts = exact_counts
+        self.profiler = profiler or ExportProfiler()
+        self.timing_report = timing_report
+        self.prometheus_textfile = prometheus_textfile
+        self.pipeline_memory = pipeline_memory
+        self.consistent_snapshot = consistent_snapshot
+        self.snapshot_lock = snapshot_lock
+        self.binary = binary
+        self.job = None
         self.is_cancelled = False
     
     def cancel_export(self):
         self.is_cancelled = True
+        if self.job is not None:
+            self.job.cancel()
+    
+    def format_file_size(self, size_bytes, uncompressed_bytes=None):
+        return format_file_size(size_bytes, uncompressed_bytes)
     
-    def format_file_size(self, size_bytes):
-        if size_bytes == 0:
-            return "0 B"
-        size_names = ["B", "KB", "MB", "GB"]
-        i = 0
-        size = float(size_bytes)
-        while size >= 1024.0 and i < len(size_names) - 1:
-            size /= 1024.0
-            i += 1
-        return f"{size:.1f} {size_names[i]}"
+    def current_progress(self):
+        # Polled by the window's dashboard timer; ExportProgress is thread-safe
+        if self.job is None or self.job.exporter is None:
+            return None
+        return self.job.exporter.progress
     
     def run(self):
+        job = None
         try:
             self.log_signal.emit("Connecting to MySQL database...")
+            profiler = self.profiler
+            profiler.start()
+            profiler.begin_phase("connect")
             connection = mysql.connector.connect(**self.connection_params)
-            cursor = connection.cursor()
+            profiler.end_phase("connect")
             
             total_tables = len(self.selected_tables)
-            exported_files = []
+            table_numbers = {table_name: i for i, table_name in enumerate(self.selected_tables, 1)}
             
-
-            export_metadata = {
-                "database": self.connection_params['database'],
-                "exported_at": datetime.now().isoformat(),
-                "selected_tables_count": total_tables,
-                "export_format": "single_file" if self.export_format == "single" else "separate_files",
-                "output_location": self.output_dir
-            }
+            def on_table_start(table_name):
+                details = job.table_details[table_name]
+                self.table_progress_signal.emit(table_name, table_numbers[table_name], total_tables)
+                self.log_signal.emit(f"Processing table: {table_name} ({table_numbers[table_name]}/{total_tables})")
+                self.log_signal.emit(f"   Columns: {len(details['columns'])} | Rows: {format_row_count(details)}")
+            
+            job = ExportJob(self.connection_params, self.selected_tables, EXPORT_FORMATS[self.export_format],
+                            self.output_dir, batch_size=self.batch_size, workers=self.workers,
+                            split_ranges=self.split_ranges, split_min_rows=self.split_min_rows,
+                            use_checkpoint=self.use_checkpoint, resume=self.resume,
+                            watermark_specs=self.watermark_specs, compression=self.compression,
+                            encoder=self.encoder, exact_counts=self.exact_counts, profiler=profiler,
+                            timing_report=self.timing_report, prometheus_textfile=self.prometheus_textfile,
+                            pipeline_memory=self.pipeline_memory, consistent_snapshot=self.consistent_snapshot,
+                            snapshot_lock=self.snapshot_lock, binary=self.binary, log=self.log_signal.emit,
+                            on_table_start=on_table_start, is_cancelled=lambda: self.is_cancelled)
+            self.job = job
+            job.prepare(connection)
             
             if self.export_format == "single":
-                database_json = export_metadata.copy()
-                database_json["tables"] = {}
+                self.log_signal.emit(f"Writing combined file: {os.path.basename(job.output_file)}")
+            if self.workers > 1:
+                self.log_signal.emit(f"Exporting with {self.workers} parallel workers")
             
-            for table_index, table_name in enumerate(self.selected_tables, 1):
-                if self.is_cancelled:
-                    break
-                
-                self.table_progress_signal.emit(table_name, table_index, total_tables)
-                self.log_signal.emit(f"Processing table: {table_name} ({table_index}/{total_tables})")
-                
-
-                cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
-                row_count = cursor.fetchone()[0]
-                
-                cursor.execute(f"DESCRIBE `{table_name}`")
-                columns = [col[0] for col in cursor.fetchall()]
-                
-                self.log_signal.emit(f"   Columns: {len(columns)} | Rows: {row_count:,}")
-                
-
-                self.log_signal.emit("   Fetching data...")
-                cursor.execute(f"SELECT * FROM `{table_name}`")
-                rows = cursor.fetchall()
-                
-
-                self.log_signal.emit("   Converting to JSON format...")
-                table_data = []
-                total_rows = len(rows)
-                
-                for row_index, row in enumerate(rows):
-                    if self.is_cancelled:
-                        break
-                    
-
-                    if total_rows > 1000 and row_index % max(1, total_rows // 20) == 0:
-                        progress = int((row_index / total_rows) * 100)
-                        self.progress_signal.emit(progress, f"Converting {table_name}: {row_index:,}/{total_rows:,} rows")
-                    
-                    row_dict = {}
-                    for i, value in enumerate(row):
-                        if isinstance(value, (datetime, date)):
-                            row_dict[columns[i]] = value.isoformat() if value is not None else None
-                        elif value is None:
-                            row_dict[columns[i]] = None
-                        elif isinstance(value, bytes):
-                            row_dict[columns[i]] = value.decode('utf-8', errors='ignore')
-                        elif isinstance(value, (int, float, str, bool)):
-                            row_dict[columns[i]] = value
-                        else:
-                            row_dict[columns[i]] = str(value)
-                    table_data.append(row_dict)
-                
-                if self.is_cancelled:
-                    break
-                
-
-                table_json = {
-                    "table_name": table_name,
-                    "database": self.connection_params['database'],
-                    "exported_at": export_metadata["exported_at"],
-                    "columns": columns,
-                    "row_count": len(table_data),
-                    "data": table_data
-                }
-                
-                if self.export_format == "single":
-                    database_json["tables"][table_name] = {
-                        "columns": columns,
-                        "row_count": len(table_data),
-                        "data": table_data
-                    }
-                else:
-
-                    table_file = os.path.join(self.output_dir, f'{self.connection_params["database"]}_{table_name}.json')
-                    self.log_signal.emit(f"   Saving to: {os.path.basename(table_file)}")
-                    
-                    with open(table_file, 'w', encoding='utf-8') as f:
-                        json.dump(table_json, f, indent=2, ensure_ascii=False, default=str)
-                    
-                    file_size = os.path.getsize(table_file)
-                    exported_files.append(table_file)
-                    self.log_signal.emit(f"   Saved: {os.path.basename(table_file)} ({self.format_file_size(file_size)})")
-                
-
-                overall_progress = int((table_index / total_tables) * 100)
-                self.progress_signal.emit(overall_progress, f"Completed {table_index}/{total_tables} tables")
+            try:
+                for result in job.export_tables(connection):
+                    table_name = result["table_name"]
+                    if result.get("delta") == "unchanged":
+                        self.log_signal.emit(f"Unchanged: {table_name} (no rows after {result['watermark']['value']})")
+                        continue
+                    if result.get("checkpoint") == "skipped":
+                        self.log_signal.emit(f"Skipped: {table_name} (already exported, {result['row_count']:,} rows)")
+                    elif result.get("checkpoint") == "resumed":
+                        self.log_signal.emit(f"   Resumed {table_name} from checkpoint")
+                    if "table_file" in result:
+                        table_file = result["table_file"]
+                        file_size = os.path.getsize(table_file)
+                        self.log_signal.emit(f"   Saved: {os.path.basename(table_file)} "
+                                             f"({self.format_file_size(file_size, result.get('uncompressed_size'))})")
+                    else:
+                        self.log_signal.emit(f"   Exported: {table_name} ({result['row_count']:,} rows)")
+                    if "key_ranges" in result:
+                        self.log_signal.emit(f"   Fetched {table_name} as {result['key_ranges']} key ranges")
+            except ExportCancelled:
+                # Dropping the connection discards the unread rest of the result set
+                connection.close()
             
             if not self.is_cancelled:
+                outcome = job.finish()
+                rows_per_second, bytes_per_second = job.exporter.progress.rates()
+                throughput = (f"Time: {format_duration(job.exporter.progress.elapsed())} "
+                              f"({rows_per_second:,.0f} rows/s, {format_rate(bytes_per_second)})")
 
                 if self.export_format == "single":
-                    output_file = os.path.join(self.output_dir, f'{self.connection_params["database"]}_database.json')
-                    self.log_signal.emit(f"Creating combined file: {os.path.basename(output_file)}")
-                    
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        json.dump(database_json, f, indent=2, ensure_ascii=False, default=str)
-                    
-                    file_size = os.path.getsize(output_file)
-                    self.finished_signal.emit(True, f"Export completed successfully!\nFile: {output_file}\nSize: {self.format_file_size(file_size)}")
+                    self.finished_signal.emit(True, f"Export completed successfully!\nFile: {outcome['output_file']}\nSize: {self.format_file_size(outcome['file_size'], outcome['uncompressed_size'])}\n{throughput}")
                 else:
-
-                    summary_file = os.path.join(self.output_dir, f'{self.connection_params["database"]}_export_summary.json')
-                    summary_data = export_metadata.copy()
-                    summary_data["exported_files"] = exported_files
-                    summary_data["table_list"] = self.selected_tables
-                    
-                    with open(summary_file, 'w', encoding='utf-8') as f:
-                        json.dump(summary_data, f, indent=2, ensure_ascii=False, default=str)
-                    
-                    total_size = sum(os.path.getsize(f) for f in exported_files)
-                    self.finished_signal.emit(True, f"Export completed successfully!\nFiles: {len(exported_files)} tables + summary\nLocation: {self.output_dir}\nTotal Size: {self.format_file_size(total_size)}")
+                    self.finished_signal.emit(True, f"Export completed successfully!\nFiles: {len(outcome['exported_files'])} tables + summary\nLocation: {self.output_dir}\nTotal Size: {self.format_file_size(outcome['total_size'], outcome['total_uncompressed_size'])}\n{throughput}")
             else:
+                job.abort()
                 self.finished_signal.emit(False, "Export cancelled by user")
             
-            cursor.close()
-            connection.close()
+            if connection.is_connected():
+                connection.close()
             
         except mysql.connector.Error as err:
+            if job is not None:
+                job.abort()
             self.finished_signal.emit(False, f"MySQL Error: {err}")
         except Exception as err:
+            if job is not None:
+                job.abort()
             self.finished_signal.emit(False, f"Error: {err}")
+        finally:
+            if job is not None:
+                job.close()
+            else:
+                self.profiler.stop()
+
+class DatabaseCopyThread(QThread):
+    # Copies the selected tables into another database instead of exporting
+    # them; reports through the same signals as DatabaseExportThread
+    table_progress_signal = pyqtSignal(str, int, int)
+    finished_signal = pyqtSignal(bool, str)
+    log_signal = pyqtSignal(str)
+    
+    def __init__(self, connection_params, selected_tables, target, batch_size=DEFAULT_BATCH_SIZE,
+                 workers=DEFAULT_WORKERS, exact_counts=False):
+        super().__init__()
+        self.connection_params = connection_params
+        self.selected_tables = selected_tables
+        self.target = target
+        self.batch_size = batch_size
+        self.workers = workers
+        self.exact_counts = exact_counts
+        self.copier = None
+        self.is_cancelled = False
+    
+    def cancel_export(self):
+        self.is_cancelled = True
+        if self.copier is not None:
+            self.copier.cancel()
+    
+    def current_progress(self):
+        if self.copier is None:
+            return None
+        return self.copier.progress
+    
+    def run(self):
+        connection = None
+        try:
+            self.log_signal.emit("Connecting to MySQL database...")
+            connection = mysql.connector.connect(**self.connection_params)
+            
+            total_tables = len(self.selected_tables)
+            table_numbers = {table_name: i for i, table_name in enumerate(self.selected_tables, 1)}
+            
+            def on_table_start(table_name):
+                self.table_progress_signal.emit(table_name, table_numbers[table_name], total_tables)
+            
+            copier = TableCopier(self.connection_params, self.selected_tables, self.target,
+                                 batch_size=self.batch_size, workers=self.workers, exact_counts=self.exact_counts,
+                                 log=self.log_signal.emit, on_table_start=on_table_start,
+                                 is_cancelled=lambda: self.is_cancelled)
+            copier.prepare(connection)
+            self.copier = copier
+            self.log_signal.emit(f"Copying {total_tables} tables to {self.target.describe()}")
+            
+            for result in copier.copy_tables(connection):
+                self.log_signal.emit(f"   Copied: {result['table_name']} ({result['row_count']:,} rows)")
+            
+            rows_per_second, _ = copier.progress.rates()
+            self.finished_signal.emit(True, f"Copy completed successfully!\nTarget: {self.target.describe()}\n"
+                                            f"Rows: {copier.total_rows:,}\n"
+                                            f"Time: {format_duration(copier.progress.elapsed())} "
+                                            f"({rows_per_second:,.0f} rows/s)")
+        except ExportCancelled:
+            self.finished_signal.emit(False, "Copy cancelled by user; the table in progress is partly copied")
+        except mysql.connector.Error as err:
+            self.finished_signal.emit(False, f"MySQL Error: {err}")
+        except Exception as err:
+            self.finished_signal.emit(False, f"Error: {err}")
+        finally:
+            if connection is not None and connection.is_connected():
+                connection.close()
+
+class TableLoaderThread(QThread):
+    # Reads the table list on its own connection so the window stays usable;
+    # names come first, the information_schema details once they are read
+    tables_signal = pyqtSignal(list)
+    metadata_signal = pyqtSignal(dict)
+    error_signal = pyqtSignal(str)
+    
+    def __init__(self, connection_params):
+        super().__init__()
+        self.connection_params = connection_params
+    
+    def run(self):
+        try:
+            connection = mysql.connector.connect(**self.connection_params)
+            try:
+                cursor = connection.cursor()
+                cursor.execute("SHOW TABLES")
+                tables = [row[0] for row in cursor.fetchall()]
+                self.tables_signal.emit(tables)
+                self.metadata_signal.emit(load_table_metadata(cursor, self.connection_params["database"], tables))
+                cursor.close()
+            finally:
+                connection.close()
+        except (mysql.connector.Error, ValueError) as err:
+            self.error_signal.emit(str(err))
+
+TABLE_COLUMNS = ("Table", "Rows", "Size", "Columns")
+SORT_ROLE = Qt.UserRole + 1
+
+class TableListModel(QAbstractTableModel):
+    # One row per table, with no widget per item, so schemas with tens of
+    # thousands of tables stay responsive. The selection is kept in the
+    # check boxes, so tables hidden by the filter stay selected.
+    selection_changed = pyqtSignal()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tables = []
+        self.metadata = {}
+        self.checked = set()
+    
+    def set_tables(self, tables):
+        self.beginResetModel()
+        self.tables = list(tables)
+        self.metadata = {}
+        self.checked &= set(self.tables)
+        self.endResetModel()
+        self.selection_changed.emit()
+    
+    def set_metadata(self, metadata):
+        self.metadata = metadata
+        if self.tables:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.tables) - 1, len(TABLE_COLUMNS) - 1))
+        self.selection_changed.emit()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.tables)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(TABLE_COLUMNS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return TABLE_COLUMNS[section]
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        table_name = self.tables[index.row()]
+        details = self.metadata.get(table_name)
+        column = index.column()
+        if role == Qt.CheckStateRole and column == 0:
+            return Qt.Checked if table_name in self.checked else Qt.Unchecked
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return table_name
+            if details is None:
+                return "..."
+            if column == 1:
+                return format_row_count(details)
+            if column == 2:
+                return format_file_size(details["data_length"])
+            return str(len(details["columns"]))
+        if role == SORT_ROLE:
+            if column == 0:
+                return table_name.lower()
+            if details is None:
+                return -1
+            return (details["row_count"], details["data_length"], len(details["columns"]))[column - 1]
+        if role == Qt.TextAlignmentRole and column > 0:
+            return Qt.AlignRight | Qt.AlignVCenter
+        if role == Qt.ToolTipRole and details is not None:
+            primary_key = ", ".join(details["primary_key"]) or "none"
+            return (f"{format_row_count(details)} rows | {format_file_size(details['data_length'])} | "
+                    f"{len(details['columns'])} columns | primary key: {primary_key}")
+        return None
+    
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == 0:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or index.column() != 0:
+            return False
+        table_name = self.tables[index.row()]
+        if value == Qt.Checked:
+            self.checked.add(table_name)
+        else:
+            self.checked.discard(table_name)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.selection_changed.emit()
+        return True
+    
+    def set_checked(self, table_names, checked):
+        # One change notification for the whole column instead of one per table
+        if checked:
+            self.checked.update(table_names)
+        else:
+            self.checked.difference_update(table_names)
+        if self.tables:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.tables) - 1, 0), [Qt.CheckStateRole])
+        self.selection_changed.emit()
+    
+    def checked_tables(self):
+        return [table_name for table_name in self.tables if table_name in self.checked]
+
+class TableFilterProxyModel(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.name_matcher = None
+        self.max_size = None
+        self.setSortRole(SORT_ROLE)
+    
+    def set_filter(self, name_matcher, max_size):
+        self.name_matcher = name_matcher
+        self.max_size = max_size
+        self.invalidateFilter()
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        model = self.sourceModel()
+        table_name = model.tables[source_row]
+        if self.name_matcher is not None and not self.name_matcher(table_name):
+            return False
+        if self.max_size is not None:
+            # Until its size is known a table cannot be under the limit
+            details = model.metadata.get(table_name)
+            if details is None or details["data_length"] >= self.max_size:
+                return False
+        return True
+    
+    def visible_tables(self):
+        model = self.sourceModel()
+        return [model.tables[self.mapToSource(self.index(row, 0)).row()] for row in range(self.rowCount())]
 
 class MySQLtoJSONGUI(QMainWindow):
     def __init__(self):
         super().__init__()
         self.export_thread = None
-        self.all_tables = []
+        self.table_loader = None
         self.connection = None
         self.init_ui()
     
@@ -268,16 +487,41 @@ class MySQLtoJSONGUI(QMainWindow):
         tables_layout = QVBoxLayout(tables_group)
         
 
+        filter_layout = QHBoxLayout()
+        self.table_filter_input = QLineEdit()
+        self.table_filter_input.setPlaceholderText("Filter tables, e.g. order or user*")
+        self.table_filter_mode = QComboBox()
+        self.table_filter_mode.addItems([mode.capitalize() for mode in TABLE_FILTER_MODES])
+        self.table_size_input = QLineEdit()
+        self.table_size_input.setPlaceholderText("e.g. 1 GB")
+        self.table_size_input.setToolTip("Only show tables smaller than this size")
+        
+        self.table_filter_input.textChanged.connect(self.apply_table_filter)
+        self.table_filter_mode.currentIndexChanged.connect(self.apply_table_filter)
+        self.table_size_input.textChanged.connect(self.apply_table_filter)
+        
+        filter_layout.addWidget(QLabel("Filter:"))
+        filter_layout.addWidget(self.table_filter_input)
+        filter_layout.addWidget(self.table_filter_mode)
+        filter_layout.addWidget(QLabel("Under:"))
+        filter_layout.addWidget(self.table_size_input)
+        
+        tables_layout.addLayout(filter_layout)
+        
+
         selection_layout = QHBoxLayout()
-        self.select_all_btn = QPushButton("Select All")
+        self.select_all_btn = QPushButton("Select Shown")
+        self.deselect_shown_btn = QPushButton("Deselect Shown")
         self.select_none_btn = QPushButton("Select None")
         self.refresh_tables_btn = QPushButton("Refresh Tables")
         
         self.select_all_btn.clicked.connect(self.select_all_tables)
+        self.deselect_shown_btn.clicked.connect(self.deselect_shown_tables)
         self.select_none_btn.clicked.connect(self.select_no_tables)
         self.refresh_tables_btn.clicked.connect(self.load_tables)
         
         selection_layout.addWidget(self.select_all_btn)
+        selection_layout.addWidget(self.deselect_shown_btn)
         selection_layout.addWidget(self.select_none_btn)
         selection_layout.addWidget(self.refresh_tables_btn)
         selection_layout.addStretch()
@@ -285,9 +529,18 @@ class MySQLtoJSONGUI(QMainWindow):
         tables_layout.addLayout(selection_layout)
         
 
-        self.tables_list = QListWidget()
-        self.tables_list.setSelectionMode(QListWidget.MultiSelection)
-        tables_layout.addWidget(self.tables_list)
+        self.table_model = TableListModel(self)
+        self.table_proxy = TableFilterProxyModel(self)
+        self.table_proxy.setSourceModel(self.table_model)
+        
+        self.tables_view = QTableView()
+        self.tables_view.setModel(self.table_proxy)
+        self.tables_view.setSortingEnabled(True)
+        self.tables_view.sortByColumn(0, Qt.AscendingOrder)
+        self.tables_view.setSelectionBehavior(QTableView.SelectRows)
+        self.tables_view.verticalHeader().setVisible(False)
+        self.tables_view.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        tables_layout.addWidget(self.tables_view)
         
 
         self.selected_count_label = QLabel("No tables selected")
@@ -296,7 +549,7 @@ class MySQLtoJSONGUI(QMainWindow):
         layout.addWidget(tables_group)
         
 
-        self.tables_list.itemSelectionChanged.connect(self.update_selected_count)
+        self.table_model.selection_changed.connect(self.update_selected_count)
     
     def create_export_tab(self):
         export_tab = QWidget()
@@ -311,13 +564,32 @@ class MySQLtoJSONGUI(QMainWindow):
         self.format_button_group = QButtonGroup()
         self.single_file_radio = QRadioButton("Single JSON file (all tables combined)")
         self.separate_files_radio = QRadioButton("Separate JSON files (one per table)")
+        self.json_lines_radio = QRadioButton("JSON Lines files (one .jsonl per table, one row per line)")
         self.single_file_radio.setChecked(True)
         
         self.format_button_group.addButton(self.single_file_radio)
         self.format_button_group.addButton(self.separate_files_radio)
+        self.format_button_group.addButton(self.json_lines_radio)
         
         format_layout.addWidget(self.single_file_radio)
         format_layout.addWidget(self.separate_files_radio)
+        format_layout.addWidget(self.json_lines_radio)
+        
+        binary_layout = QHBoxLayout()
+        self.binary_input = QComboBox()
+        self.binary_input.addItems(BINARY_STRATEGIES)
+        self.binary_input.setToolTip("text: decode as UTF-8, dropping invalid bytes; base64: exact bytes inline; "
+                                     "files: large values go to <db>_blobs/, one file per distinct content")
+        self.blob_threshold_input = QSpinBox()
+        self.blob_threshold_input.setRange(0, 1048576)
+        self.blob_threshold_input.setValue(DEFAULT_BLOB_THRESHOLD // 1024)
+        self.blob_threshold_input.setToolTip("With files, values larger than this are written to side files")
+        binary_layout.addWidget(QLabel("BLOB/BINARY columns:"))
+        binary_layout.addWidget(self.binary_input)
+        binary_layout.addWidget(QLabel("Side files above (KB):"))
+        binary_layout.addWidget(self.blob_threshold_input)
+        binary_layout.addStretch()
+        format_layout.addLayout(binary_layout)
         
         layout.addWidget(format_group)
         
@@ -335,6 +607,172 @@ class MySQLtoJSONGUI(QMainWindow):
         layout.addWidget(output_group)
         
 
+        performance_group = QGroupBox("Performance Settings")
+        performance_layout = QGridLayout(performance_group)
+        
+        self.batch_size_input = QSpinBox()
+        self.batch_size_input.setRange(100, 1000000)
+        self.batch_size_input.setSingleStep(1000)
+        self.batch_size_input.setValue(DEFAULT_BATCH_SIZE)
+        self.batch_size_input.setToolTip("Rows fetched from the server and written per batch")
+        
+        performance_layout.addWidget(QLabel("Batch size (rows):"), 0, 0)
+        performance_layout.addWidget(self.batch_size_input, 0, 1)
+        
+        self.workers_input = QSpinBox()
+        self.workers_input.setRange(1, MAX_WORKERS)
+        self.workers_input.setValue(DEFAULT_WORKERS)
+        self.workers_input.setToolTip("Tables exported in parallel, each on its own pooled connection")
+        
+        performance_layout.addWidget(QLabel("Parallel workers:"), 1, 0)
+        performance_layout.addWidget(self.workers_input, 1, 1)
+        
+        self.split_ranges_input = QSpinBox()
+        self.split_ranges_input.setRange(1, 256)
+        self.split_ranges_input.setValue(DEFAULT_SPLIT_RANGES)
+        self.split_ranges_input.setToolTip("Split large tables into this many primary key ranges fetched in parallel (needs more than one worker)")
+        
+        self.split_min_rows_input = QSpinBox()
+        self.split_min_rows_input.setRange(1, 2000000000)
+        self.split_min_rows_input.setSingleStep(100000)
+        self.split_min_rows_input.setValue(DEFAULT_SPLIT_MIN_ROWS)
+        self.split_min_rows_input.setToolTip("Only split tables with at least this many rows")
+        
+        performance_layout.addWidget(QLabel("Key ranges per large table:"), 2, 0)
+        performance_layout.addWidget(self.split_ranges_input, 2, 1)
+        performance_layout.addWidget(QLabel("Split tables from (rows):"), 3, 0)
+        performance_layout.addWidget(self.split_min_rows_input, 3, 1)
+        
+        self.checkpoint_checkbox = QCheckBox("Resumable export (keyset pages + checkpoint file)")
+        self.checkpoint_checkbox.setToolTip("Record progress in <db>_export_checkpoint.json (separate or JSON Lines files only)")
+        self.resume_checkbox = QCheckBox("Resume the interrupted export in the output directory")
+        performance_layout.addWidget(self.checkpoint_checkbox, 4, 0, 1, 2)
+        performance_layout.addWidget(self.resume_checkbox, 5, 0, 1, 2)
+        
+        self.compression_input = QComboBox()
+        self.compression_input.addItems(["None"] + list(COMPRESSION_SUFFIXES))
+        self.compression_input.setToolTip("Compress files while they are written (zstd and lz4 need the zstandard and lz4 packages)")
+        
+        self.compression_level_input = QSpinBox()
+        self.compression_level_input.setRange(-1, 22)
+        self.compression_level_input.setValue(-1)
+        self.compression_level_input.setSpecialValueText("Default")
+        
+        self.compression_threads_input = QSpinBox()
+        self.compression_threads_input.setRange(0, 64)
+        self.compression_threads_input.setToolTip("Extra threads used to compress each file (zstd only)")
+        
+        performance_layout.addWidget(QLabel("Compression:"), 6, 0)
+        performance_layout.addWidget(self.compression_input, 6, 1)
+        performance_layout.addWidget(QLabel("Compression level:"), 7, 0)
+        performance_layout.addWidget(self.compression_level_input, 7, 1)
+        performance_layout.addWidget(QLabel("Compression threads:"), 8, 0)
+        performance_layout.addWidget(self.compression_threads_input, 8, 1)
+        
+        self.compact_json_checkbox = QCheckBox("Compact JSON (no indentation)")
+        self.compact_json_checkbox.setToolTip("Write .json files without indentation; JSON Lines rows are always compact")
+        performance_layout.addWidget(self.compact_json_checkbox, 9, 0, 1, 2)
+        
+        self.exact_counts_checkbox = QCheckBox("Exact row counts (SELECT COUNT(*) per table)")
+        self.exact_counts_checkbox.setToolTip("Count rows before exporting instead of using information_schema estimates")
+        performance_layout.addWidget(self.exact_counts_checkbox, 10, 0, 1, 2)
+        
+        self.timing_report_checkbox = QCheckBox("Write timing report (<database>_timing_report.json)")
+        self.timing_report_checkbox.setToolTip("Save per-phase wall and CPU times for the run and each table")
+        performance_layout.addWidget(self.timing_report_checkbox, 11, 0, 1, 2)
+        
+        self.trace_memory_checkbox = QCheckBox("Trace peak memory (tracemalloc, slower)")
+        self.trace_memory_checkbox.setToolTip("Record peak memory for the run, and per table with 1 worker")
+        performance_layout.addWidget(self.trace_memory_checkbox, 12, 0, 1, 2)
+        
+        self.prometheus_input = QLineEdit()
+        self.prometheus_input.setPlaceholderText("Optional, e.g. /var/lib/node_exporter/json_export.prom")
+        self.prometheus_input.setToolTip("Write export metrics for node_exporter's textfile collector")
+        performance_layout.addWidget(QLabel("Prometheus textfile:"), 13, 0)
+        performance_layout.addWidget(self.prometheus_input, 13, 1)
+        
+        self.pipeline_checkbox = QCheckBox("Pipelined export (fetch, encode and write on separate threads)")
+        self.pipeline_checkbox.setToolTip("Read the next batch from the server while the last one is written")
+        performance_layout.addWidget(self.pipeline_checkbox, 14, 0, 1, 2)
+        
+        self.pipeline_memory_input = QSpinBox()
+        self.pipeline_memory_input.setRange(1, 65536)
+        self.pipeline_memory_input.setValue(DEFAULT_PIPELINE_MEMORY // (1024 * 1024))
+        self.pipeline_memory_input.setToolTip("Memory the batches waiting between the pipeline threads may use")
+        performance_layout.addWidget(QLabel("Pipeline memory (MB):"), 15, 0)
+        performance_layout.addWidget(self.pipeline_memory_input, 15, 1)
+        
+        self.snapshot_checkbox = QCheckBox("Consistent snapshot (all tables and workers see the same point in time)")
+        self.snapshot_checkbox.setToolTip("Export InnoDB tables from one transaction snapshot per connection and record "
+                                          "the binary log position in the summary")
+        performance_layout.addWidget(self.snapshot_checkbox, 16, 0, 1, 2)
+        
+        self.snapshot_lock_input = QComboBox()
+        self.snapshot_lock_input.addItems(SNAPSHOT_LOCKS)
+        self.snapshot_lock_input.setToolTip("flush: FLUSH TABLES WITH READ LOCK while the snapshots start (milliseconds, "
+                                            "needs RELOAD); none: no lock, snapshots may differ slightly")
+        performance_layout.addWidget(QLabel("Snapshot lock:"), 17, 0)
+        performance_layout.addWidget(self.snapshot_lock_input, 17, 1)
+        
+        layout.addWidget(performance_group)
+        
+
+        incremental_group = QGroupBox("Incremental Export")
+        incremental_layout = QGridLayout(incremental_group)
+        
+        self.watermark_input = QLineEdit()
+        self.watermark_input.setPlaceholderText("e.g. *=updated_at, orders=id")
+        self.watermark_input.setToolTip("Export only rows newer than the watermark stored in the previous export summary, "
+                                        "as delta files (separate or JSON Lines files only)")
+        
+        incremental_layout.addWidget(QLabel("Watermark columns:"), 0, 0)
+        incremental_layout.addWidget(self.watermark_input, 0, 1)
+        
+        layout.addWidget(incremental_group)
+        
+
+        copy_group = QGroupBox("Direct Copy (to another database, no JSON files)")
+        copy_layout = QGridLayout(copy_group)
+        
+        self.copy_target_input = QComboBox()
+        self.copy_target_input.addItems(["MySQL database", "SQLite file"])
+        self.copy_database_input = QLineEdit()
+        self.copy_database_input.setPlaceholderText("Target database name, or SQLite file path")
+        self.copy_host_input = QLineEdit()
+        self.copy_host_input.setPlaceholderText("Same as the source")
+        self.copy_user_input = QLineEdit()
+        self.copy_user_input.setPlaceholderText("Same as the source")
+        self.copy_password_input = QLineEdit()
+        self.copy_password_input.setEchoMode(QLineEdit.Password)
+        self.copy_password_input.setPlaceholderText("Same as the source")
+        
+        copy_layout.addWidget(QLabel("Copy to:"), 0, 0)
+        copy_layout.addWidget(self.copy_target_input, 0, 1)
+        copy_layout.addWidget(QLabel("Database / file:"), 1, 0)
+        copy_layout.addWidget(self.copy_database_input, 1, 1)
+        copy_layout.addWidget(QLabel("Target host:"), 2, 0)
+        copy_layout.addWidget(self.copy_host_input, 2, 1)
+        copy_layout.addWidget(QLabel("Target username:"), 3, 0)
+        copy_layout.addWidget(self.copy_user_input, 3, 1)
+        copy_layout.addWidget(QLabel("Target password:"), 4, 0)
+        copy_layout.addWidget(self.copy_password_input, 4, 1)
+        
+        self.copy_create_tables_checkbox = QCheckBox("Create missing tables (SHOW CREATE TABLE on the source)")
+        self.copy_create_tables_checkbox.setToolTip("SQLite targets always create missing tables")
+        self.copy_truncate_checkbox = QCheckBox("Empty each target table first")
+        self.copy_disable_checks_checkbox = QCheckBox("Disable foreign key and unique checks on the target")
+        copy_layout.addWidget(self.copy_create_tables_checkbox, 5, 0, 1, 2)
+        copy_layout.addWidget(self.copy_truncate_checkbox, 6, 0, 1, 2)
+        copy_layout.addWidget(self.copy_disable_checks_checkbox, 7, 0, 1, 2)
+        
+        self.start_copy_btn = QPushButton("Start Copy")
+        self.start_copy_btn.clicked.connect(self.start_copy)
+        self.start_copy_btn.setEnabled(False)
+        copy_layout.addWidget(self.start_copy_btn, 8, 0, 1, 2)
+        
+        layout.addWidget(copy_group)
+        
+
         self.start_export_btn = QPushButton("Start Export")
         self.start_export_btn.clicked.connect(self.start_export)
         self.start_export_btn.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; font-weight: bold; padding: 10px; }")
@@ -364,6 +802,22 @@ class MySQLtoJSONGUI(QMainWindow):
         self.table_progress_label = QLabel("No table being processed")
         progress_layout.addWidget(self.table_progress_label)
         
+        rates_layout = QHBoxLayout()
+        self.rows_rate_label = QLabel("Rows/s: -")
+        self.bytes_rate_label = QLabel("Written: -")
+        self.eta_label = QLabel("ETA: -")
+        self.elapsed_label = QLabel("Elapsed: -")
+        self.memory_label = QLabel("Memory: -")
+        for label in (self.rows_rate_label, self.bytes_rate_label, self.eta_label, self.elapsed_label,
+                      self.memory_label):
+            rates_layout.addWidget(label)
+        progress_layout.addLayout(rates_layout)
+        
+        # One bar per worker, showing the table it is exporting
+        self.worker_layout = QGridLayout()
+        self.worker_bars = []
+        progress_layout.addLayout(self.worker_layout)
+        
 
         self.cancel_btn = QPushButton("Cancel Export")
         self.cancel_btn.clicked.connect(self.cancel_export)
@@ -377,10 +831,16 @@ class MySQLtoJSONGUI(QMainWindow):
         log_group = QGroupBox("Export Log")
         log_layout = QVBoxLayout(log_group)
         
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
         self.log_text.setMaximumHeight(200)
+        self.log_text.setMaximumBlockCount(LOG_VIEW_LINES)
         log_layout.addWidget(self.log_text)
+        self.pending_log = []
+        self.log_file = None
+        
+        self.log_file_checkbox = QCheckBox("Save the full log to <database>_export.log in the output directory")
+        log_layout.addWidget(self.log_file_checkbox)
         
 
         self.clear_log_btn = QPushButton("Clear Log")
@@ -388,15 +848,22 @@ class MySQLtoJSONGUI(QMainWindow):
         log_layout.addWidget(self.clear_log_btn)
         
         layout.addWidget(log_group)
+        
+        self.dashboard_timer = QTimer(self)
+        self.dashboard_timer.setInterval(DASHBOARD_INTERVAL_MS)
+        self.dashboard_timer.timeout.connect(self.refresh_dashboard)
+    
+    def get_connection_params(self):
+        return {
+            'host': self.host_input.text() or 'localhost',
+            'user': self.user_input.text() or 'root',
+            'password': self.password_input.text(),
+            'database': self.database_input.text()
+        }
     
     def test_connection(self):
         try:
-            connection_params = {
-                'host': self.host_input.text() or 'localhost',
-                'user': self.user_input.text() or 'root',
-                'password': self.password_input.text(),
-                'database': self.database_input.text()
-            }
+            connection_params = self.get_connection_params()
             
             if not connection_params['database']:
                 QMessageBox.warning(self, "Warning", "Please enter a database name")
@@ -421,47 +888,84 @@ class MySQLtoJSONGUI(QMainWindow):
             QMessageBox.critical(self, "Connection Error", f"Failed to connect to database:\n{err}")
     
     def load_tables(self):
-        if not self.connection:
+        if not self.connection or (self.table_loader is not None and self.table_loader.isRunning()):
             return
         
+        self.refresh_tables_btn.setEnabled(False)
+        self.statusBar().showMessage("Loading tables...")
+        self.table_loader = TableLoaderThread(self.get_connection_params())
+        self.table_loader.tables_signal.connect(self.tables_loaded)
+        self.table_loader.metadata_signal.connect(self.table_metadata_loaded)
+        self.table_loader.error_signal.connect(self.table_loading_failed)
+        self.table_loader.start()
+    
+    def tables_loaded(self, tables):
+        self.table_model.set_tables(tables)
+        self.statusBar().showMessage(f"Found {len(tables):,} tables, reading row counts and sizes...")
+        if tables:
+            self.tab_widget.setTabEnabled(2, True)
+    
+    def table_metadata_loaded(self, metadata):
+        self.table_model.set_metadata(metadata)
+        # The size filter can only match once sizes are known
+        self.apply_table_filter()
+        self.refresh_tables_btn.setEnabled(True)
+        self.statusBar().showMessage(f"Loaded {len(metadata):,} tables")
+    
+    def table_loading_failed(self, message):
+        self.refresh_tables_btn.setEnabled(True)
+        self.statusBar().showMessage("Failed to load tables")
+        QMessageBox.critical(self, "Error", f"Failed to load tables:\n{message}")
+    
+    def apply_table_filter(self):
+        # An invalid pattern or size is shown in red and ignored until fixed
+        mode = TABLE_FILTER_MODES[self.table_filter_mode.currentIndex()]
+        name_matcher = None
+        name_error = ""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("SHOW TABLES")
-            tables = [table[0] for table in cursor.fetchall()]
-            cursor.close()
-            
-            self.all_tables = tables
-            self.tables_list.clear()
-            
-            for table in tables:
-                self.tables_list.addItem(table)
-            
-            self.update_selected_count()
-            
-
-            if tables:
-                self.tab_widget.setTabEnabled(2, True)
-            
-        except mysql.connector.Error as err:
-            QMessageBox.critical(self, "Error", f"Failed to load tables:\n{err}")
+            name_matcher = table_name_matcher(self.table_filter_input.text(), mode)
+        except ValueError as err:
+            name_error = str(err)
+        max_size = None
+        size_error = ""
+        if self.table_size_input.text().strip():
+            try:
+                max_size = parse_file_size(self.table_size_input.text())
+            except ValueError as err:
+                size_error = str(err)
+        
+        self.table_filter_input.setStyleSheet("color: red;" if name_error else "")
+        self.table_filter_input.setToolTip(name_error)
+        self.table_size_input.setStyleSheet("color: red;" if size_error else "")
+        self.table_size_input.setToolTip(size_error or "Only show tables smaller than this size")
+        self.table_proxy.set_filter(name_matcher, max_size)
+        self.update_selected_count()
     
     def select_all_tables(self):
-        self.tables_list.selectAll()
-        self.update_selected_count()
+        self.table_model.set_checked(self.table_proxy.visible_tables(), True)
+    
+    def deselect_shown_tables(self):
+        self.table_model.set_checked(self.table_proxy.visible_tables(), False)
     
     def select_no_tables(self):
-        self.tables_list.clearSelection()
-        self.update_selected_count()
+        self.table_model.set_checked(self.table_model.tables, False)
     
     def update_selected_count(self):
-        selected_items = self.tables_list.selectedItems()
-        count = len(selected_items)
-        total = self.tables_list.count()
+        selected_tables = self.table_model.checked_tables()
+        count = len(selected_tables)
+        total = len(self.table_model.tables)
+        shown = self.table_proxy.rowCount()
         
-        self.selected_count_label.setText(f"Selected: {count} of {total} tables")
+        selected_details = [self.table_model.metadata[table_name] for table_name in selected_tables
+                            if table_name in self.table_model.metadata]
+        selected_rows = sum(details["row_count"] for details in selected_details)
+        selected_size = sum(details["data_length"] for details in selected_details)
+        self.selected_count_label.setText(f"Selected: {count:,} of {total:,} tables, {shown:,} shown "
+                                          f"(~{selected_rows:,} rows, {format_file_size(selected_size)})")
         
 
         self.start_export_btn.setEnabled(count > 0)
+        self.start_copy_btn.setEnabled(count > 0)
     
     def browse_output_directory(self):
         directory = QFileDialog.getExistingDirectory(
@@ -474,15 +978,18 @@ class MySQLtoJSONGUI(QMainWindow):
     
     def start_export(self):
 
-        selected_items = self.tables_list.selectedItems()
-        if not selected_items:
+        selected_tables = self.table_model.checked_tables()
+        if not selected_tables:
             QMessageBox.warning(self, "Warning", "Please select at least one table to export")
             return
         
-        selected_tables = [item.text() for item in selected_items]
-        
 
-        export_format = "single" if self.single_file_radio.isChecked() else "separate"
+        if self.single_file_radio.isChecked():
+            export_format = "single"
+        elif self.json_lines_radio.isChecked():
+            export_format = "jsonl"
+        else:
+            export_format = "separate"
         
 
         output_dir = self.output_dir_input.text()
@@ -491,50 +998,196 @@ class MySQLtoJSONGUI(QMainWindow):
             return
         
 
-        connection_params = {
-            'host': self.host_input.text() or 'localhost',
-            'user': self.user_input.text() or 'root',
-            'password': self.password_input.text(),
-            'database': self.database_input.text()
-        }
+        watermark_specs = [self.watermark_input.text()] if self.watermark_input.text().strip() else None
+        try:
+            parse_watermark_specs(watermark_specs)
+        except ValueError as err:
+            QMessageBox.warning(self, "Warning", str(err))
+            return
         
-
-        self.tab_widget.setCurrentIndex(3)
+        compression = None
+        if self.compression_input.currentText() != "None":
+            level = self.compression_level_input.value()
+            try:
+                compression = OutputCompression(self.compression_input.currentText(),
+                                                None if level < 0 else level,
+                                                self.compression_threads_input.value())
+            except ValueError as err:
+                QMessageBox.warning(self, "Warning", str(err))
+                return
         
 
-        self.overall_progress.setValue(0)
-        self.overall_progress_label.setText("Starting export...")
-        self.table_progress_label.setText("Preparing...")
-        self.log_text.clear()
-        
+        connection_params = self.get_connection_params()
 
-        self.start_export_btn.setEnabled(False)
-        self.cancel_btn.setEnabled(True)
+        timing_report = None
+        if self.timing_report_checkbox.isChecked():
+            timing_report = os.path.join(output_dir, f"{connection_params['database']}_timing_report.json")
+        pipeline_memory = None
+        if self.pipeline_checkbox.isChecked():
+            pipeline_memory = self.pipeline_memory_input.value() * 1024 * 1024
+        binary = None
+        if self.binary_input.currentText() != "text":
+            binary = BinaryValues(self.binary_input.currentText(), self.blob_threshold_input.value() * 1024)
+
+
+        self.reset_progress_tab("Starting export...", output_dir, connection_params['database'])
         
 
-        self.export_thread = DatabaseExportThread(connection_params, selected_tables, export_format, output_dir)
-        self.export_thread.progress_signal.connect(self.update_progress)
+        self.export_thread = DatabaseExportThread(connection_params, selected_tables, export_format, output_dir,
+                                                  batch_size=self.batch_size_input.value(),
+                                                  workers=self.workers_input.value(),
+                                                  split_ranges=self.split_ranges_input.value(),
+                                                  split_min_rows=self.split_min_rows_input.value(),
+                                                  use_checkpoint=self.checkpoint_checkbox.isChecked(),
+                                                  resume=self.resume_checkbox.isChecked(),
+                                                  watermark_specs=watermark_specs,
+                                                  compression=compression,
+                                                  encoder=JSONEncoder(style="compact" if self.compact_json_checkbox.isChecked() else "pretty"),
+                                                  exact_counts=self.exact_counts_checkbox.isChecked(),
+                                                  profiler=ExportProfiler(trace_memory=self.trace_memory_checkbox.isChecked()),
+                                                  timing_report=timing_report,
+                                                  prometheus_textfile=self.prometheus_input.text().strip() or None,
+                                                  pipeline_memory=pipeline_memory,
+                                                  consistent_snapshot=self.snapshot_checkbox.isChecked(),
+                                                  snapshot_lock=self.snapshot_lock_input.currentText(),
+                                                  binary=binary)
+        self.export_thread.table_progress_signal.connect(self.update_table_progress)
+        self.export_thread.finished_signal.connect(self.export_finished)
+        self.export_thread.log_signal.connect(self.add_log_message)
+        self.export_thread.start()
+        self.dashboard_timer.start()
+    
+    def start_copy(self):
+        selected_tables = self.table_model.checked_tables()
+        if not selected_tables:
+            QMessageBox.warning(self, "Warning", "Please select at least one table to copy")
+            return
+        target_name = self.copy_database_input.text().strip()
+        if not target_name:
+            QMessageBox.warning(self, "Warning", "Please enter the target database name or SQLite file")
+            return
+        
+        connection_params = self.get_connection_params()
+        if self.copy_target_input.currentText() == "SQLite file":
+            target = SQLiteCopyTarget(os.path.expanduser(target_name),
+                                      truncate=self.copy_truncate_checkbox.isChecked())
+        else:
+            target_params = {
+                'host': self.copy_host_input.text() or connection_params['host'],
+                'user': self.copy_user_input.text() or connection_params['user'],
+                'password': self.copy_password_input.text() or connection_params['password'],
+                'database': target_name
+            }
+            if target_params == connection_params:
+                QMessageBox.warning(self, "Warning", "The target is the source database")
+                return
+            target = MySQLCopyTarget(target_params, truncate=self.copy_truncate_checkbox.isChecked(),
+                                     disable_checks=self.copy_disable_checks_checkbox.isChecked(),
+                                     create_tables=self.copy_create_tables_checkbox.isChecked())
+        
+        output_dir = self.output_dir_input.text()
+        self.reset_progress_tab("Starting copy...", output_dir if os.path.isdir(output_dir) else None,
+                                connection_params['database'])
+        
+        self.export_thread = DatabaseCopyThread(connection_params, selected_tables, target,
+                                                batch_size=self.batch_size_input.value(),
+                                                workers=self.workers_input.value(),
+                                                exact_counts=self.exact_counts_checkbox.isChecked())
         self.export_thread.table_progress_signal.connect(self.update_table_progress)
         self.export_thread.finished_signal.connect(self.export_finished)
         self.export_thread.log_signal.connect(self.add_log_message)
         self.export_thread.start()
+        self.dashboard_timer.start()
+    
+    def reset_progress_tab(self, status, log_dir, database_name):
+        self.tab_widget.setCurrentIndex(3)
+        
+        self.overall_progress.setValue(0)
+        self.overall_progress_label.setText(status)
+        self.table_progress_label.setText("Preparing...")
+        self.log_text.clear()
+        self.pending_log = []
+        self.create_worker_bars(self.workers_input.value())
+        if self.log_file_checkbox.isChecked() and log_dir:
+            log_path = os.path.join(log_dir, f"{database_name}_export.log")
+            try:
+                self.log_file = open(log_path, 'a', encoding='utf-8', buffering=1)
+            except OSError as err:
+                QMessageBox.warning(self, "Warning", f"Cannot write the log file:\n{err}")
+        
+        self.start_export_btn.setEnabled(False)
+        self.start_copy_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
     
     def cancel_export(self):
         if self.export_thread and self.export_thread.isRunning():
             self.export_thread.cancel_export()
             self.add_log_message("Cancelling export...")
     
-    def update_progress(self, percentage, message):
-        self.overall_progress.setValue(percentage)
-        self.overall_progress_label.setText(message)
+    def create_worker_bars(self, workers):
+        for label, bar in self.worker_bars:
+            label.deleteLater()
+            bar.deleteLater()
+        self.worker_bars = []
+        for i in range(workers):
+            label = QLabel("")
+            bar = QProgressBar()
+            # Row counts can pass the int range of QProgressBar, so bars show per mille
+            bar.setRange(0, 1000)
+            label.hide()
+            bar.hide()
+            self.worker_layout.addWidget(label, i, 0)
+            self.worker_layout.addWidget(bar, i, 1)
+            self.worker_bars.append((label, bar))
+    
+    def refresh_dashboard(self):
+        self.flush_log()
+        progress = self.export_thread.current_progress() if self.export_thread else None
+        if progress is None:
+            return
+        
+        self.overall_progress.setValue(int(progress.percent()))
+        self.overall_progress_label.setText(progress.status_text())
+        rows_per_second, bytes_per_second = progress.rates()
+        eta = progress.eta()
+        memory = process_memory()
+        self.rows_rate_label.setText(f"Rows/s: {rows_per_second:,.0f}")
+        self.bytes_rate_label.setText(f"Written: {format_rate(bytes_per_second)}")
+        self.eta_label.setText(f"ETA: {format_duration(eta) if eta is not None else '--:--:--'}")
+        self.elapsed_label.setText(f"Elapsed: {format_duration(progress.elapsed())}")
+        self.memory_label.setText(f"Memory: {format_file_size(memory) if memory is not None else 'n/a'}")
+        
+        active = progress.active_progress()
+        for i, (label, bar) in enumerate(self.worker_bars):
+            if i < len(active):
+                table_name, rows, expected_rows = active[i]
+                label.setText(table_name)
+                bar.setValue(int(rows * 1000 / max(expected_rows, rows, 1)))
+                bar.setFormat(f"{rows:,} / ~{expected_rows:,} rows")
+                label.show()
+                bar.show()
+            else:
+                label.hide()
+                bar.hide()
     
     def update_table_progress(self, table_name, current, total):
         self.table_progress_label.setText(f"Processing: {table_name} ({current}/{total})")
     
     def add_log_message(self, message):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.append(f"[{timestamp}] {message}")
-
+        line = f"[{datetime.now().strftime('%H:%M:%S')}] {message}"
+        if self.log_file is not None:
+            self.log_file.write(line + "\n")
+        self.pending_log.append(line)
+        # During an export the dashboard timer adds lines to the view in bulk
+        if not self.dashboard_timer.isActive():
+            self.flush_log()
+    
+    def flush_log(self):
+        if not self.pending_log:
+            return
+        # Lines the view would drop anyway are never added to it
+        self.log_text.appendPlainText("\n".join(self.pending_log[-LOG_VIEW_LINES:]))
+        self.pending_log = []
         scrollbar = self.log_text.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
     
@@ -542,12 +1195,18 @@ class MySQLtoJSONGUI(QMainWindow):
         self.log_text.clear()
     
     def export_finished(self, success, message):
+        self.dashboard_timer.stop()
+        self.refresh_dashboard()
+        for label, bar in self.worker_bars:
+            label.hide()
+            bar.hide()
         self.overall_progress.setValue(100 if success else 0)
         self.overall_progress_label.setText("Export completed" if success else "Export failed")
         self.table_progress_label.setText("Finished" if success else "Cancelled/Failed")
         
 
         self.start_export_btn.setEnabled(True)
+        self.start_copy_btn.setEnabled(True)
         self.cancel_btn.setEnabled(False)
         
 
@@ -559,6 +1218,9 @@ class MySQLtoJSONGUI(QMainWindow):
             self.statusBar().showMessage("Export failed or cancelled")
         
         self.add_log_message("Export finished")
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
 
 def main():
     app = QApplication(sys.argv)
@@ -0,0 +1,21 @@
+# Choices shared by the command-line front ends and the modules behind
+# them. This module imports nothing, so building an argument parser does not
+# load the importer, the copier or the compression codecs.
+
+# insert: one multi-row INSERT (or REPLACE) per batch; load_data: LOAD DATA LOCAL
+# INFILE from a temporary tab-separated file per batch, usually the fastest,
+# but the server needs local_infile=ON
+LOAD_METHODS = ("insert", "load_data")
+
+# What happens to a row whose key already exists in the target table
+DUPLICATE_STATEMENTS = {
+    "error": "INSERT",
+    "ignore": "INSERT IGNORE",
+    "replace": "REPLACE"
+}
+
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+    "lz4": ".lz4"
+}
@@ -0,0 +1,117 @@
+import gzip
+import importlib
+import io
+
+from option_choices import COMPRESSION_SUFFIXES
+
+DEFAULT_COMPRESSION_LEVELS = {
+    "gzip": 6,
+    "zstd": 3,
+    "lz4": 0
+}
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+# Optional packages, imported only when their method is chosen
+COMPRESSION_MODULES = {
+    "zstd": ("zstandard", "zstandard"),
+    "lz4": ("lz4.frame", "lz4")
+}
+
+
+class _CountingWriter(io.RawIOBase):
+    # Sits between the text layer and the compressor and counts the
+    # uncompressed bytes that pass through.
+    def __init__(self, stream, name):
+        self.stream = stream
+        self.name = name
+        self.bytes_written = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.stream.write(data)
+        self.bytes_written += len(data)
+        return len(data)
+
+    def flush(self):
+        # Flushing a compressor mid-stream ends the current block and costs
+        # compression ratio, so data is only flushed on close
+        pass
+
+    def close(self):
+        if not self.closed:
+            self.stream.close()
+        super().close()
+
+
+class OutputCompression:
+    def __init__(self, method, level=None, threads=0):
+        if method not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression '{method}', expected one of {', '.join(COMPRESSION_SUFFIXES)}")
+        self.module = None
+        if method in COMPRESSION_MODULES:
+            module_name, package = COMPRESSION_MODULES[method]
+            try:
+                self.module = importlib.import_module(module_name)
+            except ImportError:
+                raise ValueError(f"{method} compression needs the {package} package (pip install {package})")
+        self.method = method
+        self.level = DEFAULT_COMPRESSION_LEVELS[method] if level is None else int(level)
+        self.threads = max(0, int(threads or 0))
+        self.suffix = COMPRESSION_SUFFIXES[method]
+
+    def describe(self):
+        details = {"method": self.method, "level": self.level}
+        if self.threads and self.method == "zstd":
+            details["threads"] = self.threads
+        return details
+
+    def open(self, path):
+        if self.method == "gzip":
+            stream = gzip.open(path, 'wb', compresslevel=self.level)
+        elif self.method == "zstd":
+            # zstandard compresses on its own worker threads when threads > 0
+            compressor = self.module.ZstdCompressor(level=self.level, threads=self.threads)
+            stream = compressor.stream_writer(open(path, 'wb'))
+        else:
+            stream = self.module.open(path, 'wb', compression_level=self.level)
+        counter = _CountingWriter(stream, path)
+        return io.TextIOWrapper(io.BufferedWriter(counter, OUTPUT_BUFFER_SIZE), encoding='utf-8')
+
+
+def open_output(path, compression=None):
+    if compression is None:
+        return open(path, 'w', encoding='utf-8')
+    return compression.open(path + compression.suffix)
+
+
+def open_input(path):
+    # Reads a file written by open_output, picking the method from its suffix
+    for method, suffix in COMPRESSION_SUFFIXES.items():
+        if path.endswith(suffix):
+            break
+    else:
+        return open(path, 'r', encoding='utf-8')
+    if method == "gzip":
+        return gzip.open(path, 'rt', encoding='utf-8')
+    module = OutputCompression(method).module
+    if method == "zstd":
+        stream = module.ZstdDecompressor().stream_reader(open(path, 'rb'))
+        return io.TextIOWrapper(io.BufferedReader(stream, OUTPUT_BUFFER_SIZE), encoding='utf-8')
+    return module.open(path, 'rt', encoding='utf-8')
+
+
+def strip_compression_suffix(path):
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def uncompressed_size(output):
+    # Only known for files written through OutputCompression
+    counter = getattr(getattr(output, 'buffer', None), 'raw', None)
+    if isinstance(counter, _CountingWriter):
+        return counter.bytes_written
+    return None
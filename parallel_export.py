@@ -0,0 +1,542 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+from mysql.connector import pooling
+
+from export_progress import ExportProgress
+from export_profiling import ExportProfiler
+from export_stats import ExportStatistics, phase_clock
+from json_encoder import DEFAULT_ENCODER
+from output_compression import open_output, uncompressed_size
+from incremental import delta_where, has_new_rows, delta_stamp
+from binary_values import binary_columns
+from export_pipeline import stream_table, stream_table_keyset
+from export_streaming import (DEFAULT_BATCH_SIZE, ExportCancelled, JSONTableWriter, JSONLinesTableWriter,
+                              JSONRowsFragmentWriter, write_table_header)
+
+DEFAULT_WORKERS = 1
+MAX_WORKERS = pooling.CNX_POOL_MAXSIZE
+
+DEFAULT_SPLIT_RANGES = 1
+DEFAULT_SPLIT_MIN_ROWS = 1000000
+
+INTEGER_TYPES = ("tinyint", "smallint", "mediumint", "int", "bigint")
+
+
+def create_connection_pool(connection_params, workers):
+    pool_size = max(1, min(int(workers), MAX_WORKERS))
+    return pooling.MySQLConnectionPool(pool_name="json_export", pool_size=pool_size, **connection_params)
+
+
+def find_split_key(cursor, database_name, table_name):
+    # The primary key, or failing that a unique NOT NULL index, made of a
+    # single integer column; anything else cannot be split into key ranges.
+    cursor.execute(
+        "SELECT s.INDEX_NAME, s.COLUMN_NAME, c.DATA_TYPE, c.IS_NULLABLE "
+        "FROM information_schema.STATISTICS s "
+        "JOIN information_schema.COLUMNS c ON c.TABLE_SCHEMA = s.TABLE_SCHEMA "
+        "AND c.TABLE_NAME = s.TABLE_NAME AND c.COLUMN_NAME = s.COLUMN_NAME "
+        "WHERE s.TABLE_SCHEMA = %s AND s.TABLE_NAME = %s AND s.NON_UNIQUE = 0 "
+        "ORDER BY s.INDEX_NAME = 'PRIMARY' DESC, s.INDEX_NAME, s.SEQ_IN_INDEX",
+        (database_name, table_name)
+    )
+    indexes = {}
+    for index_name, column_name, data_type, is_nullable in cursor.fetchall():
+        indexes.setdefault(index_name, []).append((column_name, data_type.lower(), is_nullable))
+
+    for index_columns in indexes.values():
+        if len(index_columns) != 1:
+            continue
+        column_name, data_type, is_nullable = index_columns[0]
+        if data_type in INTEGER_TYPES and is_nullable == "NO":
+            return column_name
+    return None
+
+
+def plan_key_ranges(cursor, table_name, key_column, split_ranges):
+    cursor.execute(f"SELECT MIN(`{key_column}`), MAX(`{key_column}`) FROM `{table_name}`")
+    low, high = cursor.fetchone()
+    if low is None or high <= low:
+        return None
+
+    split_ranges = min(int(split_ranges), high - low + 1)
+    step = (high - low + 1) / split_ranges
+    boundaries = [low + int(step * i) for i in range(1, split_ranges)]
+
+    # The outer ranges are open-ended so rows inserted beyond MIN/MAX while
+    # the export runs are not lost.
+    ranges = []
+    lower = None
+    for boundary in boundaries + [None]:
+        if lower is None:
+            ranges.append((f"`{key_column}` < %s", (boundary,)))
+        elif boundary is None:
+            ranges.append((f"`{key_column}` >= %s", (lower,)))
+        else:
+            ranges.append((f"`{key_column}` >= %s AND `{key_column}` < %s", (lower, boundary)))
+        lower = boundary
+    return ranges
+
+
+class TableExporter:
+    def __init__(self, connection_params, export_format, output_dir, export_metadata,
+                 batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS,
+                 split_ranges=DEFAULT_SPLIT_RANGES, split_min_rows=DEFAULT_SPLIT_MIN_ROWS,
+                 checkpoint=None, incremental=None, compression=None, encoder=DEFAULT_ENCODER,
+                 on_table_start=None, on_batch=None, is_cancelled=None, profiler=None, pipeline_memory=None,
+                 cancellation=None, snapshot_pool=None, binary=None):
+        if checkpoint is not None and export_format == "single_file":
+            raise ValueError("Checkpointed exports need separate or JSON Lines files")
+        if incremental and export_format == "single_file":
+            raise ValueError("Incremental exports need separate or JSON Lines files")
+        self.connection_params = connection_params
+        self.export_format = export_format
+        self.output_dir = output_dir
+        self.export_metadata = export_metadata
+        self.database_name = export_metadata["database"]
+        self.batch_size = batch_size
+        self.workers = max(1, min(int(workers), MAX_WORKERS))
+        self.split_ranges = max(1, int(split_ranges))
+        self.split_min_rows = split_min_rows
+        self.checkpoint = checkpoint
+        self.incremental = incremental or {}
+        self.compression = compression
+        self.encoder = encoder
+        self.on_table_start = on_table_start
+        self.on_batch = on_batch
+        self.is_cancelled = is_cancelled
+        self.profiler = profiler if profiler is not None else ExportProfiler()
+        # Bytes allowed between the fetch and write threads of a pipelined
+        # table export; None streams each table on one thread
+        self.pipeline_memory = pipeline_memory
+        # An export_cancel.ExportCancellation, told about every connection
+        # running export queries so cancelling can interrupt them
+        self.cancellation = cancellation
+        # An export_snapshot.SnapshotPool whose connections share one
+        # consistent snapshot; used instead of a new pool for parallel exports
+        self.snapshot_pool = snapshot_pool
+        # A binary_values.BinaryValues for bytes values; None keeps the
+        # UTF-8 text decoding
+        self.binary = binary
+        self.progress = None
+        self.stats = None
+
+    def export_tables(self, connection, table_details, database_writer=None):
+        self.progress = ExportProgress({name: details["row_count"] for name, details in table_details.items()})
+        self.stats = ExportStatistics()
+
+        self._register(connection)
+        try:
+            if self.workers == 1:
+                yield from self._export_serial(connection, table_details, database_writer)
+            else:
+                yield from self._export_parallel(connection, table_details, database_writer)
+        finally:
+            self._unregister(connection)
+
+    def _export_serial(self, connection, table_details, database_writer):
+        for table_name, details in table_details.items():
+            # The profile must not cover the caller's code while suspended at yield
+            with self.profiler.profiled(table_name):
+                result = self._export_table(connection, table_name, details, database_writer=database_writer)
+            yield result
+
+    def _export_parallel(self, connection, table_details, database_writer):
+        # Workers write to fragment files which are appended to the final
+        # output in selection (and key range) order, so the output matches a
+        # serial run.
+        fragment_files = []
+        pool = self.snapshot_pool or create_connection_pool(self.connection_params, self.workers)
+        executor = ThreadPoolExecutor(max_workers=pool.pool_size)
+        cursor = connection.cursor()
+        plans = []
+        try:
+            for table_name, details in table_details.items():
+                ranges = self._plan_ranges(cursor, table_name, details)
+                if ranges is None:
+                    fragment_file = None
+                    if database_writer is not None:
+                        fragment_file = self._fragment_path(table_name)
+                        fragment_files.append(fragment_file)
+                    future = executor.submit(self._export_pooled_table, pool, table_name, details, fragment_file)
+                    plans.append((table_name, details, future, None))
+                else:
+                    chunks = []
+                    for chunk_index, (where, params) in enumerate(ranges):
+                        chunk_file = self._fragment_path(table_name, chunk_index)
+                        fragment_files.append(chunk_file)
+                        future = executor.submit(self._export_pooled_chunk, pool, table_name, details, chunk_index,
+                                                 where, params, chunk_file, database_writer is not None)
+                        chunks.append((chunk_file, future))
+                    plans.append((table_name, details, None, chunks))
+
+            for table_name, details, future, chunks in plans:
+                if chunks is None:
+                    result = future.result()
+                    if database_writer is not None:
+                        started = phase_clock()
+                        database_writer.append_table_fragment(table_name, result["fragment_file"])
+                        os.remove(result["fragment_file"])
+                        self.stats.table(table_name).add_phase("merge", started)
+                        result["stats"] = self._table_stats(table_name, result)
+                else:
+                    result = self._merge_chunks(table_name, details, chunks, database_writer)
+                yield result
+        except BaseException:
+            # Interrupts the other workers' queries instead of waiting for
+            # them below when a table fails or the export is cancelled
+            if self.cancellation is not None:
+                self.cancellation.interrupt()
+            raise
+        finally:
+            for _, _, future, chunks in plans:
+                for pending in [future] if chunks is None else [chunk[1] for chunk in chunks]:
+                    pending.cancel()
+            executor.shutdown(wait=True)
+            cursor.close()
+            for fragment_file in fragment_files:
+                if os.path.exists(fragment_file):
+                    os.remove(fragment_file)
+
+    def _fragment_path(self, table_name, chunk_index=None):
+        suffix = "" if chunk_index is None else f".{chunk_index:04d}"
+        return os.path.join(self.output_dir, f'.{self.database_name}_{table_name}{suffix}.part')
+
+    def _plan_ranges(self, cursor, table_name, details):
+        if self.checkpoint is not None or table_name in self.incremental:
+            # Checkpointed tables are read in keyset pages and delta exports
+            # are already narrowed by their watermark range
+            return None
+        if self.split_ranges <= 1 or details["row_count"] < self.split_min_rows:
+            return None
+        key_column = find_split_key(cursor, self.database_name, table_name)
+        if key_column is None:
+            return None
+        return plan_key_ranges(cursor, table_name, key_column, self.split_ranges)
+
+    def _export_pooled_table(self, pool, table_name, details, fragment_file):
+        connection = self._acquire(pool)
+        try:
+            with self.profiler.profiled(table_name):
+                return self._export_table(connection, table_name, details, fragment_file=fragment_file)
+        finally:
+            self._release(connection)
+
+    def _export_pooled_chunk(self, pool, table_name, details, chunk_index, where, params, chunk_file, combined):
+        connection = self._acquire(pool)
+        try:
+            self._table_started(table_name)
+            with self.profiler.profiled(f"{table_name}.{chunk_index:04d}"):
+                with open(chunk_file, 'w', encoding='utf-8') as output:
+                    if combined:
+                        chunk_writer = JSONRowsFragmentWriter(output, level=2, encoder=self.encoder)
+                    elif self.export_format == "json_lines":
+                        chunk_writer = JSONLinesTableWriter(output, self.encoder)
+                    else:
+                        chunk_writer = JSONRowsFragmentWriter(output, level=0, encoder=self.encoder)
+                    return stream_table(connection, table_name, details["columns"], chunk_writer, self.batch_size,
+                                        on_batch=self._batch_callback(table_name, chunk_writer),
+                                        is_cancelled=self.is_cancelled, where=where, params=params,
+                                        stats=self.stats.table(table_name), pipeline_memory=self.pipeline_memory,
+                                        binary=self.binary)
+        finally:
+            self._release(connection)
+
+    def _register(self, connection):
+        if self.cancellation is not None:
+            self.cancellation.register(connection)
+
+    def _unregister(self, connection):
+        if self.cancellation is not None:
+            self.cancellation.unregister(connection)
+
+    def _acquire(self, pool):
+        connection = pool.get_connection()
+        try:
+            self._register(connection)
+        except ExportCancelled:
+            self._release(connection)
+            raise
+        return connection
+
+    def _release(self, connection):
+        self._unregister(connection)
+        try:
+            connection.close()
+        except mysql.connector.Error:
+            # A cancelled or failed stream leaves unread rows behind and the
+            # session reset fails; the pool is discarded after the run anyway.
+            pass
+
+    def _batch_callback(self, table_name, table_writer):
+        last_written = table_writer.bytes_written
+
+        def on_batch(batch_rows, fetched_rows):
+            nonlocal last_written
+            bytes_written = table_writer.bytes_written - last_written
+            last_written = table_writer.bytes_written
+            self.progress.add_rows(table_name, batch_rows, bytes_written)
+            self.stats.table(table_name).add_rows(batch_rows, bytes_written)
+            if self.on_batch:
+                self.on_batch(table_name, fetched_rows)
+        return on_batch
+
+    def _open_table_output(self, table_name, details, database_writer=None, fragment_file=None, resume_state=None):
+        columns = details["columns"]
+        result = {"table_name": table_name, "columns": columns}
+        header = {"columns": columns}
+        if self.binary is not None:
+            encoded_columns = binary_columns(columns, details.get("column_types", {}))
+            if encoded_columns:
+                header["binary"] = self.binary.table_header(encoded_columns)
+        output = None
+        if database_writer is not None:
+            table_writer = database_writer.begin_table(table_name, header)
+        elif fragment_file is not None:
+            output = open(fragment_file, 'w', encoding='utf-8')
+            table_writer = JSONTableWriter(output, header, level=2, encoder=self.encoder)
+            result["fragment_file"] = fragment_file
+        else:
+            table_json = {
+                "table_name": table_name,
+                "database": self.database_name,
+                "exported_at": self.export_metadata["exported_at"],
+                **header
+            }
+            if table_name in self.incremental:
+                table_json["incremental"] = self.incremental[table_name]
+            if resume_state is not None:
+                # Drop anything written after the last checkpoint and carry on from there
+                table_file = resume_state["table_file"]
+                output = open(table_file, 'r+', encoding='utf-8')
+                output.seek(resume_state["file_offset"])
+                output.truncate()
+                if self.export_format == "json_lines":
+                    table_writer = JSONLinesTableWriter.reopen(output, resume_state["row_count"], self.encoder)
+                else:
+                    table_writer = JSONTableWriter.reopen(output, resume_state["row_count"], encoder=self.encoder)
+            elif self.export_format == "json_lines":
+                output = open_output(self._table_file_stem(table_name) + '.jsonl', self.compression)
+                table_file = output.name
+                table_writer = JSONLinesTableWriter(output, self.encoder)
+            else:
+                output = open_output(self._table_file_stem(table_name) + '.json', self.compression)
+                table_file = output.name
+                table_writer = JSONTableWriter(output, table_json, encoder=self.encoder)
+            result["table_file"] = table_file
+            result["table_json"] = table_json
+        return table_writer, output, result
+
+    def _table_file_stem(self, table_name):
+        stem = os.path.join(self.output_dir, f'{self.database_name}_{table_name}')
+        incremental = self.incremental.get(table_name)
+        if incremental and incremental["since"] is not None:
+            stem += '.' + delta_stamp(self.export_metadata["exported_at"])
+        return stem
+
+    def _watermark(self, table_name):
+        incremental = self.incremental[table_name]
+        value = incremental["until"] if has_new_rows(incremental) else incremental["since"]
+        return {"column": incremental["column"], "value": value}
+
+    def _unchanged_table(self, table_name, details):
+        # Nothing newer than the stored watermark, so no delta file is written
+        result = {"table_name": table_name, "columns": details["columns"], "row_count": 0,
+                  "delta": "unchanged", "watermark": self._watermark(table_name)}
+        self._table_finished(table_name, result)
+        return result
+
+    def _finish_table_output(self, table_name, result, row_count, output=None):
+        if output is not None and uncompressed_size(output) is not None:
+            result["uncompressed_size"] = uncompressed_size(output)
+        if table_name in self.incremental:
+            result["watermark"] = self._watermark(table_name)
+            if self.incremental[table_name]["since"] is not None:
+                result["delta"] = "exported"
+
+        if self.export_format == "json_lines" and "table_file" in result:
+            header_file = self._table_file_stem(table_name) + '.meta.json'
+            table_json = result["table_json"]
+            table_json["row_count"] = row_count
+            table_json["data_file"] = os.path.basename(result["table_file"])
+            write_table_header(header_file, table_json, self.encoder)
+            result["header_file"] = header_file
+
+        result.pop("table_json", None)
+        result["row_count"] = row_count
+        self._table_finished(table_name, result)
+        return result
+
+    def _table_started(self, table_name):
+        self.progress.table_started(table_name)
+        self.stats.table(table_name).start()
+        if self.workers == 1:
+            # tracemalloc has a single peak for the process, so per-table
+            # peaks only mean something when tables run one at a time
+            self.profiler.reset_memory_peak()
+
+    def _table_finished(self, table_name, result):
+        self.progress.table_finished(table_name)
+        self.stats.table(table_name).finish()
+        if self.workers == 1:
+            self.stats.table(table_name).memory_peak = self.profiler.table_memory_peak()
+        result["stats"] = self._table_stats(table_name, result)
+
+    def _table_stats(self, table_name, result):
+        table_stats = self.stats.table(table_name).to_dict()
+        table_stats["row_count"] = result["row_count"]
+        if "table_file" in result and os.path.exists(result["table_file"]):
+            table_stats["file_size"] = os.path.getsize(result["table_file"])
+        if "uncompressed_size" in result:
+            table_stats["uncompressed_size"] = result["uncompressed_size"]
+        return table_stats
+
+    def _export_table(self, connection, table_name, details, database_writer=None, fragment_file=None):
+        if self.checkpoint is not None:
+            return self._export_checkpointed_table(connection, table_name, details)
+
+        self._table_started(table_name)
+        if table_name in self.incremental and not has_new_rows(self.incremental[table_name]):
+            return self._unchanged_table(table_name, details)
+        if self.on_table_start:
+            self.on_table_start(table_name)
+
+        where, params = delta_where(self.incremental[table_name]) if table_name in self.incremental else (None, None)
+        table_writer, output, result = self._open_table_output(table_name, details,
+                                                               database_writer, fragment_file)
+        try:
+            row_count = stream_table(connection, table_name, details["columns"], table_writer, self.batch_size,
+                                     on_batch=self._batch_callback(table_name, table_writer),
+                                     is_cancelled=self.is_cancelled, where=where, params=params,
+                                     stats=self.stats.table(table_name), pipeline_memory=self.pipeline_memory,
+                                     binary=self.binary)
+            table_writer.close()
+        except BaseException:
+            # A partial file is never left behind looking like a complete one;
+            # only checkpointed tables keep theirs, to resume from
+            if output is not None:
+                output.close()
+                if os.path.exists(output.name):
+                    os.remove(output.name)
+            raise
+        finally:
+            if output is not None and not output.closed:
+                output.close()
+
+        return self._finish_table_output(table_name, result, row_count, output)
+
+    def _export_checkpointed_table(self, connection, table_name, details):
+        state = self.checkpoint.table_state(table_name) or {}
+        self._table_started(table_name)
+
+        if state.get("status") == "completed":
+            self.progress.add_completed_rows(table_name, state["row_count"])
+            result = {"table_name": table_name, "columns": details["columns"],
+                      "table_file": state["table_file"], "checkpoint": "skipped"}
+            if state.get("header_file"):
+                result["header_file"] = state["header_file"]
+            if state.get("watermark"):
+                result["watermark"] = state["watermark"]
+            if state.get("uncompressed_size") is not None:
+                result["uncompressed_size"] = state["uncompressed_size"]
+            result["row_count"] = state["row_count"]
+            self._table_finished(table_name, result)
+            return result
+
+        if table_name in self.incremental and not has_new_rows(self.incremental[table_name]):
+            return self._unchanged_table(table_name, details)
+        if self.on_table_start:
+            self.on_table_start(table_name)
+
+        if table_name in self.incremental:
+            # Delta ranges are short-lived and simply re-read if interrupted
+            key_column = None
+            where, params = delta_where(self.incremental[table_name])
+        else:
+            cursor = connection.cursor()
+            key_column = find_split_key(cursor, self.database_name, table_name)
+            cursor.close()
+            where, params = None, None
+
+        # A compressed stream cannot be cut back to the last checkpointed
+        # offset, so compressed tables restart instead of resuming
+        resume_state = None
+        if (state.get("status") == "in_progress" and key_column is not None and self.compression is None
+                and state.get("key_column") == key_column and os.path.exists(state.get("table_file", ""))):
+            resume_state = state
+            self.progress.add_completed_rows(table_name, state["row_count"])
+
+        table_writer, output, result = self._open_table_output(table_name, details,
+                                                               resume_state=resume_state)
+        if resume_state is not None:
+            result["checkpoint"] = "resumed"
+            last_key = resume_state["last_key"]
+        else:
+            last_key = None
+        self.checkpoint.update_table(table_name, status="in_progress", table_file=result["table_file"],
+                                     key_column=key_column, last_key=last_key,
+                                     row_count=table_writer.row_count, file_offset=self._checkpoint_offset(output))
+
+        def on_page(page_last_key):
+            self.checkpoint.update_table(table_name, last_key=page_last_key,
+                                         row_count=table_writer.row_count, file_offset=self._checkpoint_offset(output))
+
+        try:
+            if key_column is None:
+                # Without a usable key the table is read in one pass and only
+                # recorded once it is complete.
+                stream_table(connection, table_name, details["columns"], table_writer, self.batch_size,
+                             on_batch=self._batch_callback(table_name, table_writer),
+                             is_cancelled=self.is_cancelled, where=where, params=params,
+                             stats=self.stats.table(table_name), pipeline_memory=self.pipeline_memory,
+                             binary=self.binary)
+            else:
+                stream_table_keyset(connection, table_name, details["columns"], key_column, table_writer,
+                                    self.batch_size, last_key=last_key,
+                                    on_batch=self._batch_callback(table_name, table_writer),
+                                    on_page=on_page, is_cancelled=self.is_cancelled,
+                                    stats=self.stats.table(table_name), pipeline_memory=self.pipeline_memory,
+                                    binary=self.binary)
+            row_count = table_writer.close()
+        finally:
+            output.close()
+
+        result = self._finish_table_output(table_name, result, row_count, output)
+        self.checkpoint.update_table(table_name, status="completed", row_count=row_count,
+                                     header_file=result.get("header_file"), watermark=result.get("watermark"),
+                                     uncompressed_size=result.get("uncompressed_size"), file_offset=None)
+        return result
+
+    def _checkpoint_offset(self, output):
+        if self.compression is not None:
+            return None
+        output.flush()
+        return output.tell()
+
+    def _merge_chunks(self, table_name, details, chunks, database_writer):
+        if self.on_table_start:
+            self.on_table_start(table_name)
+
+        table_writer, output, result = self._open_table_output(table_name, details, database_writer)
+        try:
+            for chunk_file, future in chunks:
+                chunk_rows = future.result()
+                started = phase_clock()
+                table_writer.append_rows_fragment(chunk_file, chunk_rows)
+                os.remove(chunk_file)
+                self.stats.table(table_name).add_phase("merge", started)
+            row_count = table_writer.close()
+        except BaseException:
+            # A failed or cancelled key range leaves no partial table file
+            if output is not None:
+                output.close()
+                if os.path.exists(output.name):
+                    os.remove(output.name)
+            raise
+        finally:
+            if output is not None and not output.closed:
+                output.close()
+
+        result["key_ranges"] = len(chunks)
+        return self._finish_table_output(table_name, result, row_count, output)
@@ -0,0 +1,189 @@
+import re
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+import mysql.connector
+from mysql.connector.constants import FieldFlag, FieldType
+
+TEMPLATE_ROWS = 1000
+
+# name: (MySQL column type, cursor type code, cursor flags, value for template row i)
+COLUMN_KINDS = {
+    "int": ("BIGINT NOT NULL", FieldType.LONGLONG, 0, lambda i: i * 7),
+    "varchar": ("VARCHAR(64)", FieldType.VAR_STRING, 0, lambda i: f"name-{i:06d}"),
+    "text": ("TEXT", FieldType.BLOB, 0, lambda i: "lorem ipsum dolor sit amet " * (1 + i % 8)),
+    "decimal": ("DECIMAL(12,2)", FieldType.NEWDECIMAL, 0, lambda i: Decimal(i * 13) / 100),
+    "double": ("DOUBLE", FieldType.DOUBLE, 0, lambda i: i / 7.0),
+    "datetime": ("DATETIME", FieldType.DATETIME, 0, lambda i: datetime(2024, 1, 1) + timedelta(seconds=i * 97)),
+    "timestamp": ("TIMESTAMP NULL", FieldType.TIMESTAMP, 0, lambda i: datetime(2023, 6, 1) + timedelta(minutes=i)),
+    "date": ("DATE", FieldType.DATE, 0, lambda i: date(2020, 1, 1) + timedelta(days=i % 2000)),
+    "blob": ("BLOB", FieldType.BLOB, FieldFlag.BINARY, lambda i: bytes((i + k) % 256 for k in range(4096))),
+    "nullable": ("VARCHAR(16) NULL", FieldType.VAR_STRING, 0, lambda i: None if i % 3 else f"v{i}"),
+}
+
+# Each scenario is a list of (table name prefix, table count, rows per table, column kinds)
+SCENARIOS = {
+    "narrow": [("narrow", 1, 200000, ["int", "varchar"])],
+    "wide": [("wide", 1, 20000, ["int", "varchar", "decimal", "double", "datetime", "date", "nullable"] * 8)],
+    "many_small": [("small", 500, 200, ["int", "varchar", "datetime"])],
+    "few_huge": [("huge", 2, 300000, ["int", "varchar", "double", "datetime"])],
+    "blob_heavy": [("blobs", 1, 5000, ["int", "blob", "text"])],
+    "datetime_heavy": [("events", 1, 100000, ["datetime", "timestamp", "date", "datetime", "timestamp", "date"])],
+}
+
+
+class SyntheticTable:
+    def __init__(self, name, row_count, kinds):
+        self.name = name
+        self.row_count = row_count
+        self.columns = [("id", "BIGINT NOT NULL PRIMARY KEY", FieldType.LONGLONG, 0)]
+        for index, kind in enumerate(kinds):
+            column_type, type_code, flags, _ = COLUMN_KINDS[kind]
+            self.columns.append((f"{kind}_{index}", column_type, type_code, flags))
+        self.templates = [tuple(COLUMN_KINDS[kind][3](i) for kind in kinds) for i in range(TEMPLATE_ROWS)]
+
+    def description(self):
+        return [(name, type_code, None, None, None, None, 1, flags) for name, _, type_code, flags in self.columns]
+
+    def rows(self, low, high):
+        # Ids run from 1 to row_count; values repeat every TEMPLATE_ROWS rows
+        templates = self.templates
+        for row_id in range(max(1, low), min(self.row_count, high) + 1):
+            yield (row_id,) + templates[row_id % TEMPLATE_ROWS]
+
+    def max_value(self, column_name):
+        # The last TEMPLATE_ROWS ids hold the highest id and every template value
+        index = [column[0] for column in self.columns].index(column_name)
+        values = [row[index] for row in self.rows(self.row_count - TEMPLATE_ROWS + 1, self.row_count)
+                  if row[index] is not None]
+        return max(values) if values else None
+
+    def create_statement(self):
+        columns = ", ".join(f"`{name}` {column_type}" for name, column_type, _, _ in self.columns)
+        return f"CREATE TABLE `{self.name}` ({columns})"
+
+
+def build_scenario(scenario, scale=1.0):
+    tables = {}
+    for prefix, table_count, row_count, kinds in SCENARIOS[scenario]:
+        for n in range(table_count):
+            name = prefix if table_count == 1 else f"{prefix}_{n:04d}"
+            tables[name] = SyntheticTable(name, max(1, int(row_count * scale)), kinds)
+    return tables
+
+
+class FakeCursor:
+    # Answers the handful of statements the exporters issue, generating rows
+    # on the fly so the benchmark measures the export path, not a server.
+    def __init__(self, tables):
+        self.tables = tables
+        self.description = None
+        self._rows = iter(())
+
+    def _table(self, query):
+        return self.tables[re.search(r"FROM `([^`]+)`", query).group(1)]
+
+    def execute(self, query, params=None):
+        params = list(params or ())
+        self.description = None
+        if query == "SHOW TABLES":
+            self._rows = iter([(name,) for name in self.tables])
+        elif "information_schema.STATISTICS" in query:
+            self._rows = iter([("PRIMARY", "id", "bigint", "NO")])
+        elif "information_schema.TABLES" in query:
+            self._rows = iter([(name, table.row_count, table.row_count * 64) for name, table in self.tables.items()])
+        elif "information_schema.COLUMNS" in query:
+            self._rows = iter([(name, column[0], column[1].split()[0].lower(), "PRI" if column[0] == "id" else "")
+                               for name, table in self.tables.items() for column in table.columns])
+        elif query.startswith("SELECT COUNT(*)"):
+            self._rows = iter([(self._table(query).row_count,)])
+        elif query.startswith("SELECT MAX("):
+            # Watermark upper bounds for incremental exports
+            table = self._table(query)
+            self._rows = iter([(table.max_value(re.match(r"SELECT MAX\(`([^`]+)`\)", query).group(1)),)])
+        elif query.startswith("SELECT MIN("):
+            table = self._table(query)
+            self._rows = iter([(1, table.row_count)])
+        elif query.startswith("SELECT * FROM"):
+            table = self._table(query)
+            low, high = 1, table.row_count
+            for operator in re.findall(r"`id` (>=|>|<=|<) %s", query):
+                value = params.pop(0)
+                if operator == ">=":
+                    low = max(low, value)
+                elif operator == ">":
+                    low = max(low, value + 1)
+                elif operator == "<=":
+                    high = min(high, value)
+                else:
+                    high = min(high, value - 1)
+            limit = re.search(r"LIMIT %s", query)
+            if limit:
+                high = min(high, low + params.pop(0) - 1)
+            self.description = table.description()
+            self._rows = table.rows(low, high)
+        else:
+            raise mysql.connector.ProgrammingError(f"Synthetic schema cannot run: {query}")
+
+    def fetchone(self):
+        return next(self._rows, None)
+
+    def fetchmany(self, size=1):
+        rows = []
+        for row in self._rows:
+            rows.append(row)
+            if len(rows) >= size:
+                break
+        return rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def close(self):
+        self._rows = iter(())
+
+
+class FakeConnection:
+    def __init__(self, tables):
+        self.tables = tables
+        self.connected = True
+
+    def cursor(self, buffered=None):
+        return FakeCursor(self.tables)
+
+    def is_connected(self):
+        return self.connected
+
+    def close(self):
+        self.connected = False
+
+
+class FakeConnectionPool:
+    def __init__(self, tables, pool_size):
+        self.tables = tables
+        self.pool_size = pool_size
+
+    def get_connection(self):
+        return FakeConnection(self.tables)
+
+
+def load_into_mysql(connection, tables, batch_size=1000):
+    # Creates the synthetic tables in a real MySQL/MariaDB database
+    cursor = connection.cursor()
+    for table in tables.values():
+        cursor.execute(f"DROP TABLE IF EXISTS `{table.name}`")
+        cursor.execute(table.create_statement())
+        placeholders = ", ".join(["%s"] * len(table.columns))
+        insert = f"INSERT INTO `{table.name}` VALUES ({placeholders})"
+        batch = []
+        for row in table.rows(1, table.row_count):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(insert, batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert, batch)
+        connection.commit()
+    cursor.execute("ANALYZE TABLE " + ", ".join(f"`{name}`" for name in tables))
+    cursor.fetchall()
+    cursor.close()
@@ -0,0 +1,384 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+from mysql.connector.constants import FieldType
+
+from export_cancel import ExportCancellation
+from export_pipeline import QuerySource, run_pipeline
+from export_progress import ExportProgress
+from export_stats import ExportStatistics
+from export_streaming import DEFAULT_BATCH_SIZE, ExportCancelled
+from json_import import DUPLICATE_STATEMENTS, TableLoader, prepare_session
+from parallel_export import DEFAULT_WORKERS, MAX_WORKERS, INTEGER_TYPES, create_connection_pool
+from table_metadata import load_table_metadata
+
+# A copy runs each table through the export pipeline's source, but instead of
+# converting rows to JSON it hands the cursor's tuples straight to the
+# target, adapting only the column types the target cannot store as they are.
+
+SQLITE_DUPLICATE_STATEMENTS = {
+    "error": "INSERT",
+    "ignore": "INSERT OR IGNORE",
+    "replace": "INSERT OR REPLACE"
+}
+
+
+def _as_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+
+def _set_as_text(value):
+    # SET columns may come back as a Python set of their members
+    if isinstance(value, (set, frozenset)):
+        return ",".join(sorted(value))
+    return value
+
+
+MYSQL_ADAPTERS = {
+    FieldType.SET: _set_as_text
+}
+# SQLite stores integers, floats, text and bytes; DECIMAL stays exact as text
+# and dates and times use the text format SQLite's date functions read
+SQLITE_ADAPTERS = {
+    FieldType.DECIMAL: _as_text,
+    FieldType.NEWDECIMAL: _as_text,
+    FieldType.DATE: _as_text,
+    FieldType.NEWDATE: _as_text,
+    FieldType.DATETIME: _as_text,
+    FieldType.TIMESTAMP: _as_text,
+    FieldType.TIME: _as_text,
+    FieldType.SET: _set_as_text
+}
+
+
+class CopyRowConverter:
+    # Stands in for RowConverter: rows stay tuples in column order and only
+    # the columns with an adapter for their type are touched
+    def __init__(self, columns, adapters):
+        self.columns = columns
+        self.adapters = adapters
+        self.converters = None
+
+    def bind(self, description):
+        self.converters = [(index, self.adapters[column[1]]) for index, column in enumerate(description or [])
+                           if column[1] in self.adapters]
+
+    def convert(self, rows):
+        if not rows or not self.converters:
+            return rows
+        value_columns = list(zip(*rows))
+        for index, convert in self.converters:
+            value_columns[index] = list(map(convert, value_columns[index]))
+        return list(zip(*value_columns))
+
+
+class _LoaderSink:
+    def __init__(self, loader):
+        self.loader = loader
+
+    def write_rows(self, rows):
+        self.loader.load(rows)
+
+    def close(self):
+        self.loader.close()
+
+
+class MySQLCopyTarget:
+    # Another MySQL or MariaDB database, on the same server or another one.
+    # With create_tables, missing tables are created from SHOW CREATE TABLE
+    # on the source; otherwise they must already exist.
+    def __init__(self, connection_params, on_duplicate="error", truncate=False, disable_checks=False,
+                 create_tables=False):
+        if on_duplicate not in DUPLICATE_STATEMENTS:
+            raise ValueError(f"Unknown duplicate handling '{on_duplicate}', "
+                             f"expected one of {', '.join(DUPLICATE_STATEMENTS)}")
+        self.connection_params = connection_params
+        self.on_duplicate = on_duplicate
+        self.truncate = truncate
+        self.disable_checks = disable_checks
+        self.create_tables = create_tables
+
+    def describe(self):
+        return f"{self.connection_params['database']} on {self.connection_params.get('host', 'localhost')}"
+
+    def connect(self):
+        connection = mysql.connector.connect(**self.connection_params)
+        prepare_session(connection, self.disable_checks)
+        return connection
+
+    def converter(self, columns):
+        return CopyRowConverter(columns, MYSQL_ADAPTERS)
+
+    def prepare_table(self, connection, source_connection, table_name, details):
+        cursor = connection.cursor()
+        try:
+            if self.create_tables:
+                source_cursor = source_connection.cursor()
+                source_cursor.execute(f"SHOW CREATE TABLE `{table_name}`")
+                create_statement = source_cursor.fetchone()[1]
+                source_cursor.close()
+                cursor.execute(create_statement.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+            if self.truncate:
+                cursor.execute(f"TRUNCATE TABLE `{table_name}`")
+        finally:
+            cursor.close()
+
+    def open_table(self, connection, table_name, columns):
+        return _LoaderSink(TableLoader(connection, table_name, columns, "insert", self.on_duplicate))
+
+
+def sqlite_column_type(column_type):
+    # The SQLite type affinity for a MySQL COLUMN_TYPE such as int(11) unsigned
+    base_type = column_type.split("(")[0].split()[0].lower()
+    if base_type in INTEGER_TYPES or base_type in ("integer", "bit", "year", "bool", "boolean"):
+        return "INTEGER"
+    if base_type in ("float", "double", "real"):
+        return "REAL"
+    if base_type in ("decimal", "numeric"):
+        return "NUMERIC"
+    if "blob" in base_type or "binary" in base_type:
+        return "BLOB"
+    return "TEXT"
+
+
+class _SQLiteSink:
+    def __init__(self, connection, table_name, columns, on_duplicate, write_lock):
+        self.connection = connection
+        self.write_lock = write_lock
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        placeholders = ", ".join(["?"] * len(columns))
+        self.statement = (f'{SQLITE_DUPLICATE_STATEMENTS[on_duplicate]} INTO "{table_name}" ({column_list}) '
+                          f'VALUES ({placeholders})')
+
+    def write_rows(self, rows):
+        with self.write_lock:
+            self.connection.executemany(self.statement, rows)
+            self.connection.commit()
+
+    def close(self):
+        pass
+
+
+class SQLiteCopyTarget:
+    # A SQLite database file, created if missing. Missing tables are created
+    # from the source's column types and primary key. SQLite allows one
+    # writer at a time, so parallel workers write their batches in turn while
+    # their reads from MySQL still overlap.
+    def __init__(self, path, on_duplicate="error", truncate=False):
+        if on_duplicate not in SQLITE_DUPLICATE_STATEMENTS:
+            raise ValueError(f"Unknown duplicate handling '{on_duplicate}', "
+                             f"expected one of {', '.join(SQLITE_DUPLICATE_STATEMENTS)}")
+        self.path = path
+        self.on_duplicate = on_duplicate
+        self.truncate = truncate
+        self.write_lock = threading.Lock()
+
+    def describe(self):
+        return self.path
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+
+    def converter(self, columns):
+        return CopyRowConverter(columns, SQLITE_ADAPTERS)
+
+    def prepare_table(self, connection, source_connection, table_name, details):
+        column_definitions = [f'"{column}" {sqlite_column_type(details["column_types"][column])}'
+                              for column in details["columns"]]
+        if details["primary_key"]:
+            column_definitions.append("PRIMARY KEY ({})".format(
+                ", ".join(f'"{column}"' for column in details["primary_key"])))
+        with self.write_lock:
+            connection.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" ({", ".join(column_definitions)})')
+            if self.truncate:
+                connection.execute(f'DELETE FROM "{table_name}"')
+            connection.commit()
+
+    def open_table(self, connection, table_name, columns):
+        return _SQLiteSink(connection, table_name, columns, self.on_duplicate, self.write_lock)
+
+
+def list_tables(cursor, table_type="BASE TABLE"):
+    # Plain SHOW TABLES lists views too, which have no rows of their own to
+    # copy: SHOW CREATE TABLE returns a CREATE VIEW for them
+    cursor.execute("SHOW FULL TABLES WHERE Table_type = %s", (table_type,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+class TableCopier:
+    # Copies tables from the source database to a MySQLCopyTarget or
+    # SQLiteCopyTarget without writing any files. Each table streams from its
+    # own source connection into its own target connection; results are
+    # yielded in selection order, like TableExporter.export_tables.
+    def __init__(self, connection_params, selected_tables, target, batch_size=DEFAULT_BATCH_SIZE,
+                 workers=DEFAULT_WORKERS, exact_counts=False, log=None, on_table_start=None, on_batch=None,
+                 is_cancelled=None):
+        self.connection_params = connection_params
+        self.database_name = connection_params["database"]
+        self.selected_tables = selected_tables
+        self.target = target
+        self.batch_size = batch_size
+        self.workers = max(1, min(int(workers), MAX_WORKERS))
+        self.exact_counts = exact_counts
+        self.log = log
+        self.on_table_start = on_table_start
+        self.on_batch = on_batch
+        self.is_cancelled = is_cancelled
+        self.cancellation = ExportCancellation(connection_params, log=self._log)
+        self.table_details = None
+        self.progress = None
+        self.stats = None
+        self.total_rows = 0
+
+    def _log(self, message):
+        if self.log:
+            self.log(message)
+
+    def cancel(self):
+        self.cancellation.cancel()
+
+    def cancel_requested(self):
+        return self.cancellation.cancelled or bool(self.is_cancelled and self.is_cancelled())
+
+    def user_cancelled(self):
+        # Workers also stop when another one failed; only this is a cancel
+        return self.cancellation.requested or bool(self.is_cancelled and self.is_cancelled())
+
+    def prepare(self, connection):
+        cursor = connection.cursor()
+        try:
+            views = set(list_tables(cursor, "VIEW"))
+            skipped = [name for name in self.selected_tables if name in views]
+            if skipped:
+                self._log(f"Skipping views, they have no rows of their own: {', '.join(skipped)}")
+                self.selected_tables = [name for name in self.selected_tables if name not in views]
+            self._log("Reading table metadata from information_schema...")
+            self.table_details = load_table_metadata(cursor, self.database_name, self.selected_tables,
+                                                     self.exact_counts)
+        finally:
+            cursor.close()
+        self.progress = ExportProgress({name: details["row_count"] for name, details in self.table_details.items()})
+        self.stats = ExportStatistics()
+        return self.table_details
+
+    def copy_tables(self, connection):
+        self.cancellation.register(connection)
+        try:
+            if self.workers == 1:
+                target_connection = self.target.connect()
+                try:
+                    for table_name, details in self.table_details.items():
+                        result = self._copy_table(connection, target_connection, table_name, details)
+                        self.total_rows += result["row_count"]
+                        yield result
+                finally:
+                    target_connection.close()
+            else:
+                yield from self._copy_parallel()
+        except mysql.connector.Error as err:
+            if self.user_cancelled():
+                raise ExportCancelled("copy") from err
+            raise
+        finally:
+            self.cancellation.unregister(connection)
+
+    def _copy_parallel(self):
+        pool = create_connection_pool(self.connection_params, self.workers)
+        executor = ThreadPoolExecutor(max_workers=pool.pool_size)
+        futures = []
+        try:
+            for table_name, details in self.table_details.items():
+                futures.append(executor.submit(self._copy_pooled_table, pool, table_name, details))
+            for future in futures:
+                result = future.result()
+                self.total_rows += result["row_count"]
+                yield result
+        except BaseException:
+            # Interrupts the other workers instead of waiting for their tables
+            self.cancellation.interrupt()
+            raise
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _copy_pooled_table(self, pool, table_name, details):
+        connection = pool.get_connection()
+        target_connection = None
+        try:
+            self.cancellation.register(connection)
+            target_connection = self.target.connect()
+            return self._copy_table(connection, target_connection, table_name, details)
+        finally:
+            self.cancellation.unregister(connection)
+            if target_connection is not None:
+                target_connection.close()
+            try:
+                connection.close()
+            except mysql.connector.Error:
+                # A cancelled stream leaves unread rows and the session reset fails
+                pass
+
+    def _copy_table(self, connection, target_connection, table_name, details):
+        table_stats = self.stats.table(table_name)
+        self.progress.table_started(table_name)
+        table_stats.start()
+        if self.on_table_start:
+            self.on_table_start(table_name)
+
+        self.target.prepare_table(target_connection, connection, table_name, details)
+        sink = self.target.open_table(target_connection, table_name, details["columns"])
+
+        def on_batch(batch_rows, copied_rows):
+            self.progress.add_rows(table_name, batch_rows)
+            table_stats.add_rows(batch_rows)
+            if self.on_batch:
+                self.on_batch(table_name, copied_rows)
+
+        try:
+            row_count = run_pipeline(connection, QuerySource(table_name, batch_size=self.batch_size),
+                                     self.target.converter(details["columns"]), sink, stats=table_stats,
+                                     on_batch=on_batch, is_cancelled=self.cancel_requested)
+        except ExportCancelled:
+            raise
+        except Exception as err:
+            # A killed query fails with a MySQL error after a cancel
+            if self.cancel_requested():
+                raise ExportCancelled(table_name) from err
+            raise
+        finally:
+            sink.close()
+
+        self.progress.table_finished(table_name)
+        table_stats.finish()
+        return {"table_name": table_name, "row_count": row_count, "stats": table_stats.to_dict()}
+
+
+def copy_database(connection_params, target, tables=None, **options):
+    # Copies a whole database, or the given tables, without any front end;
+    # options are TableCopier's keyword arguments. Returns the per-table
+    # results and the run's totals.
+    connection = mysql.connector.connect(**connection_params)
+    try:
+        if tables is None:
+            cursor = connection.cursor()
+            tables = list_tables(cursor)
+            cursor.close()
+        copier = TableCopier(connection_params, tables, target, **options)
+        copier.prepare(connection)
+        started = time.perf_counter()
+        results = list(copier.copy_tables(connection))
+        seconds = time.perf_counter() - started
+        return {
+            "tables": results,
+            "total_rows": copier.total_rows,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(copier.total_rows / seconds, 1) if seconds else None
+        }
+    finally:
+        connection.close()
@@ -0,0 +1,103 @@
+import fnmatch
+import re
+
+# How a table filter is read: part of the name, a shell-style wildcard such
+# as user* or *_log, or a regular expression; all case-insensitive
+TABLE_FILTER_MODES = ("substring", "wildcard", "regex")
+
+
+def load_table_metadata(cursor, database_name, table_names=None, exact_counts=False):
+    # Two information_schema queries cover every table, instead of a
+    # COUNT(*) and DESCRIBE per table. TABLE_ROWS is only an estimate for
+    # InnoDB, so exact counts are opt-in and cost one COUNT(*) each.
+    table_filter = ""
+    params = (database_name,)
+    if table_names is not None:
+        if not table_names:
+            return {}
+        table_filter = f" AND TABLE_NAME IN ({', '.join(['%s'] * len(table_names))})"
+        params += tuple(table_names)
+
+    cursor.execute(
+        "SELECT TABLE_NAME, TABLE_ROWS, DATA_LENGTH FROM information_schema.TABLES "
+        f"WHERE TABLE_SCHEMA = %s{table_filter} ORDER BY TABLE_NAME",
+        params)
+    table_stats = {name: (rows, data_length) for name, rows, data_length in cursor.fetchall()}
+
+    cursor.execute(
+        "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, COLUMN_KEY FROM information_schema.COLUMNS "
+        f"WHERE TABLE_SCHEMA = %s{table_filter} ORDER BY TABLE_NAME, ORDINAL_POSITION",
+        params)
+    table_columns = {}
+    for table_name, column_name, column_type, column_key in cursor.fetchall():
+        table_columns.setdefault(table_name, []).append((column_name, column_type, column_key))
+
+    if table_names is None:
+        table_names = sorted(table_stats)
+
+    # With lower_case_table_names set, information_schema can spell a name
+    # differently from SHOW TABLES or the user's selection
+    columns_by_lower_name = {name.lower(): columns for name, columns in table_columns.items()}
+    stats_by_lower_name = {name.lower(): stats for name, stats in table_stats.items()}
+
+    table_details = {}
+    for table_name in table_names:
+        columns = table_columns.get(table_name) or columns_by_lower_name.get(table_name.lower())
+        if not columns:
+            raise ValueError(f"Table `{table_name}` has no columns in information_schema.COLUMNS for "
+                             f"`{database_name}`; it may have been dropped or renamed")
+        estimated_rows, data_length = table_stats.get(table_name) or stats_by_lower_name.get(
+            table_name.lower(), (None, None))
+        table_details[table_name] = {
+            "columns": [column[0] for column in columns],
+            "column_types": {column[0]: column[1] for column in columns},
+            "primary_key": [column[0] for column in columns if column[2] == "PRI"],
+            "row_count": int(estimated_rows or 0),
+            "row_count_exact": False,
+            "data_length": int(data_length or 0)
+        }
+
+    if exact_counts:
+        for table_name, details in table_details.items():
+            cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
+            details["row_count"] = cursor.fetchone()[0]
+            details["row_count_exact"] = True
+    return table_details
+
+
+def format_row_count(details):
+    if details["row_count_exact"]:
+        return f"{details['row_count']:,}"
+    return f"~{details['row_count']:,}"
+
+
+def summarize_metadata(table_details):
+    return {
+        table_name: {
+            "row_count": details["row_count"],
+            "row_count_exact": details["row_count_exact"],
+            "data_length": details["data_length"],
+            "primary_key": details["primary_key"],
+            "column_types": details["column_types"]
+        }
+        for table_name, details in table_details.items()
+    }
+
+
+def table_name_matcher(pattern, mode="substring"):
+    # Returns a predicate for table names, or None when the pattern is empty.
+    # Raises ValueError for an invalid regular expression.
+    pattern = pattern.strip()
+    if not pattern:
+        return None
+    if mode == "wildcard":
+        pattern = pattern.lower()
+        return lambda table_name: fnmatch.fnmatchcase(table_name.lower(), pattern)
+    if mode == "regex":
+        try:
+            regex = re.compile(pattern, re.IGNORECASE)
+        except re.error as err:
+            raise ValueError(f"Invalid regular expression: {err}")
+        return lambda table_name: regex.search(table_name) is not None
+    pattern = pattern.lower()
+    return lambda table_name: pattern in table_name.lower()
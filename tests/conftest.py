@@ -0,0 +1,18 @@
+import mysql.connector
+import pytest
+
+import parallel_export
+from synthetic_schema import FakeConnection, FakeConnectionPool, SyntheticTable
+
+
+@pytest.fixture
+def synthetic_tables(monkeypatch):
+    # Every connection the exporters open is answered by these tables
+    tables = {
+        "events": SyntheticTable("events", 530, ["int", "varchar", "datetime", "decimal", "nullable"]),
+        "labels": SyntheticTable("labels", 40, ["varchar", "date"]),
+    }
+    monkeypatch.setattr(mysql.connector, "connect", lambda **params: FakeConnection(tables))
+    monkeypatch.setattr(parallel_export, "create_connection_pool",
+                        lambda params, workers: FakeConnectionPool(tables, max(1, workers)))
+    return tables
@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from checkpoint import checkpoint_path
+from export_engine import export_database
+from json_encoder import JSONEncoder
+from json_import import export_file_order, find_export_files, read_export_file
+
+PARAMS = {"database": "shop"}
+
+
+class Interrupted(Exception):
+    pass
+
+
+def read_tables(output_dir):
+    # Rows per table, base files before their deltas, as the importer reads them
+    tables = {}
+    for path in sorted(find_export_files([output_dir]), key=export_file_order):
+        for table in read_export_file(path):
+            tables.setdefault(table.table_name, []).extend(table.rows)
+    return tables
+
+
+def read_summary(output_dir):
+    with open(os.path.join(output_dir, "shop_export_summary.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def interrupt_after(table_name, row_count):
+    def on_batch(batch_table, fetched_rows):
+        if batch_table == table_name and fetched_rows >= row_count:
+            raise Interrupted(f"{batch_table} at {fetched_rows} rows")
+    return on_batch
+
+
+@pytest.mark.parametrize("export_format", ["separate_files", "json_lines"])
+def test_resumed_export_matches_an_uninterrupted_one(synthetic_tables, tmp_path, export_format):
+    options = {"export_format": export_format, "batch_size": 50, "workers": 1, "encoder": JSONEncoder("json")}
+    export_database(PARAMS, output_dir=str(tmp_path / "full"), **options)
+
+    output_dir = str(tmp_path / "resumed")
+    with pytest.raises(Interrupted):
+        export_database(PARAMS, output_dir=output_dir, use_checkpoint=True,
+                        on_batch=interrupt_after("events", 200), **options)
+    with open(checkpoint_path(output_dir, "shop"), 'r', encoding='utf-8') as f:
+        state = json.load(f)["tables"]["events"]
+    assert state["status"] == "in_progress"
+    assert 0 < state["last_key"] == state["row_count"] <= 200
+
+    fetched = []
+    export_database(PARAMS, output_dir=output_dir, use_checkpoint=True, resume=True,
+                    on_batch=lambda table_name, rows: fetched.append(table_name), **options)
+    # Only the rest of the interrupted table is read again
+    assert fetched.count("events") < 530 // 50
+    assert not os.path.exists(checkpoint_path(output_dir, "shop"))
+    assert read_tables(output_dir) == read_tables(str(tmp_path / "full"))
+
+
+@pytest.mark.parametrize("export_format", ["separate_files", "json_lines"])
+def test_incremental_export_writes_only_new_rows(synthetic_tables, tmp_path, export_format):
+    output_dir = str(tmp_path)
+    options = {"export_format": export_format, "batch_size": 64, "encoder": JSONEncoder("json"),
+               "watermark_specs": ["events=id"]}
+    export_database(PARAMS, output_dir=output_dir, **options)
+    assert read_summary(output_dir)["watermarks"]["events"] == {"column": "id", "value": 530}
+
+    synthetic_tables["events"].row_count = 575
+    outcome = export_database(PARAMS, output_dir=output_dir, **options)
+    delta_files = [path for path in outcome["exported_files"] if ".delta_" in path]
+    assert len(delta_files) == 1
+    assert [row["id"] for row in read_tables(output_dir)["events"]] == list(range(1, 576))
+    delta_ids = [row["id"] for table in read_export_file(delta_files[0]) for row in table.rows]
+    assert delta_ids == list(range(531, 576))
+    assert read_summary(output_dir)["watermarks"]["events"]["value"] == 575
+
+
+def test_plain_run_keeps_the_watermarks(synthetic_tables, tmp_path):
+    output_dir = str(tmp_path)
+    options = {"export_format": "json_lines", "encoder": JSONEncoder("json")}
+    export_database(PARAMS, output_dir=output_dir, watermark_specs=["events=id"], **options)
+    export_database(PARAMS, output_dir=output_dir, **options)
+    assert read_summary(output_dir)["watermarks"]["events"]["value"] == 530
+
+    synthetic_tables["events"].row_count = 540
+    outcome = export_database(PARAMS, output_dir=output_dir, watermark_specs=["events=id"], **options)
+    assert any(".delta_" in path for path in outcome["exported_files"])
@@ -0,0 +1,122 @@
+import io
+import json
+
+import pytest
+from mysql.connector.constants import FieldType
+
+import json_encoder
+from export_pipeline import RowConverter
+from export_streaming import (JSONDatabaseWriter, JSONLinesTableWriter, JSONRowsFragmentWriter, JSONTableWriter,
+                              convert_rows)
+from json_encoder import JSONEncoder
+from synthetic_schema import SyntheticTable
+
+BACKENDS = ["json"] + (["orjson"] if json_encoder.orjson is not None else [])
+STYLES = ["pretty", "compact"]
+
+# JSON-ready rows as the converters hand them over; floats written with an
+# exponent only match once converted, see test_floats_match_json_dumps
+HEADER = {"table_name": "items", "columns": ["id", "name", "note", "price", "tags"]}
+ROWS = [
+    {"id": 1, "name": "Zoë", "note": None, "price": 12.5, "tags": ["a", "b"]},
+    {"id": 2, "name": "line\nbreak \"quoted\"", "note": "日本", "price": 0.1, "tags": []},
+    {"id": 3, "name": "", "note": "x", "price": -7.0, "tags": {"k": 1}},
+]
+
+
+def dumps(value, style):
+    # What the exports looked like when they were written with one json.dump
+    if style == "pretty":
+        return json.dumps(value, indent=2, ensure_ascii=False, default=str)
+    return json.dumps(value, ensure_ascii=False, default=str, separators=(',', ':'))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("style", STYLES)
+@pytest.mark.parametrize("rows", [ROWS, []], ids=["rows", "empty"])
+def test_table_writer_matches_json_dumps(backend, style, rows):
+    f = io.StringIO()
+    writer = JSONTableWriter(f, HEADER, encoder=JSONEncoder(backend, style))
+    writer.write_rows(rows[:2])
+    writer.write_rows(rows[2:])
+    assert writer.close() == len(rows)
+    assert f.getvalue() == dumps(dict(HEADER, data=rows, row_count=len(rows)), style)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("style", STYLES)
+def test_appended_fragment_matches_json_dumps(backend, style, tmp_path):
+    encoder = JSONEncoder(backend, style)
+    fragment_file = tmp_path / "items.part"
+    with open(fragment_file, 'w', encoding='utf-8') as fragment:
+        fragment_writer = JSONRowsFragmentWriter(fragment, encoder=encoder)
+        fragment_writer.write_rows(ROWS[1:])
+    f = io.StringIO()
+    writer = JSONTableWriter(f, HEADER, encoder=encoder)
+    writer.write_rows(ROWS[:1])
+    writer.append_rows_fragment(fragment_file, fragment_writer.close())
+    writer.close()
+    assert f.getvalue() == dumps(dict(HEADER, data=ROWS, row_count=len(ROWS)), style)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("style", STYLES)
+def test_database_writer_matches_json_dumps(backend, style):
+    f = io.StringIO()
+    writer = JSONDatabaseWriter(f, {"database": "shop"}, JSONEncoder(backend, style))
+    table_writer = writer.begin_table("items", HEADER)
+    table_writer.write_rows(ROWS)
+    table_writer.close()
+    writer.begin_table("empty", {"table_name": "empty", "columns": ["id"]}).close()
+    writer.close()
+    expected = {"database": "shop", "tables": {
+        "items": dict(HEADER, data=ROWS, row_count=len(ROWS)),
+        "empty": {"table_name": "empty", "columns": ["id"], "data": [], "row_count": 0},
+    }}
+    assert f.getvalue() == dumps(expected, style)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("style", STYLES)
+def test_json_lines_writer_matches_json_dumps(backend, style):
+    f = io.StringIO()
+    writer = JSONLinesTableWriter(f, JSONEncoder(backend, style))
+    writer.write_rows(ROWS)
+    assert writer.close() == len(ROWS)
+    assert f.getvalue() == "".join(dumps(row, "compact") + "\n" for row in ROWS)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_converted_rows_match_json_dumps(backend):
+    # The per-type converters, and orjson's own datetime output, give the
+    # same text as converting every value and calling json.dumps
+    table = SyntheticTable("mixed", 50, ["int", "varchar", "text", "decimal", "double", "datetime", "timestamp",
+                                         "date", "blob", "nullable"])
+    columns = [column[0] for column in table.columns]
+    rows = list(table.rows(1, table.row_count))
+    encoder = JSONEncoder(backend, "pretty")
+    converter = RowConverter(columns, encoder)
+    converter.bind(table.description())
+
+    f = io.StringIO()
+    writer = JSONTableWriter(f, {"columns": columns}, encoder=encoder)
+    writer.write_rows(converter.convert(rows))
+    writer.close()
+    assert f.getvalue() == dumps({"columns": columns, "data": convert_rows(rows, columns),
+                                  "row_count": len(rows)}, "pretty")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("style", STYLES)
+def test_floats_match_json_dumps(backend, style):
+    values = json_encoder.FLOAT_PARITY_VALUES + [0.0, -0.0, 1 / 3]
+    rows = [(value,) for value in values]
+    converter = RowConverter(["value"], JSONEncoder(backend, style))
+    converter.bind([("value", FieldType.DOUBLE, None, None, None, None, 1, 0)])
+
+    f = io.StringIO()
+    writer = JSONTableWriter(f, {"columns": ["value"]}, encoder=JSONEncoder(backend, style))
+    writer.write_rows(converter.convert(rows))
+    writer.close()
+    assert f.getvalue() == dumps({"columns": ["value"], "data": [{"value": value} for value in values],
+                                  "row_count": len(values)}, style)
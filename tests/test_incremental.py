@@ -0,0 +1,43 @@
+import pytest
+
+from incremental import delta_stamp, delta_where, has_new_rows, parse_watermark_specs, plan_incremental
+from synthetic_schema import FakeCursor, SyntheticTable
+
+
+def test_parse_watermark_specs():
+    assert parse_watermark_specs(["orders=updated_at, *=changed", "users=id"]) == {
+        "orders": "updated_at", "*": "changed", "users": "id"}
+    with pytest.raises(ValueError):
+        parse_watermark_specs(["orders"])
+
+
+def test_first_run_is_bounded_by_the_watermark():
+    where, params = delta_where({"column": "updated_at", "since": None, "until": "2024-05-01T00:00:00"})
+    assert where == "(`updated_at` IS NULL OR `updated_at` <= %s)"
+    assert params == ("2024-05-01T00:00:00",)
+
+
+def test_first_run_of_an_empty_table_reads_everything():
+    assert delta_where({"column": "updated_at", "since": None, "until": None}) == (None, None)
+
+
+def test_delta_reads_rows_after_the_stored_watermark():
+    incremental = {"column": "id", "since": 100, "until": 250}
+    assert delta_where(incremental) == ("`id` > %s AND `id` <= %s", (100, 250))
+    assert has_new_rows(incremental)
+    assert not has_new_rows({"column": "id", "since": 250, "until": 250})
+    assert has_new_rows({"column": "id", "since": None, "until": None})
+
+
+def test_plan_carries_on_from_the_same_column_only():
+    cursor = FakeCursor({"events": SyntheticTable("events", 300, ["datetime"])})
+    previous = {"events": {"column": "id", "value": 120}}
+    assert plan_incremental(cursor, {"events": "id"}, previous) == {
+        "events": {"column": "id", "since": 120, "until": 300}}
+    plan = plan_incremental(cursor, {"events": "datetime_0"}, previous)
+    assert plan["events"]["since"] is None
+    assert plan["events"]["until"] == "2024-01-01T08:05:00"
+
+
+def test_delta_stamp():
+    assert delta_stamp("2024-05-01T12:30:05.123456") == "delta_20240501T123005"
@@ -0,0 +1,143 @@
+import json
+import re
+
+import pytest
+
+import json_import
+from export_engine import export_database
+from export_streaming import convert_rows
+from json_encoder import JSONEncoder
+from json_import import DUPLICATE_STATEMENTS, TableLoader, import_files
+from output_compression import OutputCompression
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append((statement, params))
+
+    def executemany(self, statement, rows):
+        raise AssertionError("executemany sends REPLACE one row at a time")
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.recording_cursor = RecordingCursor()
+        self.commits = 0
+
+    def cursor(self):
+        return self.recording_cursor
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.parametrize("on_duplicate", list(DUPLICATE_STATEMENTS))
+def test_insert_sends_one_statement_per_batch(on_duplicate):
+    connection = RecordingConnection()
+    loader = TableLoader(connection, "users", ["id", "name"], "insert", on_duplicate)
+    loader.load([(1, "a"), (2, "b"), (3, "c")])
+    loader.load([(4, "d")])
+    loader.close()
+
+    statements = connection.recording_cursor.statements
+    assert len(statements) == 2
+    assert connection.commits == 2
+    verb = DUPLICATE_STATEMENTS[on_duplicate]
+    assert statements[0] == (f"{verb} INTO `users` (`id`, `name`) VALUES (%s, %s), (%s, %s), (%s, %s)",
+                             [1, "a", 2, "b", 3, "c"])
+    assert statements[1] == (f"{verb} INTO `users` (`id`, `name`) VALUES (%s, %s)", [4, "d"])
+
+
+class MemoryCursor:
+    # Keeps the rows of multi-row INSERT/REPLACE statements by their first column
+    def __init__(self, tables):
+        self.tables = tables
+
+    def execute(self, statement, params=None):
+        match = re.match(r"(INSERT|INSERT IGNORE|REPLACE) INTO `(\w+)` \((.*?)\) VALUES ", statement)
+        if match is None:
+            if statement.startswith("TRUNCATE TABLE"):
+                self.tables.pop(statement.split("`")[1], None)
+            return
+        verb, table_name, column_list = match.groups()
+        columns = [column.strip("`") for column in column_list.split(", ")]
+        table = self.tables.setdefault(table_name, {})
+        for start in range(0, len(params), len(columns)):
+            row = dict(zip(columns, params[start:start + len(columns)]))
+            key = params[start]
+            if key in table and verb != "REPLACE":
+                assert verb == "INSERT IGNORE", f"duplicate key {key} in {table_name}"
+                continue
+            table[key] = row
+
+    def close(self):
+        pass
+
+
+class MemoryConnection:
+    def __init__(self, tables):
+        self.tables = tables
+
+    def cursor(self):
+        return MemoryCursor(self.tables)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class MemoryPool:
+    def __init__(self, tables):
+        self.tables = tables
+
+    def get_connection(self):
+        return MemoryConnection(self.tables)
+
+
+@pytest.fixture
+def target_tables(monkeypatch):
+    tables = {}
+    monkeypatch.setattr(json_import, "create_connection_pool", lambda params, workers: MemoryPool(tables))
+    return tables
+
+
+def exported_rows(table):
+    # The source rows as they read back from JSON
+    columns = [column[0] for column in table.columns]
+    rows = convert_rows(list(table.rows(1, table.row_count)), columns)
+    return json.loads(json.dumps(rows, default=str))
+
+
+@pytest.mark.parametrize("export_format", ["single_file", "separate_files", "json_lines"])
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_import_round_trip(synthetic_tables, target_tables, tmp_path, export_format, compression):
+    export_database({"database": "shop"}, export_format=export_format, output_dir=str(tmp_path), batch_size=100,
+                    workers=2, compression=OutputCompression(compression) if compression else None,
+                    encoder=JSONEncoder("json"))
+    result = import_files({"database": "restored"}, [str(tmp_path)], batch_size=64, workers=2)
+
+    assert result["total_rows"] == sum(table.row_count for table in synthetic_tables.values())
+    for table_name, table in synthetic_tables.items():
+        assert list(target_tables[table_name].values()) == exported_rows(table)
+
+
+def test_import_applies_delta_files_after_their_base_file(synthetic_tables, target_tables, tmp_path):
+    options = {"export_format": "json_lines", "output_dir": str(tmp_path), "watermark_specs": ["events=id"],
+               "encoder": JSONEncoder("json")}
+    export_database({"database": "shop"}, **options)
+    synthetic_tables["events"].row_count = 600
+    export_database({"database": "shop"}, **options)
+
+    result = import_files({"database": "restored"}, [str(tmp_path)], tables=["events"])
+    assert result["tables"]["events"]["rows"] == 600
+    assert list(target_tables["events"].values()) == exported_rows(synthetic_tables["events"])
+    with pytest.raises(ValueError):
+        import_files({"database": "restored"}, [str(tmp_path)], on_duplicate="error")